@@ -0,0 +1,44 @@
+# Configuration for running the API with gunicorn:
+#
+#   gunicorn -c gunicorn.conf.py
+#
+# The app, and the models configured to be preloaded (see
+# zeeguu/api/model_preloading.py), are loaded once in the master process;
+# the workers are forked from it and share the memory of the models.
+
+import multiprocessing
+import os
+
+wsgi_app = "zeeguu.api.app:create_app()"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:9001")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+timeout = 120
+
+# set GUNICORN_PRELOAD=false to load the app in every worker instead
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() != "false"
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from zeeguu.api.model_preloading import prepare_for_fork
+
+        prepare_for_fork()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from zeeguu.api.model_preloading import after_fork
+
+        after_fork(server.app.wsgi())
+
+
+def worker_exit(server, worker):
+    # write the activity events that are still buffered in the worker
+    from zeeguu.core.activity_ingestion import flush_activity_ingestion
+
+    flush_activity_ingestion()
+
+    # and the heartbeats of the reading and watching sessions
+    from zeeguu.core.session_heartbeats import flush_session_heartbeats
+
+    flush_session_heartbeats()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+"""
+
+Script that (re)computes the daily_activity rollup of every user
+from their reading and exercise sessions, exercises and bookmarks.
+
+To be run after the daily_activity table is created, or
+whenever the rollup is suspected to be out of sync.
+
+"""
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from zeeguu.core.model import db, User, DailyActivity
+
+db_session = db.session
+
+user_ids = [each[0] for each in db_session.query(User.id).all()]
+
+print(f"backfilling the daily activity of {len(user_ids)} users...")
+for i, user_id in enumerate(user_ids):
+    user = User.find_by_id(user_id)
+    days = DailyActivity.rebuild_for_user(db_session, user)
+    db_session.commit()
+    if (i + 1) % 100 == 0:
+        print(f"{i + 1}/{len(user_ids)}: user {user_id} has {days} days")
+
+print("done.")
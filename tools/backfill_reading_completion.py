@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""
+
+Script that computes the reading completion of the UserArticles
+that do not have one yet, i.e. the ones from before it was
+maintained, from the scroll events and the reading sessions.
+
+With --all it recomputes it for every UserArticle.
+
+"""
+
+import argparse
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from zeeguu.core.model import db, UserArticle
+from zeeguu.core.model.user_activitiy_data import UserActivityData
+
+BATCH_SIZE = 1000
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--all", action="store_true", help="recompute the existing completions too"
+)
+args = parser.parse_args()
+
+db_session = db.session
+
+query = db_session.query(UserArticle.id)
+if not args.all:
+    query = query.filter(UserArticle.reading_completion == None)
+user_article_ids = [each for (each,) in query.order_by(UserArticle.id).all()]
+
+print(f"computing the reading completion of {len(user_article_ids)} user articles...")
+for start in range(0, len(user_article_ids), BATCH_SIZE):
+    batch = user_article_ids[start : start + BATCH_SIZE]
+    for user_article in UserArticle.query.filter(UserArticle.id.in_(batch)).all():
+        user_article.reading_completion = (
+            UserActivityData.get_reading_completion_for_article(
+                user_article.article_id, user_article.user_id
+            )
+        )
+    db_session.commit()
+    print(f"{start + len(batch)}/{len(user_article_ids)}")
+
+print("done.")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+"""
+
+Compiles the wordstats frequency lists of the given languages into
+memory mapped word rank stores (see zeeguu/core/word_stats/rank_store.py),
+in $ZEEGUU_RESOURCES_FOLDER/word_rank_stores/<language code>
+
+    python tools/build_word_rank_stores.py da de nl
+
+To be run again when wordstats is updated.
+
+"""
+
+import os
+import sys
+
+from nltk.stem import SnowballStemmer
+
+from zeeguu.core.model.language import Language
+from zeeguu.core.word_stats import lang_info
+from zeeguu.core.word_stats.rank_store import RANK_STORES_FOLDER, WordRankStore
+
+for language_code in sys.argv[1:]:
+    info = lang_info(language_code)
+
+    language_name = Language.LANGUAGE_NAMES[language_code].lower()
+    stem = None
+    if language_name in SnowballStemmer.languages:
+        stem = SnowballStemmer(language_name).stem
+
+    store = WordRankStore.build(
+        os.path.join(RANK_STORES_FOLDER, language_code),
+        ((word, info[word].rank, info[word].frequency) for word in info.all_words()),
+        stem,
+    )
+    print(f"{language_code}: {len(store)} words, {len(store.stems)} stems")
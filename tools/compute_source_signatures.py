@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""
+
+Script that computes the SourceSignature of the articles
+crawled in the last days that do not have one yet, so that
+the near-duplicates of the recent stories are recognized
+from the first crawl after the signatures were introduced.
+
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from zeeguu.core.model import db, Article, SourceSignature
+from zeeguu.core.model.source import Source
+
+BATCH_SIZE = 500
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--days", type=int, default=30, help="how far back to go (default: 30)"
+)
+args = parser.parse_args()
+
+db_session = db.session
+
+source_ids = [
+    each
+    for (each,) in db_session.query(Article.source_id)
+    .outerjoin(SourceSignature, SourceSignature.source_id == Article.source_id)
+    .filter(SourceSignature.source_id == None)
+    .filter(Article.source_id != None)
+    .filter(Article.broken == 0)
+    .filter(Article.published_time > datetime.now() - timedelta(days=args.days))
+    .order_by(Article.source_id)
+    .all()
+]
+
+print(f"computing the signature of {len(source_ids)} sources...")
+for start in range(0, len(source_ids), BATCH_SIZE):
+    batch = source_ids[start : start + BATCH_SIZE]
+    for source in Source.query.filter(Source.id.in_(batch)).all():
+        SourceSignature.compute_for_source(db_session, source)
+    db_session.commit()
+    print(f"{start + len(batch)}/{len(source_ids)}")
+
+print("done.")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+"""
+
+Script that computes the SourceVocabulary of the sources
+that do not have one yet, e.g. the ones crawled before the
+vocabularies were introduced.
+
+With --all it recomputes them for every source, which is
+needed after the word rank stores are rebuilt with new
+frequency lists, since the vocabularies refer to the ranks.
+
+"""
+
+import argparse
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from zeeguu.core.model import db, SourceVocabulary
+from zeeguu.core.model.source import Source
+
+BATCH_SIZE = 500
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--all", action="store_true", help="recompute the existing vocabularies too"
+)
+args = parser.parse_args()
+
+db_session = db.session
+
+query = db_session.query(Source.id)
+if not args.all:
+    query = query.outerjoin(
+        SourceVocabulary, SourceVocabulary.source_id == Source.id
+    ).filter(SourceVocabulary.source_id == None)
+source_ids = [each for (each,) in query.order_by(Source.id).all()]
+
+print(f"computing the vocabulary of {len(source_ids)} sources...")
+for start in range(0, len(source_ids), BATCH_SIZE):
+    batch = source_ids[start : start + BATCH_SIZE]
+    for source in Source.query.filter(Source.id.in_(batch)).all():
+        SourceVocabulary.compute_for_source(db_session, source)
+    db_session.commit()
+    print(f"{start + len(batch)}/{len(source_ids)}")
+
+print("done.")
@@ -47,6 +47,8 @@ class CrawlReport:
                 "quality_error": {},
                 "quality_to_url": {},
                 "sents_to_url": {},
+                "patterns_matched": {},
+                "patterns_to_url": {},
             },
             "last_article_date": None,
             "feed_errors": [],
@@ -121,6 +123,18 @@ class CrawlReport:
                 "article_report"
             ]["sents_to_url"].get(sent_removed, []) + [url]
 
+    def add_pattern_matched(self, feed, pattern, url=None):
+        """
+        Counts the quality filter pattern or the banned url prefix
+        because of which an article was skipped.
+        """
+        article_report = self._get_feed_dict(feed)["article_report"]
+        patterns_matched = article_report.setdefault("patterns_matched", {})
+        patterns_matched[pattern] = patterns_matched.get(pattern, 0) + 1
+        if url is not None:
+            patterns_to_url = article_report.setdefault("patterns_to_url", {})
+            patterns_to_url[pattern] = patterns_to_url.get(pattern, []) + [url]
+
     def save_crawl_report(self):
         timestamp_str = self.__convert_dt_to_str(self.crawl_report_date)
         if not os.path.exists(self.save_dir):
@@ -176,6 +190,18 @@ class CrawlReport:
                                         "quality_error"
                                     ]
                                 )
+                                # not in the reports from before it was added
+                                feed_dict["article_report"][
+                                    "patterns_matched"
+                                ] = Counter(
+                                    feed_dict["article_report"].get(
+                                        "patterns_matched", {}
+                                    )
+                                ) + Counter(
+                                    loaded_data["feeds"][feed]["article_report"].get(
+                                        "patterns_matched", {}
+                                    )
+                                )
                         print(f"LOADED File (d:{date}, l:{lang}): {file}")
                 except Exception as e:
                     print(f"Failed to load: '{file}', with: '{e} ({type(e)})'")
@@ -206,6 +232,18 @@ class CrawlReport:
                 total_counts += Counter(feed_dict["article_report"]["quality_error"])
         return total_counts
 
+    def get_total_patterns_matched_counts(self, langs_to_load: list[str] = None):
+        langs_to_load = self.__load_languages(langs_to_load)
+
+        total_counts = Counter()
+        for lang in langs_to_load:
+            for feed in self.data["lang"][lang]["feeds"]:
+                feed_dict = self.data["lang"][lang]["feeds"][feed]
+                total_counts += Counter(
+                    feed_dict["article_report"].get("patterns_matched", {})
+                )
+        return total_counts
+
     def get_total_removed_sents_counts(self, langs_to_load: list[str] = None):
         langs_to_load = self.__load_languages(langs_to_load)
 
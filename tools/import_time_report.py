@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""
+
+Reports where the time goes when an API process starts: runs
+create_app in a fresh interpreter with `python -X importtime` and
+lists the slowest imports, by cumulative time.
+
+    python tools/import_time_report.py [--top 30] [--budget-ms 2000]
+
+With --budget-ms the script exits with an error when the total import
+time is over the budget, so it can be used as a check before deploying.
+
+The modules that must not be imported at startup at all are listed in
+zeeguu/api/test/test_startup_imports.py.
+
+"""
+
+import argparse
+import subprocess
+import sys
+
+STARTUP_SCRIPT = "from zeeguu.api.app import create_app; create_app(testing=True)"
+
+
+def import_times(script=STARTUP_SCRIPT):
+    """
+    :return: list of (module, depth, self microseconds, cumulative microseconds)
+    in the order in which python reports them
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return times
+
+
+def total_ms(times):
+    # the top level imports include the time of everything below them
+    return sum(cumulative for _, depth, _, cumulative in times if depth == 0) / 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--budget-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    times = import_times()
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    slowest = sorted(times, key=lambda each: each[3], reverse=True)[: args.top]
+    for name, depth, self_us, cumulative_us in slowest:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    total = total_ms(times)
+    print(f"\nTotal import time: {total:.0f} ms for {len(times)} modules")
+
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"Over the budget of {args.budget_ms} ms")
+        sys.exit(1)
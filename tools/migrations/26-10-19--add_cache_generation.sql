@@ -0,0 +1,10 @@
+/*
+    Counters that are bumped when something changes that cached results
+    depend on, e.g. the new content of a language for the cached
+    recommendations; see CacheGeneration.
+*/
+CREATE TABLE `zeeguu_test`.`cache_generation` (
+    `name` VARCHAR(64) NOT NULL,
+    `generation` INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (`name`)
+);
@@ -0,0 +1,20 @@
+/*
+    Per user, language and day rollup of the learning activity,
+    see DailyActivity. After creating the table run
+    tools/backfill_daily_activity.py to fill it in from the
+    existing sessions, exercises and bookmarks.
+*/
+CREATE TABLE `zeeguu_test`.`daily_activity` (
+    `user_id` INT NOT NULL,
+    `language_id` INT NOT NULL,
+    `day` DATE NOT NULL,
+    `reading_duration` INT NOT NULL DEFAULT 0,
+    `exercise_duration` INT NOT NULL DEFAULT 0,
+    `exercise_count` INT NOT NULL DEFAULT 0,
+    `correct_exercise_count` INT NOT NULL DEFAULT 0,
+    `bookmark_count` INT NOT NULL DEFAULT 0,
+    `learned_word_count` INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (`user_id`, `language_id`, `day`),
+    CONSTRAINT `daily_activity_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `zeeguu_test`.`user` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION,
+    CONSTRAINT `daily_activity_ibfk_2` FOREIGN KEY (`language_id`) REFERENCES `zeeguu_test`.`language` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION
+);
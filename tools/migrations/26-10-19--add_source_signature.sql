@@ -0,0 +1,20 @@
+/*
+    The MinHash signatures of the crawled articles and their LSH buckets,
+    to skip the near-duplicates of the articles that we have already;
+    see SourceSignature. Run tools/compute_source_signatures.py to compute
+    them for the recent articles.
+*/
+CREATE TABLE `zeeguu_test`.`source_signature` (
+    `source_id` INT NOT NULL,
+    `minhash` BLOB NULL,
+    PRIMARY KEY (`source_id`),
+    CONSTRAINT `source_signature_ibfk_1` FOREIGN KEY (`source_id`) REFERENCES `zeeguu_test`.`source` (`id`) ON DELETE CASCADE ON UPDATE NO ACTION
+);
+
+CREATE TABLE `zeeguu_test`.`source_signature_bucket` (
+    `bucket` BIGINT NOT NULL,
+    `source_id` INT NOT NULL,
+    PRIMARY KEY (`bucket`, `source_id`),
+    INDEX `source_signature_bucket_source` (`source_id`),
+    CONSTRAINT `source_signature_bucket_ibfk_1` FOREIGN KEY (`source_id`) REFERENCES `zeeguu_test`.`source_signature` (`source_id`) ON DELETE CASCADE ON UPDATE NO ACTION
+);
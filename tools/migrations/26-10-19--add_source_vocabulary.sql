@@ -0,0 +1,14 @@
+/*
+    The vocabulary of every source, see SourceVocabulary. New sources get
+    theirs when they are crawled; run tools/compute_source_vocabularies.py
+    to backfill the existing ones.
+*/
+CREATE TABLE `zeeguu_test`.`source_vocabulary` (
+    `source_id` INT NOT NULL,
+    `word_ranks` MEDIUMBLOB NULL,
+    `word_counts` MEDIUMBLOB NULL,
+    `rank_histogram` BLOB NULL,
+    `word_count` INT NULL,
+    PRIMARY KEY (`source_id`),
+    CONSTRAINT `source_vocabulary_ibfk_1` FOREIGN KEY (`source_id`) REFERENCES `zeeguu_test`.`source` (`id`) ON DELETE CASCADE ON UPDATE NO ACTION
+);
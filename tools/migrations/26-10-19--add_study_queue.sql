@@ -0,0 +1,31 @@
+/*
+    Denormalized queue of the bookmarks that are candidates for study,
+    see StudyQueueEntry. After creating the tables run
+    tools/rebuild_study_queue.py to backfill them; the queue of
+    a user is also built the first time one of their bookmarks
+    changes.
+*/
+CREATE TABLE `zeeguu_test`.`study_queue` (
+    `bookmark_id` INT NOT NULL,
+    `user_id` INT NOT NULL,
+    `language_id` INT NOT NULL,
+    `word` VARCHAR(255) NOT NULL,
+    `rank` INT NOT NULL,
+    `cooling_interval` INT NOT NULL,
+    `next_practice_time` DATETIME NULL,
+    `learning_cycle` INT NULL,
+    PRIMARY KEY (`bookmark_id`),
+    INDEX `study_queue_priority_idx` (
+        `user_id` ASC,
+        `language_id` ASC,
+        `rank` ASC,
+        `cooling_interval` DESC
+    ),
+    CONSTRAINT `study_queue_ibfk_1` FOREIGN KEY (`bookmark_id`) REFERENCES `zeeguu_test`.`bookmark` (`id`) ON DELETE CASCADE ON UPDATE NO ACTION
+);
+
+CREATE TABLE `zeeguu_test`.`study_queue_built` (
+    `user_id` INT NOT NULL,
+    `language_id` INT NOT NULL,
+    PRIMARY KEY (`user_id`, `language_id`)
+);
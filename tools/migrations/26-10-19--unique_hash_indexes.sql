@@ -0,0 +1,27 @@
+/*
+    The find_or_create of these tables relies on a unique index to detect
+    that another request created the same row concurrently; see
+    zeeguu/core/model/upsert.py. (url, domain_name, user_word and
+    user_activity_data have one already.)
+
+    If an ALTER fails because of old duplicates, list them with e.g.
+
+        SELECT content_hash, COUNT(*) FROM source_text
+        GROUP BY content_hash HAVING COUNT(*) > 1;
+
+    and point their references to a single row before deleting the others.
+*/
+ALTER TABLE `zeeguu_test`.`source_text`
+    ADD UNIQUE INDEX `source_text_content_hash` (`content_hash`);
+
+ALTER TABLE `zeeguu_test`.`new_text`
+    ADD UNIQUE INDEX `new_text_content_hash` (`content_hash`);
+
+ALTER TABLE `zeeguu_test`.`text`
+    ADD UNIQUE INDEX `text_in_article` (`content_hash`, `article_id`);
+
+ALTER TABLE `zeeguu_test`.`bookmark_context`
+    ADD UNIQUE INDEX `bookmark_context_text` (`text_id`, `context_type_id`, `language_id`);
+
+ALTER TABLE `zeeguu_test`.`user_preference`
+    ADD UNIQUE INDEX `user_preference_key` (`user_id`, `key`);
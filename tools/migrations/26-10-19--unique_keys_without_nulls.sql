@@ -0,0 +1,25 @@
+/*
+    MySQL allows any number of rows with the same key in a unique index
+    when the key has a NULL, so the indexes of 26-10-19--unique_hash_indexes
+    did not prevent the duplicate texts without an article and contexts
+    without a type or language. The indexes are now on generated columns
+    with 0 instead of NULL.
+
+    If an ALTER fails because of old duplicates, list them with e.g.
+
+        SELECT text_id, COUNT(*) FROM bookmark_context
+        WHERE context_type_id IS NULL OR language_id IS NULL
+        GROUP BY text_id, context_type_id, language_id HAVING COUNT(*) > 1;
+
+    and point their references to a single row before deleting the others.
+*/
+ALTER TABLE `zeeguu_test`.`text`
+    ADD COLUMN `article_key` INT AS (COALESCE(`article_id`, 0)) STORED,
+    DROP INDEX `text_in_article`,
+    ADD UNIQUE INDEX `text_in_article` (`content_hash`, `article_key`);
+
+ALTER TABLE `zeeguu_test`.`bookmark_context`
+    ADD COLUMN `context_type_key` INT AS (COALESCE(`context_type_id`, 0)) STORED,
+    ADD COLUMN `language_key` INT AS (COALESCE(`language_id`, 0)) STORED,
+    DROP INDEX `bookmark_context_text`,
+    ADD UNIQUE INDEX `bookmark_context_text` (`text_id`, `context_type_key`, `language_key`);
@@ -0,0 +1,17 @@
+/*
+    The events are now written with INSERT IGNORE, which relies on this
+    key to skip the ones that were already uploaded; see
+    zeeguu/core/activity_ingestion.py. The duplicates that made it into
+    the table before have to be removed first.
+*/
+DELETE newer
+FROM `zeeguu_test`.`user_activity_data` newer
+    JOIN `zeeguu_test`.`user_activity_data` older
+        ON newer.user_id = older.user_id
+        AND newer.time = older.time
+        AND newer.event = older.event
+        AND newer.value = older.value
+        AND newer.id > older.id;
+
+ALTER TABLE `zeeguu_test`.`user_activity_data`
+    ADD UNIQUE INDEX `user_activity_data_event` (`user_id`, `time`, `event`, `value`);
@@ -0,0 +1,7 @@
+/*
+    How much of an article a user read, maintained from the scroll events
+    and the reading sessions; see UserArticle.reading_completion. Run
+    tools/backfill_reading_completion.py to fill it in for the existing rows.
+*/
+ALTER TABLE `zeeguu_test`.`user_article`
+ADD COLUMN `reading_completion` FLOAT NULL;
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+"""
+
+Serves the NLP endpoint operations (spaCy models, confusion words, etc.)
+to the API processes, so that the models are loaded once per machine
+instead of once per API worker.
+
+Listens on NLP_WORKER_ADDRESS from the config; set the same value in the
+config of the API. The languages are loaded at startup, e.g.:
+
+    python tools/nlp_worker.py da de en
+
+"""
+
+import sys
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from zeeguu.core.nlp_pipeline.nlp_service import serve_nlp_worker
+
+address = app.config.get("NLP_WORKER_ADDRESS")
+if not address:
+    print("NLP_WORKER_ADDRESS is not set in the config")
+    sys.exit(1)
+
+serve_nlp_worker(address, sys.argv[1:])
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+"""
+
+Script that (re)builds the study queue of every user
+for all the languages they have bookmarks in.
+
+To be run after the study_queue table is created, or
+whenever the queue is suspected to be out of sync.
+
+"""
+
+from zeeguu.api.app import create_app
+
+app = create_app()
+app.app_context().push()
+
+from sqlalchemy import distinct
+
+from zeeguu.core.model import db, Bookmark, User, UserWord
+from zeeguu.core.word_scheduling import StudyQueueEntry
+
+db_session = db.session
+
+user_languages = (
+    db_session.query(distinct(Bookmark.user_id), UserWord.language_id)
+    .join(UserWord, Bookmark.origin_id == UserWord.id)
+    .all()
+)
+
+print(f"rebuilding the study queue for {len(user_languages)} user/language pairs...")
+for i, (user_id, language_id) in enumerate(user_languages):
+    user = User.find_by_id(user_id)
+    entries = StudyQueueEntry.rebuild_for_user(db_session, user, language_id)
+    db_session.commit()
+    if (i + 1) % 100 == 0:
+        print(f"{i + 1}/{len(user_languages)}: user {user_id} has {entries} entries")
+
+print("done.")
@@ -1,27 +1,126 @@
+import datetime
+import os
+
 import pandas as pd
 
+# The rows of the daily queries are read from the DB and summed up in
+# chunks of this size, so only the sums are kept in memory
+CHUNK_SIZE = 50_000
+
+# part of the path of the cached files; to be increased when the daily
+# queries change, so that the results of the old ones are not used
+CACHE_VERSION = 2
+
 
 def ms_to_mins(ms_time):
     return ms_time / 1000 / 60
 
 
+def parquet_is_available():
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+
 class DataExtractor:
-    def __init__(self, db_connection, DAYS_FOR_REPORT=7) -> None:
+    """
+    The activity queries (reading, exercises) only add up values, so they
+    are run one day at a time and the results of the days that are over
+    are cached as Parquet files in cache_folder. Re-running the report
+    for a window that overlaps with a previous one only queries the new
+    days (and today and yesterday, which are never cached, since the
+    sessions that started on them might still be going on).
+
+    Every row is counted on one day only, by a time that does not change
+    afterwards: the start of a reading session, the time of an exercise.
+
+    The cache is disabled if cache_folder is None or pyarrow is missing.
+    """
+
+    def __init__(
+        self, db_connection, DAYS_FOR_REPORT=7, cache_folder=None, chunk_size=CHUNK_SIZE
+    ) -> None:
         self.DAYS_FOR_REPORT = DAYS_FOR_REPORT
         self.db_connection = db_connection
+        self.chunk_size = chunk_size
+        self.cache_folder = cache_folder
+        if cache_folder and not parquet_is_available():
+            print("pyarrow is not installed; the report data won't be cached.")
+            self.cache_folder = None
+
+    def __feed_names(self, feed_df):
+        names = feed_df["id"].astype(int).astype(str) + " " + feed_df["title"].str[:15]
+        return pd.Series(names.values, index=feed_df["id"].astype(int).values)
 
     def __add_feed_name(self, df, feed_df, column_with_id="feed_id"):
-        df["Feed Name"] = df[column_with_id].apply(
-            lambda x: (
-                "No Feed"
-                if pd.isna(x)
-                else str(x) + " " + feed_df.loc[feed_df.id == x, "title"].values[0][:15]
-            )
-        )
+        feed_names = self.__feed_names(feed_df)
+        df["Feed Name"] = df[column_with_id].map(feed_names).fillna("No Feed")
 
     def run_query(self, query):
-        df = pd.read_sql(query, con=self.db_connection)
-        return df
+        return pd.read_sql(query, con=self.db_connection)
+
+    def run_summed_query(self, query, group_by, sum_columns):
+        """
+        Reads the result of the query in chunks of chunk_size rows and
+        sums up every chunk as it arrives, so only the sums are in memory
+        """
+        sums = None
+        for chunk in pd.read_sql(
+            query, con=self.db_connection, chunksize=self.chunk_size
+        ):
+            if sums is not None:
+                chunk = pd.concat([sums, chunk], ignore_index=True)
+            sums = (
+                chunk.groupby(group_by, dropna=False)[sum_columns].sum().reset_index()
+            )
+        return sums
+
+    def report_days(self):
+        today = datetime.date.today()
+        return [
+            today - datetime.timedelta(days=i)
+            for i in range(self.DAYS_FOR_REPORT, -1, -1)
+        ]
+
+    def run_daily_query(self, name, query_for_day, group_by, sum_columns):
+        """
+        Runs the query once for each of the days of the report, using the
+        cached results for the past days, and adds up the results.
+
+        :param query_for_day: function from (day_start, day_end) strings
+            to the query for that interval
+        """
+        last_cached_day = datetime.date.today() - datetime.timedelta(days=2)
+        daily_frames = []
+        for day in self.report_days():
+            cache_file = self.__cache_file(name, day)
+            if cache_file and os.path.exists(cache_file):
+                daily_frames.append(pd.read_parquet(cache_file))
+                continue
+
+            day_df = self.run_summed_query(
+                query_for_day(
+                    day.isoformat(), (day + datetime.timedelta(days=1)).isoformat()
+                ),
+                group_by,
+                sum_columns,
+            )
+            if cache_file and day <= last_cached_day:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                day_df.to_parquet(cache_file, index=False)
+            daily_frames.append(day_df)
+
+        df = pd.concat(daily_frames, ignore_index=True)
+        return df.groupby(group_by, dropna=False)[sum_columns].sum().reset_index()
+
+    def __cache_file(self, name, day):
+        if not self.cache_folder:
+            return None
+        return os.path.join(
+            self.cache_folder, f"v{CACHE_VERSION}", name, f"{day.isoformat()}.parquet"
+        )
 
     def get_article_topics_df(self, feed_df):
         print("Getting Article Topics...")
@@ -32,7 +131,7 @@ class DataExtractor:
         INNER JOIN language l ON l.id = a.language_id
         WHERE DATEDIFF(CURDATE(), a.published_time) <= {self.DAYS_FOR_REPORT}
         AND a.broken = 0"""
-        df = pd.read_sql(query, con=self.db_connection)
+        df = self.run_query(query)
         self.__add_feed_name(df, feed_df)
         return df
 
@@ -56,7 +155,7 @@ class DataExtractor:
             ORDER BY
                 days_since_last_article DESC;
         """
-        df = pd.read_sql(query, con=self.db_connection)
+        df = self.run_query(query)
         return df
 
     def get_article_df(self, feed_df):
@@ -66,7 +165,7 @@ class DataExtractor:
         INNER JOIN language l ON l.id = a.language_id
         WHERE DATEDIFF(CURDATE(), published_time) <= {self.DAYS_FOR_REPORT}
         AND a.broken = 0"""
-        df = pd.read_sql(query, con=self.db_connection)
+        df = self.run_query(query)
         self.__add_feed_name(df, feed_df)
         return df
 
@@ -109,7 +208,7 @@ class DataExtractor:
                                         )
                     ORDER BY count DESC;
                 """
-        df = pd.read_sql(query, con=self.db_connection)
+        df = self.run_query(query)
         return df
 
     def get_article_df_with_ids(self, feed_df, id_to_fetch: list[int]):
@@ -119,14 +218,14 @@ class DataExtractor:
         FROM article a     
         INNER JOIN language l ON l.id = a.language_id
         WHERE a.id in ({",".join(ids_as_str)})"""
-        df = pd.read_sql(query, con=self.db_connection)
+        df = self.run_query(query)
         self.__add_feed_name(df, feed_df)
         return df
 
     def get_language_df(self):
         print("Getting Languages...")
         query = "SELECT * from language"
-        return pd.read_sql(query, con=self.db_connection)
+        return self.run_query(query)
 
     def get_feed_df(self):
         print("Getting Feeds...")
@@ -134,45 +233,42 @@ class DataExtractor:
         FROM feed f
         INNER JOIN language l ON f.language_id = l.id
         """
-        feed_pd = pd.read_sql(query, con=self.db_connection)
+        feed_pd = self.run_query(query)
         feed_pd["Feed Name"] = (
             feed_pd["id"].astype(str) + " " + feed_pd["title"].str[:15]
         )
-        return pd.read_sql(query, con=self.db_connection)
+        return feed_pd
 
     def get_user_reading_activity(self, language_df, feed_df):
         print("Getting User Activity...")
-        query = f"""SELECT a.id, a.language_id, a.feed_id, urs.user_id, SUM(urs.duration) total_reading_time
-        FROM article a 
-        INNER JOIN user_reading_session urs ON urs.article_id = a.id 
-        INNER JOIN user u ON urs.user_id = u.id
-        WHERE DATEDIFF(CURDATE(), urs.start_time) <= {self.DAYS_FOR_REPORT}
-        AND u.learned_language_id = a.language_id
-        GROUP BY a.id, a.language_id, a.feed_id, urs.user_id"""
-        reading_time_df = pd.read_sql(query, con=self.db_connection)
-        # Add the Language Name
-        reading_time_df["Language"] = reading_time_df.language_id.apply(
-            lambda x: language_df.loc[language_df.id == x, "name"].values[0]
+
+        def query_for_day(start, end):
+            return f"""SELECT a.id, a.language_id, a.feed_id, urs.user_id, SUM(urs.duration) total_reading_time
+            FROM article a 
+            INNER JOIN user_reading_session urs ON urs.article_id = a.id 
+            INNER JOIN user u ON urs.user_id = u.id
+            WHERE urs.start_time >= '{start}' AND urs.start_time < '{end}'
+            AND u.learned_language_id = a.language_id
+            GROUP BY a.id, a.language_id, a.feed_id, urs.user_id"""
+
+        reading_time_df = self.run_daily_query(
+            "user_reading_activity",
+            query_for_day,
+            ["id", "language_id", "feed_id", "user_id"],
+            ["total_reading_time"],
         )
-        # Add the Source Names
-        reading_time_df["Feed Name"] = "No Feed"
-        valid_feed_mask = ~reading_time_df["feed_id"].isna()
-        reading_time_df.loc[valid_feed_mask, "Feed Name"] = reading_time_df.loc[
-            valid_feed_mask, "feed_id"
-        ].apply(lambda x: feed_df.loc[feed_df.id == x, "title"].values[0])
-        reading_time_df.loc[valid_feed_mask, "Feed Name"] = (
-            reading_time_df.loc[valid_feed_mask].feed_id.apply(int).astype(str)
-            + " "
-            + reading_time_df.loc[valid_feed_mask, "Feed Name"].str[:15]
+        self.add_language_to_df(reading_time_df, language_df)
+        self.__add_feed_name(reading_time_df, feed_df)
+        reading_time_df["total_reading_time"] = ms_to_mins(
+            reading_time_df["total_reading_time"]
         )
-        reading_time_df["total_reading_time"] = reading_time_df[
-            "total_reading_time"
-        ].apply(ms_to_mins)
         return reading_time_df
 
     def get_exercise_type_activity(self):
         print("Getting Exercise Type Activity...")
-        query = f"""SELECT l.name as Language, es.source as Source, sum(e.solving_speed) total_exercise_time, Count(*) total_exercises
+
+        def query_for_day(start, end):
+            return f"""SELECT l.name as Language, es.source as Source, sum(e.solving_speed) total_exercise_time, Count(*) total_exercises
                 FROM user u 
                 INNER JOIN user_exercise_session ues ON ues.user_id = u.id
                 INNER JOIN exercise e ON e.session_id = ues.id
@@ -181,17 +277,25 @@ class DataExtractor:
                 INNER JOIN user_word uw ON b.origin_id = uw.id
                 INNER JOIN exercise_source es on es.id = e.source_id
                 INNER JOIN language l on uw.language_id = l.id and uw.language_id = u.learned_language_id
-                WHERE DATEDIFF(CURDATE(), ues.last_action_time) <= {self.DAYS_FOR_REPORT}
+                WHERE e.time >= '{start}' AND e.time < '{end}'
                 GROUP BY u.learned_language_id, es.source"""
-        total_exercise_activity = pd.read_sql(query, con=self.db_connection)
-        total_exercise_activity["total_exercise_time"] = total_exercise_activity[
-            "total_exercise_time"
-        ].apply(ms_to_mins)
+
+        total_exercise_activity = self.run_daily_query(
+            "exercise_type_activity",
+            query_for_day,
+            ["Language", "Source"],
+            ["total_exercise_time", "total_exercises"],
+        )
+        total_exercise_activity["total_exercise_time"] = ms_to_mins(
+            total_exercise_activity["total_exercise_time"]
+        )
         return total_exercise_activity
 
     def get_user_exercise_activity(self):
         print("Getting User Exercise Activity...")
-        query = f"""SELECT u.id user_id, l.name Language, sum(e.solving_speed) total_exercise_time
+
+        def query_for_day(start, end):
+            return f"""SELECT u.id user_id, l.name Language, sum(e.solving_speed) total_exercise_time
                     FROM user u
                     INNER JOIN user_exercise_session ues ON ues.user_id = u.id
                     INNER JOIN exercise e ON e.session_id = ues.id
@@ -200,11 +304,17 @@ class DataExtractor:
                     INNER JOIN user_word uw ON b.origin_id = uw.id
                     INNER JOIN exercise_source es on es.id = e.source_id
                     INNER JOIN language l on uw.language_id = l.id and uw.language_id = u.learned_language_id
-                    WHERE DATEDIFF(CURDATE(), ues.last_action_time) <= {self.DAYS_FOR_REPORT}
+                    WHERE e.time >= '{start}' AND e.time < '{end}'
                     GROUP BY u.id;"""
-        total_user_exercise_activity = pd.read_sql(query, con=self.db_connection)
-        total_user_exercise_activity["total_exercise_time"] = (
-            total_user_exercise_activity["total_exercise_time"].apply(ms_to_mins)
+
+        total_user_exercise_activity = self.run_daily_query(
+            "user_exercise_activity",
+            query_for_day,
+            ["user_id", "Language"],
+            ["total_exercise_time"],
+        )
+        total_user_exercise_activity["total_exercise_time"] = ms_to_mins(
+            total_user_exercise_activity["total_exercise_time"]
         )
         return total_user_exercise_activity
 
@@ -219,9 +329,9 @@ class DataExtractor:
                     WHERE DATEDIFF(CURDATE(), b.time) <= {self.DAYS_FOR_REPORT}
                     GROUP by b.id;
                 """
-        bookmarks = pd.read_sql(query, con=self.db_connection)
-        bookmarks["Has Exercised"] = bookmarks.last_exercise.apply(
-            lambda x: "No" if pd.isna(x) else "Yes"
+        bookmarks = self.run_query(query)
+        bookmarks["Has Exercised"] = bookmarks.last_exercise.notna().map(
+            {True: "Yes", False: "No"}
         )
         return bookmarks
 
@@ -262,20 +372,28 @@ class DataExtractor:
 
     def get_topic_reading_time(self):
         print("Getting New Topic Reading Times...")
-        query = f"""SELECT l.name as Language, t.title Topic, SUM(urs.duration) total_reading_time
-        FROM article a 
-        LEFT JOIN article_topic_map atm on a.id = atm.article_id
-        LEFT JOIN topic t on atm.topic_id = t.id
-        INNER JOIN user_reading_session urs ON urs.article_id = a.id
-        INNER JOIN language l on a.language_id = l.id
-        INNER JOIN user u ON urs.user_id = u.id
-        WHERE DATEDIFF(CURDATE(), urs.start_time) <= {self.DAYS_FOR_REPORT}
-        AND u.learned_language_id = a.language_id
-        GROUP BY a.language_id, atm.topic_id;"""
-        topic_reading_time_df = pd.read_sql(query, con=self.db_connection)
-        topic_reading_time_df["total_reading_time"] = topic_reading_time_df[
-            "total_reading_time"
-        ].apply(ms_to_mins)
+
+        def query_for_day(start, end):
+            return f"""SELECT l.name as Language, t.title Topic, SUM(urs.duration) total_reading_time
+            FROM article a 
+            LEFT JOIN article_topic_map atm on a.id = atm.article_id
+            LEFT JOIN topic t on atm.topic_id = t.id
+            INNER JOIN user_reading_session urs ON urs.article_id = a.id
+            INNER JOIN language l on a.language_id = l.id
+            INNER JOIN user u ON urs.user_id = u.id
+            WHERE urs.start_time >= '{start}' AND urs.start_time < '{end}'
+            AND u.learned_language_id = a.language_id
+            GROUP BY a.language_id, atm.topic_id;"""
+
+        topic_reading_time_df = self.run_daily_query(
+            "topic_reading_time",
+            query_for_day,
+            ["Language", "Topic"],
+            ["total_reading_time"],
+        )
+        topic_reading_time_df["total_reading_time"] = ms_to_mins(
+            topic_reading_time_df["total_reading_time"]
+        )
         topic_reading_time_df.loc[topic_reading_time_df["Topic"].isna(), "Topic"] = (
             "Unclassified"
         )
@@ -289,7 +407,7 @@ class DataExtractor:
                     ON s.id = s_sub.search_id
                     GROUP by search_id
                     ORDER BY total_users DESC;"""
-        top_search_subscriptions_df = pd.read_sql(query, con=self.db_connection)
+        top_search_subscriptions_df = self.run_query(query)
         return top_search_subscriptions_df
 
     def get_added_search_subscriptions(self):
@@ -299,9 +417,7 @@ class DataExtractor:
                     WHERE event like 'SUBSCRIBE_TO_SEARCH'
                     AND value in (SELECT keywords from search)
                     AND DATEDIFF(CURDATE(), time) <= {self.DAYS_FOR_REPORT};"""
-        newly_added_subscriptions = list(
-            pd.read_sql(query, con=self.db_connection)["search"].values
-        )
+        newly_added_subscriptions = list(self.run_query(query)["search"].values)
         return newly_added_subscriptions
 
     def get_top_search_filters(self):
@@ -312,18 +428,16 @@ class DataExtractor:
                     ON s.id = s_f.search_id
                     GROUP by search_id
                     ORDER BY total_users DESC;"""
-        top_search_filters_df = pd.read_sql(query, con=self.db_connection)
+        top_search_filters_df = self.run_query(query)
         return top_search_filters_df
 
     def add_language_to_df(self, df, language_data):
-        df["Language"] = df.language_id.apply(
-            lambda x: language_data.loc[language_data.id == x, "name"].values[0]
+        language_names = pd.Series(
+            language_data["name"].values, index=language_data["id"].values
         )
+        df["Language"] = df.language_id.map(language_names)
 
     def add_stats_to_feed(self, feed_df, article_df):
-        feed_count = article_df.feed_id.value_counts().reset_index()
-        feed_count["feed_id"] = feed_count["feed_id"].apply(int)
-        feed_count = feed_count.set_index("feed_id")
-        count_dictionary = feed_count.to_dict()["count"]
-        feed_df["Count"] = feed_df.id.apply(lambda x: count_dictionary.get(int(x), 0))
+        feed_count = article_df.feed_id.dropna().astype(int).value_counts()
+        feed_df["Count"] = feed_df.id.astype(int).map(feed_count).fillna(0).astype(int)
         self.__add_feed_name(feed_df, feed_df, "id")
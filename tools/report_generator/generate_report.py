@@ -17,6 +17,12 @@ FOLDER_FOR_REPORT_OUTPUT = os.environ.get(
     "FOLDER_FOR_REPORT_OUTPUT",
     os.path.join(pathlib.Path(__file__).parent.resolve(), "reports"),
 )
+# the activity data of the past days is cached here, so reports
+# for overlapping periods only need to query the new days
+FOLDER_FOR_REPORT_DATA_CACHE = os.environ.get(
+    "FOLDER_FOR_REPORT_DATA_CACHE",
+    os.path.join(FOLDER_FOR_REPORT_OUTPUT, "data_cache"),
+)
 
 
 def set_legend_to_right_side(ax):
@@ -513,7 +519,9 @@ def generate_top_opened_articles(
 
 
 def generate_html_page():
-    data_extractor = DataExtractor(db_connection, DAYS_FOR_REPORT)
+    data_extractor = DataExtractor(
+        db_connection, DAYS_FOR_REPORT, cache_folder=FOLDER_FOR_REPORT_DATA_CACHE
+    )
 
     feed_df = data_extractor.get_feed_df()
     article_df = data_extractor.get_article_df(feed_df)
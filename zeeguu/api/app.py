@@ -70,6 +70,11 @@ def create_app(testing=False):
     with app.app_context():
         db.create_all()
 
+        # the models and lookup tables to load at startup are in the config
+        from zeeguu.api.model_preloading import preload_models
+
+        preload_models(app)
+
     from .endpoints import api
 
     app.register_blueprint(api)
@@ -34,18 +34,47 @@ def upload_user_activity_data():
     """
     user = User.find_by_id(flask.g.user_id)
     UserActivityData.create_from_post_data(db_session, request.form, user)
+    _after_event_upload(user, request.form)
 
-    if request.form.get("article_id", None):
-        distill_article_interactions(db_session, user, request.form)
+    return "OK"
 
-    if request.form.get("event") == "AUDIO_EXP":
-        from zeeguu.core.emailer.zeeguu_mailer import ZeeguuMailer
 
-        ZeeguuMailer.notify_audio_experiment(request.form, user)
+@api.route("/upload_user_activity_data_batch", methods=["POST"])
+@cross_domain
+@requires_session
+def upload_user_activity_data_batch():
+    """
+    Batch version of /upload_user_activity_data, for the clients that
+    buffer their events (e.g. the scrolls of a reading session) and send
+    them together.
+
+    Expects a JSON body of the form:
+        {"events": [{"time": ..., "event": ..., "value": ...,
+                     "extra_data": ..., "source_id": ...}, ...]}
+
+    Every event has the same parameters as in /upload_user_activity_data.
+    :return: OK if all went well
+    """
+    user = User.find_by_id(flask.g.user_id)
+    events = request.json.get("events", [])
+
+    UserActivityData.create_all_from_post_data(db_session, events, user)
+    for each in events:
+        _after_event_upload(user, each)
 
     return "OK"
 
 
+def _after_event_upload(user, data):
+    if data.get("article_id", None):
+        distill_article_interactions(db_session, user, data)
+
+    if data.get("event") == "AUDIO_EXP":
+        from zeeguu.core.emailer.zeeguu_mailer import ZeeguuMailer
+
+        ZeeguuMailer.notify_audio_experiment(data, user)
+
+
 @api.route("/days_since_last_use", methods=["GET"])
 @cross_domain
 @requires_session
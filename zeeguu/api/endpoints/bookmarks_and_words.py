@@ -4,13 +4,20 @@ import flask
 from flask import request
 from sqlalchemy.orm.exc import NoResultFound
 
-from zeeguu.core.model import User, Article, Bookmark, ExerciseSource, ExerciseOutcome
+from zeeguu.core.model import (
+    User,
+    Article,
+    Bookmark,
+    DailyActivity,
+    ExerciseSource,
+    ExerciseOutcome,
+)
 from zeeguu.core.model.bookmark_user_preference import UserWordExPreference
 from . import api, db_session
 from zeeguu.api.utils.json_result import json_result
 from zeeguu.api.utils.parse_json_boolean import parse_json_boolean
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
-from zeeguu.core.word_scheduling import BasicSRSchedule
+from zeeguu.core.word_scheduling import BasicSRSchedule, StudyQueueEntry
 
 
 @api.route("/user_words", methods=["GET"])
@@ -157,6 +164,7 @@ def delete_bookmark(bookmark_id):
     try:
         bookmark = Bookmark.find(bookmark_id)
 
+        DailyActivity.record_bookmark(db_session, bookmark, -1)
         db_session.delete(bookmark)
         db_session.commit()
     except NoResultFound:
@@ -197,9 +205,10 @@ def set_user_word_exercise_preference(bookmark_id):
 def set_user_word_exercise_dislike(bookmark_id):
     bookmark = Bookmark.find(bookmark_id)
     bookmark.user_preference = UserWordExPreference.DONT_USE_IN_EXERCISES
-    bookmark.update_fit_for_study()
 
     BasicSRSchedule.clear_bookmark_schedule(db_session, bookmark)
+    # also refreshes the study queue entry, now that the schedule is gone
+    bookmark.update_fit_for_study()
     db_session.commit()
     return "OK"
 
@@ -210,6 +219,7 @@ def set_user_word_exercise_dislike(bookmark_id):
 def set_is_fit_for_study(bookmark_id):
     bookmark = Bookmark.find(bookmark_id)
     bookmark.fit_for_study = True
+    StudyQueueEntry.refresh(db_session, bookmark)
     db_session.commit()
     return "OK"
 
@@ -222,6 +232,7 @@ def set_not_fit_for_study(bookmark_id):
     bookmark.fit_for_study = False
 
     BasicSRSchedule.clear_bookmark_schedule(db_session, bookmark)
+    StudyQueueEntry.refresh(db_session, bookmark)
     db_session.commit()
     return "OK"
 
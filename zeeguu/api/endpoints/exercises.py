@@ -1,6 +1,9 @@
 import traceback
+from datetime import datetime
+
 import flask
 
+from zeeguu.core.constants import JSON_TIME_FORMAT
 from zeeguu.core.exercises.similar_words import similar_words
 from zeeguu.core.model import Bookmark, User
 
@@ -225,6 +228,56 @@ def report_exercise_outcome():
         return "FAIL"
 
 
+@api.route(
+    "/report_exercise_outcomes",
+    methods=["POST"],
+)
+@requires_session
+def report_exercise_outcomes():
+    """
+    Batch version of /report_exercise_outcome: reports all the outcomes
+    of an exercise session in one request.
+
+    Expects a JSON body of the form:
+        {"outcomes": [{"bookmark_id": ..., "outcome": ..., "source": ...,
+                       "solving_speed": ..., "session_id": ...,
+                       "other_feedback": ...}, ...]}
+
+    Each of the outcomes has the same parameters as in /report_exercise_outcome,
+    and optionally the time, in JSON_TIME_FORMAT
+    :return: "OK" if all the outcomes were recorded; "FAIL" if none was,
+    e.g. because one of the bookmarks is not of the user, so the batch
+    can be sent again
+    """
+
+    try:
+        outcomes = [_parse_outcome(each) for each in request.json.get("outcomes", [])]
+        user = User.find_by_id(flask.g.user_id)
+        Bookmark.report_exercise_outcomes(db_session, user, outcomes)
+
+        return "OK"
+    except:
+        db_session.rollback()
+        traceback.print_exc()
+        return "FAIL"
+
+
+def _parse_outcome(outcome):
+    """
+    :return: the outcome posted to /report_exercise_outcomes with the
+    values converted as expected by Bookmark.report_exercise_outcomes;
+    raises ValueError, KeyError or TypeError when one is missing or invalid
+    """
+    parsed = dict(outcome)
+    parsed["bookmark_id"] = int(outcome["bookmark_id"])
+    parsed["session_id"] = int(outcome["session_id"])
+    if not str(outcome.get("solving_speed", "")).isdigit():
+        parsed["solving_speed"] = 0
+    if outcome.get("time"):
+        parsed["time"] = datetime.strptime(outcome["time"], JSON_TIME_FORMAT)
+    return parsed
+
+
 @api.route("/similar_words/<bookmark_id>", methods=["GET"])
 @cross_domain
 @requires_session
@@ -1,10 +1,13 @@
 """
-    Function that captures a pattern that differs only in the name of the class
-    between UserExerciseSession and UserReadingSession
+Function that captures a pattern that differs only in the name of the class
+between UserExerciseSession and UserReadingSession
 """
 
 from datetime import datetime
 
+from zeeguu.core.model import DailyActivity, UserArticle, UserReadingSession
+from zeeguu.core.session_heartbeats import session_heartbeats
+
 
 def update_activity_session(session_class, request, db_session):
     form = request.form
@@ -12,10 +15,41 @@ def update_activity_session(session_class, request, db_session):
     session_id = int(form.get("id", ""))
     duration = int(form.get("duration", 0))
 
-    session = session_class.find_by_id(session_id)
+    # the heartbeat that is pending, if any, is older than this update
+    session_heartbeats().flush_session(session_class, session_id)
+
+    # locked, like in the heartbeat flushes, for the delta of the duration
+    session = (
+        session_class.query.filter(session_class.id == session_id)
+        .with_for_update()
+        .populate_existing()
+        .one()
+    )
+    DailyActivity.add_session_duration(
+        db_session, session, duration - (session.duration or 0)
+    )
     session.duration = duration
     session.last_action_time = datetime.now()
+    if session_class is UserReadingSession:
+        UserArticle.record_reading_time(db_session, session)
     db_session.add(session)
     db_session.commit()
 
     return session
+
+
+def record_session_heartbeat(session_class, request):
+    """
+    Like update_activity_session, for the periodic updates of the reading
+    and watching sessions; they are coalesced and written in the background
+    (see zeeguu/core/session_heartbeats.py).
+
+    :return: the id and the duration of the session
+    """
+    form = request.form
+    session_id = int(form.get("id", ""))
+    duration = int(form.get("duration", 0))
+
+    session_heartbeats().record(session_class, session_id, duration)
+
+    return session_id, duration
@@ -4,8 +4,7 @@ from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.api.utils.json_result import json_result
 from flask import request
 
-from zeeguu.core.nlp_pipeline import SpacyWrappers, NoiseWordsGenerator
-from zeeguu.core.nlp_pipeline import AutoGECTagging, ContextReducer
+from zeeguu.core.nlp_pipeline.nlp_service import nlp_service
 from zeeguu.core.model.language import Language
 from zeeguu.core.tokenization import get_tokenizer, TOKENIZER_MODEL
 
@@ -19,10 +18,11 @@ def do_some_spacy():
     phrase = request.form.get("phrase", "")
     language = request.form.get("language")
 
-    if language not in SpacyWrappers.keys():
+    nlp = nlp_service()
+    if not nlp.supports(language):
         return "Language not supported"
 
-    tokens = SpacyWrappers[language].tokenize_sentence(phrase)
+    tokens = nlp.tokenize_sentence(language, phrase)
 
     return json_result(tokens)
 
@@ -36,11 +36,12 @@ def create_confusion_words():
     original_sent = request.form.get("original_sent", "")
     language = request.form.get("language")
 
-    if language not in SpacyWrappers.keys():
+    nlp = nlp_service()
+    if not nlp.supports_confusion_words(language):
         return "Language not supported"
 
     # We should pass the student bookmark words as a fallback when no words are found.
-    noise_words = NoiseWordsGenerator[language].generate_confusion_words(original_sent)
+    noise_words = nlp.confusion_words(language, original_sent)
     return json_result(noise_words)
 
 
@@ -54,12 +55,11 @@ def annotate_clues():
     original_sentence = request.form.get("original_sentence", "")
     language = request.form.get("language")
 
-    if language not in SpacyWrappers.keys():
+    nlp = nlp_service()
+    if not nlp.supports(language):
         return "Language not supported"
 
-    updated_words = AutoGECTagging(SpacyWrappers[language], language).anottate_clues(
-        word_with_props, original_sentence
-    )
+    updated_words = nlp.annotate_clues(language, word_with_props, original_sentence)
 
     return json_result(updated_words)
 
@@ -74,14 +74,11 @@ def get_shorter_similar_sents_in_article():
     bookmark_context = request.form.get("bookmark_context", "")
     language = request.form.get("language")
 
-    if language not in SpacyWrappers.keys():
+    nlp = nlp_service()
+    if not nlp.supports(language):
         return "Language not supported"
 
-    nlp_pipe = SpacyWrappers[language]
-
-    result_json = ContextReducer.get_similar_sentences(
-        nlp_pipe, article_text, bookmark_context
-    )
+    result_json = nlp.similar_sentences(language, article_text, bookmark_context)
 
     return json_result(result_json)
 
@@ -97,13 +94,12 @@ def get_smaller_context():
     language = request.form.get("language")
     max_context = int(request.form.get("max_context_len"))
 
-    if language not in SpacyWrappers.keys():
+    nlp = nlp_service()
+    if not nlp.supports(language):
         return "Language not supported"
 
-    nlp_pipe = SpacyWrappers[language]
-    new_context_max_len = max_context
-    shorter_context = ContextReducer.reduce_context_for_bookmark(
-        nlp_pipe, bookmark_context, bookmark_word, new_context_max_len
+    shorter_context = nlp.smaller_context(
+        language, bookmark_context, bookmark_word, max_context
     )
 
     return json_result(shorter_context)
@@ -3,8 +3,12 @@ from flask import request
 
 from . import api, db_session
 from zeeguu.api.utils import requires_session, json_result
-from .helpers.activity_sessions import update_activity_session
+from .helpers.activity_sessions import (
+    record_session_heartbeat,
+    update_activity_session,
+)
 from ...core.model import UserReadingSession
+from ...core.session_heartbeats import session_heartbeats
 from datetime import datetime
 
 
@@ -27,8 +31,8 @@ def reading_session_start():
 )
 @requires_session
 def reading_session_update():
-    session = update_activity_session(UserReadingSession, request, db_session)
-    return json_result(dict(id=session.id, duration=session.duration))
+    session_id, duration = record_session_heartbeat(UserReadingSession, request)
+    return json_result(dict(id=session_id, duration=duration))
 
 
 @api.route(
@@ -47,6 +51,7 @@ def reading_session_end():
 )
 @requires_session
 def reading_session_info(id):
+    session_heartbeats().flush_session(UserReadingSession, int(id))
     reading_session = UserReadingSession.find_by_id(id)
 
     return json_result(dict(id=reading_session.id, duration=reading_session.duration))
@@ -16,7 +16,7 @@ from python_translators.translation_query import TranslationQuery
 from zeeguu.core.crowd_translations import (
     get_own_past_translation,
 )
-from zeeguu.core.model import Bookmark, User
+from zeeguu.core.model import Bookmark, User, StudyQueueEntry
 from zeeguu.core.model.user_word import UserWord
 from zeeguu.core.model.bookmark_context import BookmarkContext
 from . import api, db_session
@@ -286,6 +286,7 @@ def update_translation(bookmark_id):
 
     bookmark.origin = origin
     db_session.add(bookmark)
+    StudyQueueEntry.refresh(db_session, bookmark)
 
     updated_bookmark = bookmark.as_dictionary(
         with_exercise_info=True, with_context_tokenized=True, with_context=True
@@ -396,6 +397,57 @@ def contribute_translation(from_lang_code, to_lang_code):
     return json_result(dict(bookmark_id=bookmark.id))
 
 
+@api.route("/import_bookmarks/<from_lang_code>/<to_lang_code>", methods=["POST"])
+@cross_domain
+@requires_session
+def import_bookmarks(from_lang_code, to_lang_code):
+    """
+    Imports many bookmarks of the user at once, e.g. a word list from
+    another tool, with a single commit.
+
+    JSON body: {"bookmarks": [...]}, where every bookmark has the keys
+    word, translation and context, and optionally article_id, source_id,
+    context_identifier and the indices of /contribute_translation
+    (w_sent_i, w_token_i, w_total_tokens, c_paragraph_i, c_sent_i,
+    c_token_i, in_content, left_ellipsis, right_ellipsis)
+
+    :return: the ids of the bookmarks, in the order they were sent
+    """
+    bookmarks = []
+    for each in request.json["bookmarks"]:
+        context_identifier = each.get("context_identifier", None)
+        bookmarks.append(
+            dict(
+                origin=unquote_plus(each["word"]),
+                origin_lang=from_lang_code,
+                translation=each["translation"],
+                translation_lang=to_lang_code,
+                context=each.get("context", "").strip(),
+                article_id=each.get("article_id", None),
+                source_id=each.get("source_id", None),
+                sentence_i=each.get("w_sent_i", None),
+                token_i=each.get("w_token_i", None),
+                total_tokens=each.get("w_total_tokens", None),
+                c_paragraph_i=each.get("c_paragraph_i", None),
+                c_sentence_i=each.get("c_sent_i", None),
+                c_token_i=each.get("c_token_i", None),
+                in_content=parse_json_boolean(each.get("in_content", None)),
+                left_ellipsis=parse_json_boolean(each.get("left_ellipsis", None)),
+                right_ellipsis=parse_json_boolean(each.get("right_ellipsis", None)),
+                context_identifier=(
+                    ContextIdentifier.from_dictionary(context_identifier)
+                    if context_identifier
+                    else None
+                ),
+            )
+        )
+
+    user = User.find_by_id(flask.g.user_id)
+    imported = Bookmark.import_all(db_session, user, bookmarks)
+
+    return json_result(dict(bookmark_ids=[each.id for each in imported]))
+
+
 @api.route("/basic_translate/<from_lang_code>/<to_lang_code>", methods=["POST"])
 @cross_domain
 @requires_session
@@ -2,6 +2,9 @@ import flask
 from flask import request
 from zeeguu.core.model import Article, UserArticle, User
 from zeeguu.core.model.article_difficulty_feedback import ArticleDifficultyFeedback
+from zeeguu.core.content_recommender.recommendation_cache import (
+    user_interacted_with_content,
+)
 
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.api.utils.json_result import json_result
@@ -92,6 +95,7 @@ def article_opened():
     user = User.find_by_id(flask.g.user_id)
     ua = UserArticle.find_or_create(db_session, user, article)
     ua.set_opened()
+    user_interacted_with_content(db_session, user.id)
 
     db_session.add(ua)
     db_session.commit()
@@ -129,6 +133,7 @@ def user_article_update():
 
     if liked is not None:
         user_article.set_liked(liked in ["true", "True", "1"])
+        user_interacted_with_content(db_session, user.id)
 
     db_session.commit()
 
@@ -1,10 +1,11 @@
 import flask
 
 from zeeguu.core.content_recommender import (
-    article_recommendations_for_user,
     topic_filter_for_user,
     content_recommendations,
-    video_recommendations_for_user,
+)
+from zeeguu.core.content_recommender.recommendation_cache import (
+    recommendations_for_user,
 )
 from zeeguu.core.model import UserArticle, Article, PersonalCopy, User, Video
 
@@ -52,8 +53,7 @@ def user_articles_recommended(count: int = 20, page: int = 0):
 
     user = User.find_by_id(flask.g.user_id)
     try:
-        articles = article_recommendations_for_user(user, count, page)
-        videos = video_recommendations_for_user(user, 3, page)
+        articles, videos = recommendations_for_user(user, count, page)
         print("Total Videos found: ", len(videos))
         print("Total Articles found: ", len(articles))
     except Exception as e:
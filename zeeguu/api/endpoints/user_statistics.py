@@ -1,7 +1,10 @@
 import flask
 
 from zeeguu.api.utils import json_result
-from zeeguu.core.user_statistics.activity import activity_duration_by_day
+from zeeguu.core.user_statistics.activity import (
+    activity_duration_by_day,
+    bookmark_counts_by_date as bookmark_counts_by_date_from_rollup,
+)
 from . import api
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.core.model import User
@@ -15,7 +18,7 @@ def bookmark_counts_by_date():
     Words that have been translated in texts
     """
     user = User.find_by_id(flask.g.user_id)
-    return user.bookmark_counts_by_date()
+    return bookmark_counts_by_date_from_rollup(user)
 
 
 @api.route("/activity_by_day", methods=("GET",))
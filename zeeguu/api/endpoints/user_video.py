@@ -1,6 +1,9 @@
 import flask
 from flask import request
 from zeeguu.core.model import User, UserVideo, Video
+from zeeguu.core.content_recommender.recommendation_cache import (
+    user_interacted_with_content,
+)
 
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.api.utils.json_result import json_result
@@ -39,6 +42,7 @@ def video_opened():
     user = User.find_by_id(flask.g.user_id)
     user_video = UserVideo.find_or_create(db_session, user, video)
     user_video.set_opened()
+    user_interacted_with_content(db_session, user.id)
 
     db_session.add(user_video)
     db_session.commit()
@@ -2,7 +2,7 @@ from datetime import datetime
 import flask
 from flask import request
 
-from zeeguu.api.endpoints.helpers.activity_sessions import update_activity_session
+from zeeguu.api.endpoints.helpers.activity_sessions import record_session_heartbeat
 from zeeguu.api.utils import json_result, requires_session
 from zeeguu.core.model.user_watching_session import UserWatchingSession
 
@@ -26,5 +26,5 @@ def watching_session_start():
 # ---------------------------------------------------------------------------
 @requires_session
 def watching_session_update():
-    session = update_activity_session(UserWatchingSession, request, db_session)
-    return json_result(dict(id=session.id, duration=session.duration))
+    session_id, duration = record_session_heartbeat(UserWatchingSession, request)
+    return json_result(dict(id=session_id, duration=duration))
@@ -0,0 +1,95 @@
+"""
+Loading the models and lookup tables of the API before serving requests.
+
+Everything is loaded lazily by default. The languages listed in the
+config are loaded when the app is created instead:
+
+    PRELOAD_DISTRACTOR_POOLS = ["da", "de"]
+    PRELOAD_NLP_MODELS = ["da"]       # spaCy
+    PRELOAD_TOKENIZERS = ["da", "de"] # Stanza
+    PRELOAD_WORD_STATS = ["da", "de"] # wordstats rank tables
+    PRELOAD_PAYWALL_MODEL = True
+
+When the app is created in the master process of a pre-forking server
+(gunicorn with preload_app, see gunicorn.conf.py) the workers share the
+pages of these models with the master, as long as they don't write to
+them. Writes are not only ours: the garbage collector writes to the
+header of every object it scans. prepare_for_fork moves everything
+that is loaded to the permanent generation, so that the collections
+in the workers leave it alone.
+"""
+
+import gc
+
+from zeeguu.logging import log
+
+
+def preload_models(app):
+    """
+    To be called in an app context, after the tables are created.
+    """
+    config = app.config
+
+    # The small reference tables (languages, exercise outcomes, etc.)
+    # are cached in memory; load them before serving requests
+    from zeeguu.core.model import reference_data_cache
+
+    reference_data_cache.preload()
+
+    # Building the distractor pool of a language takes a few seconds;
+    # the languages listed here are built at startup instead of
+    # on the first exercise that needs them
+    from zeeguu.core.exercises.distractor_pool import preload_distractor_pools
+
+    preload_distractor_pools(config.get("PRELOAD_DISTRACTOR_POOLS", []))
+
+    # The spaCy models are otherwise loaded when first used; not needed
+    # at all when the NLP endpoints are served by a separate worker
+    from zeeguu.core.nlp_pipeline.nlp_service import check_nlp_worker_config
+
+    check_nlp_worker_config(config)
+    if not config.get("NLP_WORKER_ADDRESS"):
+        from zeeguu.core import nlp_pipeline
+
+        nlp_pipeline.preload(config.get("PRELOAD_NLP_MODELS", []))
+
+    if config.get("PRELOAD_TOKENIZERS"):
+        from zeeguu.core.model import Language
+        from zeeguu.core.tokenization import get_tokenizer, TOKENIZER_MODEL
+
+        for code in config.get("PRELOAD_TOKENIZERS"):
+            # the pipelines are cached in StanzaTokenizer.CACHED_NLP_PIPELINES
+            get_tokenizer(Language.find(code), TOKENIZER_MODEL)
+
+    if config.get("PRELOAD_WORD_STATS"):
+        from zeeguu.core.word_stats import lang_info
+
+        for code in config.get("PRELOAD_WORD_STATS"):
+            lang_info(code)
+
+    if config.get("PRELOAD_PAYWALL_MODEL"):
+        from zeeguu.core.ml_models.paywall_detector import paywall_tfidf_model
+
+        paywall_tfidf_model()
+
+
+def prepare_for_fork():
+    """
+    To be called in the master process, right before forking a worker.
+    """
+    gc.collect()
+    gc.freeze()
+    log(f"Froze {gc.get_freeze_count()} objects before forking")
+
+
+def after_fork(app):
+    """
+    To be called in a worker, right after it was forked. The database
+    connections opened by the master can't be shared with the workers;
+    they are dropped (without being closed, they still belong to the
+    master) and each worker opens its own.
+    """
+    from zeeguu.core.model import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,43 @@
+from fixtures import logged_in_client as client
+
+from zeeguu.core.model import UserActivityData
+
+SCROLL = dict(
+    time="2026-10-19T10:11:12.000Z",
+    event="SCROLL",
+    value="[1200, 800]",
+    extra_data="[[0, 0.1], [3, 0.2]]",
+)
+
+
+def test_upload_user_activity_data(client):
+    client.post("/upload_user_activity_data", data=SCROLL)
+
+    [stored] = UserActivityData.query.all()
+    assert stored.event == "SCROLL"
+    assert stored.extra_data == SCROLL["extra_data"]
+
+
+def test_the_same_event_is_stored_once(client):
+    client.post("/upload_user_activity_data", data=SCROLL)
+    client.post("/upload_user_activity_data", data=SCROLL)
+
+    assert UserActivityData.query.count() == 1
+
+
+def test_upload_user_activity_data_batch(client):
+    events = [
+        dict(SCROLL, time=f"2026-10-19T10:11:{second:02}.000Z") for second in range(15)
+    ]
+    # JSON clients can send the extra data as an object
+    events.append(dict(SCROLL, event="OPEN ARTICLE", extra_data={"a": 1}))
+    # duplicates within the batch and of an earlier upload are dropped
+    client.post("/upload_user_activity_data", data=SCROLL)
+    events.append(dict(SCROLL))
+
+    result = client.post("/upload_user_activity_data_batch", json=dict(events=events))
+
+    assert result == b"OK"
+    assert UserActivityData.query.count() == 16
+    opened = UserActivityData.query.filter_by(event="OPEN ARTICLE").one()
+    assert opened.extra_data == '{"a": 1}'
@@ -16,6 +16,18 @@ def test_delete(client):
     assert bookmarks is not []
 
 
+def test_bookmark_counts_by_date(client):
+    add_context_types()
+    add_source_types()
+    bookmark_id = add_one_bookmark(client)
+
+    counts = client.get("/bookmark_counts_by_date")
+    assert counts[0]["count"] == 1
+
+    client.post(f"delete_bookmark/{bookmark_id}")
+    assert client.get("/bookmark_counts_by_date") == []
+
+
 def test_last_bookmark_added_is_first_in_bookmarks_by_day(client):
     add_context_types()
     add_source_types()
@@ -35,3 +35,36 @@ def test_create_and_delete_bookmark(client):
 
     response = client.post(f"/delete_bookmark/{new_bookmark_id}")
     assert response == b"OK"
+
+
+def test_import_bookmarks(client):
+    add_context_types()
+    add_source_types()
+    from zeeguu.core.model.bookmark_context import ContextIdentifier
+    from zeeguu.core.model.context_type import ContextType
+
+    article = create_and_get_article(client)
+    context_i = ContextIdentifier(ContextType.ARTICLE_TITLE, None, article["id"])
+    words = [("hinter", "behind"), ("Präsident", "president"), ("stellt", "puts")]
+
+    response = client.post(
+        "/import_bookmarks/de/en",
+        json={
+            "bookmarks": [
+                {
+                    "word": word,
+                    "translation": translation,
+                    "context": "stellt sich hinter Präsident",
+                    "article_id": article["id"],
+                    "source_id": article["source_id"],
+                    "context_identifier": context_i.as_dictionary(),
+                }
+                for word, translation in words
+            ]
+        },
+    )
+
+    assert len(set(response["bookmark_ids"])) == 3
+
+    bookmarks_by_day = client.post("/bookmarks_by_day")
+    assert len(bookmarks_by_day[0]["bookmarks"]) == 3
@@ -39,3 +39,62 @@ def test_add_exercise_to_session(client):
 
     session_info = client.get(f"/exercise_session_info/{session_id}")
     assert session_info["duration"] == 2000
+
+
+def test_add_exercise_outcomes_in_bulk(client):
+    add_context_types()
+    add_source_types()
+    bookmark_id = add_one_bookmark(client)
+    session_id = test_start_new_exercise_session(client)
+
+    outcome = dict(
+        outcome="W",
+        source="Recognize",
+        solving_speed=100,
+        bookmark_id=bookmark_id,
+        session_id=session_id,
+    )
+    response = client.post(
+        "/report_exercise_outcomes",
+        json=dict(outcomes=[outcome, {**outcome, "outcome": "C"}]),
+    )
+    assert b"OK" == response
+
+    exercise_log = client.get(f"/get_exercise_log_for_bookmark/{bookmark_id}")
+    assert len(exercise_log) == 2
+
+
+def test_outcomes_in_bulk_are_recorded_all_or_none(client):
+    add_context_types()
+    add_source_types()
+    bookmark_id = add_one_bookmark(client)
+    session_id = test_start_new_exercise_session(client)
+
+    outcome = dict(
+        outcome="C",
+        source="Recognize",
+        solving_speed=100,
+        bookmark_id=bookmark_id,
+        session_id=session_id,
+    )
+    for invalid in [
+        # not a bookmark of the user
+        {**outcome, "bookmark_id": bookmark_id + 1000},
+        {**outcome, "session_id": "not a number"},
+        {**outcome, "time": "yesterday"},
+    ]:
+        response = client.post(
+            "/report_exercise_outcomes", json=dict(outcomes=[outcome, invalid])
+        )
+        assert b"FAIL" == response
+
+    exercise_log = client.get(f"/get_exercise_log_for_bookmark/{bookmark_id}")
+    assert len(exercise_log) == 0
+
+    response = client.post(
+        "/report_exercise_outcomes",
+        json=dict(outcomes=[{**outcome, "time": "2026-10-19T10:00:00.000Z"}]),
+    )
+    assert b"OK" == response
+    exercise_log = client.get(f"/get_exercise_log_for_bookmark/{bookmark_id}")
+    assert exercise_log[0]["time"] == "10/19/2026"
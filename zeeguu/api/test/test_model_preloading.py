@@ -0,0 +1,27 @@
+import gc
+
+from fixtures import test_app
+
+from zeeguu.api.model_preloading import after_fork, prepare_for_fork, preload_models
+from zeeguu.core.model import db
+from zeeguu.core.word_stats import lang_cache
+
+
+def test_configured_models_are_preloaded(test_app):
+    test_app.config["PRELOAD_WORD_STATS"] = ["de"]
+
+    preload_models(test_app)
+
+    assert "de" in lang_cache
+
+
+def test_forked_workers_open_their_own_connections(test_app):
+    prepare_for_fork()
+    try:
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+    after_fork(test_app)
+
+    assert db.session.execute(db.text("select 1")).scalar() == 1
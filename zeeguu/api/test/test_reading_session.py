@@ -1,4 +1,10 @@
-from fixtures import logged_in_client as client, add_one_bookmark
+from fixtures import (
+    logged_in_client as client,
+    add_one_bookmark,
+    create_and_get_article,
+    add_context_types,
+    add_source_types,
+)
 
 
 def test_start_new_reading_session(client):
@@ -23,3 +29,17 @@ def test_end_reading_session(client):
     result = client.post("/reading_session_end", data=dict(id=session_id))
 
     assert result == b"OK"
+
+
+def test_reading_time_is_added_to_activity_by_day(client):
+    add_context_types()
+    add_source_types()
+    article = create_and_get_article(client)
+    session = client.post("/reading_session_start", data=dict(article_id=article["id"]))
+
+    client.post("/reading_session_update", data=dict(id=session["id"], duration=2000))
+    client.post("/reading_session_end", data=dict(id=session["id"], duration=5000))
+
+    activity = client.get("/activity_by_day")
+    assert activity["reading"][0]["seconds"] == 5
+    assert activity["exercises"] == []
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+# Each of these takes from a few hundred ms to a few seconds to import;
+# they are imported by the code that needs them, on first use
+HEAVY_MODULES = [
+    "stanza",
+    "torch",
+    "spacy",
+    "nltk",
+    "sklearn",
+    "joblib",
+    "pandas",
+    "confusionwords",
+]
+
+SCRIPT = """
+import sys
+from zeeguu.api.app import create_app
+create_app(testing=True)
+print("imported:", ",".join(m for m in sys.argv[1:] if m in sys.modules))
+"""
+
+
+def test_creating_the_app_does_not_import_heavy_modules():
+    # in a fresh interpreter, since the other tests import all of them
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *HEAVY_MODULES],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    [imported] = [
+        line for line in result.stdout.splitlines() if line.startswith("imported:")
+    ]
+    assert imported == "imported: "
@@ -0,0 +1,243 @@
+"""
+Ingestion of the user activity events (scrolls, opens, likes, audio, ...).
+
+The events of the requests are put in a bounded in-process queue and a
+background thread writes them in batches: every batch is deduplicated in
+memory and stored with one multi-row INSERT that ignores the events that
+are already in the DB (see UserActivityData.insert_ignoring_duplicates).
+Thus a request does not wait for the DB, and the highest volume events,
+the scrolls, cost a fraction of a round trip each. The scrolls of every
+batch also update the reading completion of the articles (see
+UserArticle.record_scroll_events).
+
+When the queue is full the writer can't keep up; the request then writes
+its own events instead of dropping them, and the metrics count it.
+
+BUFFERED_ACTIVITY_INGESTION=False in the config (the default for the
+tests) makes every request write its events before returning.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+import zeeguu.core
+from zeeguu.logging import log, warning
+
+MAX_BUFFERED_EVENTS = 10000
+BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class ActivityIngestion:
+    def __init__(
+        self,
+        app,
+        buffered=True,
+        max_buffered_events=MAX_BUFFERED_EVENTS,
+        batch_size=BATCH_SIZE,
+        flush_interval=FLUSH_INTERVAL_SECONDS,
+    ):
+        self.app = app
+        self.buffered = buffered
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_buffered_events)
+
+        self._metrics = dict(
+            submitted=0,
+            written=0,
+            duplicates=0,
+            failed=0,
+            batches=0,
+            written_by_requests=0,
+            max_queue_depth=0,
+            last_batch_ms=0,
+        )
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._writer = None
+        self._writer_pid = None
+
+    def submit(self, rows):
+        """
+        :param rows: list of dicts with the columns of UserActivityData
+        """
+        self._count("submitted", len(rows))
+        if not self.buffered:
+            self._write(rows)
+            return
+
+        self._ensure_writer()
+        overflow = []
+        for row in rows:
+            try:
+                self.queue.put_nowait(row)
+            except queue.Full:
+                overflow.append(row)
+
+        with self._lock:
+            self._metrics["max_queue_depth"] = max(
+                self._metrics["max_queue_depth"], self.queue.qsize()
+            )
+
+        if overflow:
+            warning(f"activity queue full; writing {len(overflow)} events in request")
+            self._count("written_by_requests", len(overflow))
+            self._write(overflow)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics, queue_depth=self.queue.qsize())
+
+    def flush(self):
+        """
+        Writes everything that is queued, in the calling thread.
+        """
+        while True:
+            batch = self._next_batch(wait=False)
+            if not batch:
+                return
+            with self.app.app_context():
+                self._write(batch)
+
+    def stop(self, timeout=10):
+        """
+        Stops the writer after it wrote what is queued. Registered to run
+        at exit, so that the events are not lost when a worker shuts down.
+        """
+        self._stopping.set()
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._writer.join(timeout)
+        self.flush()
+        log(f"activity ingestion stopped: {self.metrics()}")
+
+    def _ensure_writer(self):
+        # a worker forked from a preloaded master does not inherit its thread
+        if self._writer is not None and self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer is not None and self._writer_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._writer = threading.Thread(
+                target=self._run, name="activity-writer", daemon=True
+            )
+            self._writer_pid = os.getpid()
+            self._writer.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch(wait=True)
+            if batch:
+                with self.app.app_context():
+                    self._write(batch)
+
+    def _next_batch(self, wait):
+        """
+        :return: up to batch_size events, waiting at most flush_interval
+        for them to accumulate when wait is True
+        """
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if wait and remaining > 0 and not self._stopping.is_set():
+                    # in short slices, so that stop() does not have to wait
+                    batch.append(self.queue.get(timeout=min(remaining, 0.1)))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                if not wait or self._stopping.is_set() or remaining <= 0:
+                    break
+        return batch
+
+    def _write(self, rows):
+        from zeeguu.core.model import db, UserActivityData, UserArticle
+
+        unique = {}
+        for row in rows:
+            unique.setdefault(UserActivityData.deduplication_key(row), row)
+
+        start = time.monotonic()
+        written = list(unique.values())
+        try:
+            inserted = UserActivityData.insert_ignoring_duplicates(db.session, written)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            warning(f"could not write {len(written)} activity events at once: {e}")
+            # so that one bad event does not lose the ones of everyone else
+            inserted, written = self._write_one_by_one(written)
+            if not written:
+                return
+
+        with self._lock:
+            self._metrics["written"] += inserted
+            self._metrics["duplicates"] += (
+                len(rows) - len(unique) + len(written) - inserted
+            )
+            self._metrics["batches"] += 1
+            self._metrics["last_batch_ms"] = int((time.monotonic() - start) * 1000)
+
+        try:
+            UserArticle.record_scroll_events(db.session, written)
+            db.session.commit()
+        except Exception as e:
+            # the events are stored; the completion catches up with the next ones
+            db.session.rollback()
+            warning(f"could not update the reading completion: {e}")
+
+    def _write_one_by_one(self, rows):
+        """
+        :return: the number of inserted rows, and the rows that were written
+        """
+        from zeeguu.core.model import db, UserActivityData
+
+        inserted, written = 0, []
+        for row in rows:
+            try:
+                inserted += UserActivityData.insert_ignoring_duplicates(
+                    db.session, [row]
+                )
+                db.session.commit()
+                written.append(row)
+            except Exception as e:
+                db.session.rollback()
+                self._count("failed", 1)
+                warning(f"could not write the activity event {row}: {e}")
+        return inserted, written
+
+    def _count(self, metric, n):
+        with self._lock:
+            self._metrics[metric] += n
+
+
+_ingestion = None
+
+
+def activity_ingestion():
+    """
+    :return: the ingestion of this process, created on first use
+    """
+    global _ingestion
+
+    app = zeeguu.core.app
+    if _ingestion is None or _ingestion.app is not app:
+        _ingestion = ActivityIngestion(
+            app,
+            buffered=app.config.get("BUFFERED_ACTIVITY_INGESTION", not app.testing),
+            max_buffered_events=app.config.get(
+                "MAX_BUFFERED_ACTIVITY_EVENTS", MAX_BUFFERED_EVENTS
+            ),
+        )
+    return _ingestion
+
+
+def flush_activity_ingestion():
+    if _ingestion is not None:
+        _ingestion.stop()
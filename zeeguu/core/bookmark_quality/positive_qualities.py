@@ -1,5 +1,5 @@
 from zeeguu.core.bookmark_quality.negative_qualities import bad_quality_bookmark
 
 
-def quality_bookmark(bookmark):
-    return not bad_quality_bookmark(bookmark)
+def quality_bookmark(bookmark, bookmarks_in_context=None):
+    return not bad_quality_bookmark(bookmark, bookmarks_in_context)
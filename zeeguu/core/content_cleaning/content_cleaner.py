@@ -1,6 +1,6 @@
 import zeeguu.core
 from zeeguu.core.model import Article, Language
-from nltk.tokenize import sent_tokenize
+from zeeguu.core.util.pattern_matcher import PatternMatcher
 import os
 import json
 
@@ -32,14 +32,35 @@ JUNK_COUNT_FILEPATH = os.path.join(
     JUNK_PATTERNS_DATA_FOLDER, "data", "junk_patterns_found.json"
 )
 
-with open(JUNK_COUNT_FILEPATH, "r", encoding="utf-8") as f:
-    json_data = json.load(f)
-    JUNK_COUNT_PATTERNS = [sent for lang in json_data.values() for sent in lang]
+# Read on first use, and again when the file changes; see junk_count_patterns
+_junk_count_patterns = None
+_junk_count_patterns_mtime = None
+
+
+def junk_count_patterns():
+    """
+    :return: the set of normalized sentences that showed up in so many
+    articles that they are considered junk
+    """
+    global _junk_count_patterns, _junk_count_patterns_mtime
+    mtime = os.path.getmtime(JUNK_COUNT_FILEPATH)
+    if _junk_count_patterns is None or mtime != _junk_count_patterns_mtime:
+        with open(JUNK_COUNT_FILEPATH, "r", encoding="utf-8") as f:
+            json_data = json.load(f)
+        _junk_count_patterns = set(sent for lang in json_data.values() for sent in lang)
+        _junk_count_patterns_mtime = mtime
+    return _junk_count_patterns
+
 
 JUNK_PREFIXES = [
     "Der er ikke oplæsning af denne artikel, så den oplæses derfor med maskinstemme."
 ]
 
+# the text is scanned once for all the patterns, and only the ones
+# that occur in it are removed
+JUNK_PATTERNS_MATCHER = PatternMatcher(JUNK_PATTERNS_TO_REMOVE)
+JUNK_PREFIXES_MATCHER = PatternMatcher(JUNK_PREFIXES)
+
 """
 
     Sometimes newspaper/readability still leaves some individual fragments
@@ -60,6 +81,8 @@ def normalize_sent(text: str):
 def filter_noise_patterns(
     article, sent_filter_set, crawl_report=None, feed=None, url=None
 ):
+    from nltk.tokenize import sent_tokenize
+
     clean_artcile = ""
     for paragraph in article.split("\n\n"):
         clean_paragraph = ""
@@ -85,51 +108,37 @@ def filter_noise_patterns(
     return clean_artcile.strip()
 
 
-def cleanup_non_content_bits_w_crawl_report(text: str, crawl_report, feed, url) -> str:
+def _remove_junk_patterns(text: str, crawl_report=None, feed=None, url=None) -> str:
     new_text = text
-    new_text = filter_noise_patterns(
-        text, set(JUNK_COUNT_PATTERNS), crawl_report, feed, url
-    )
-    for junk_pattern in JUNK_PATTERNS_TO_REMOVE:
-        cleaned = new_text.replace(junk_pattern, "")
-
-        if cleaned != new_text:
+    for junk_pattern in JUNK_PATTERNS_MATCHER.find_all(text):
+        new_text = new_text.replace(junk_pattern, "")
+        if crawl_report is not None:
             crawl_report.add_sent_removed(feed, junk_pattern, url)
-            print(f"- cleaned: {junk_pattern}")
-            new_text = cleaned
+        print(f"- cleaned: {junk_pattern}")
 
     clean_text = ""
-    for junk_prefix in JUNK_PREFIXES:
-        for each in new_text.split("\n"):
-            if each.startswith(junk_prefix):
-                print(">>>> dropping the Paragraph: " + each)
-                crawl_report.add_sent_removed(feed, junk_pattern, url)
-                continue
-            clean_text += each + "\n"
+    for each in new_text.split("\n"):
+        junk_prefix = JUNK_PREFIXES_MATCHER.match_prefix(each)
+        if junk_prefix:
+            print(">>>> dropping the Paragraph: " + each)
+            if crawl_report is not None:
+                crawl_report.add_sent_removed(feed, junk_prefix, url)
+            continue
+        clean_text += each + "\n"
 
     return clean_text
 
 
-def cleanup_non_content_bits(text: str):
-    new_text = text
-    new_text = filter_noise_patterns(text, set(JUNK_COUNT_PATTERNS))
-
-    for junk_pattern in JUNK_PATTERNS_TO_REMOVE:
-        cleaned = new_text.replace(junk_pattern, "")
-
-        if cleaned != new_text:
-            print(f"- cleaned: {junk_pattern}")
-            new_text = cleaned
+def cleanup_non_content_bits_w_crawl_report(text: str, crawl_report, feed, url) -> str:
+    new_text = filter_noise_patterns(
+        text, junk_count_patterns(), crawl_report, feed, url
+    )
+    return _remove_junk_patterns(new_text, crawl_report, feed, url)
 
-    clean_text = ""
-    for junk_prefix in JUNK_PREFIXES:
-        for each in new_text.split("\n"):
-            if each.startswith(junk_prefix):
-                print(">>>> dropping the Paragraph: " + each)
-                continue
-            clean_text += each + "\n"
 
-    return clean_text
+def cleanup_non_content_bits(text: str):
+    new_text = filter_noise_patterns(text, junk_count_patterns())
+    return _remove_junk_patterns(new_text)
 
 
 def cleanup_all_articles_in_language(language_code):
@@ -0,0 +1,89 @@
+"""
+MinHash signatures of texts, to find near-duplicates: the same wire story
+arriving from several feeds, with a different intro or a line less.
+
+The signature of a text has a value per hash function: the minimum of
+the hashes of its shingles (runs of SHINGLE_SIZE words). The share of the
+positions where the signatures of two texts agree estimates the Jaccard
+similarity of their sets of shingles.
+
+To find the candidates without comparing with every text, the signature
+is cut in BANDS; texts that agree on all the values of a band share the
+bucket of that band (locality sensitive hashing). With 16 bands of 8 rows
+two texts with a similarity of 0.9 share a bucket with a probability of
+0.9999, with a similarity of 0.8 of 0.95, and with 0.5 only of 0.06.
+
+The hash functions are derived from a fixed seed: the stored signatures
+and buckets are only comparable with ones computed with the same seed.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+NUM_HASHES = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+
+_PRIME = (1 << 31) - 1
+_random = np.random.RandomState(20261019)
+_A = _random.randint(1, _PRIME, NUM_HASHES).astype(np.uint64)
+_B = _random.randint(0, _PRIME, NUM_HASHES).astype(np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text):
+    """
+    :return: the set of the hashes of the runs of SHINGLE_SIZE words of the
+    text, lowercased and without punctuation
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+    return set(
+        zlib.crc32(" ".join(words[i : i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    )
+
+
+def minhash(text):
+    """
+    :return: array with the NUM_HASHES values of the signature of the text,
+    or None for a text without words
+    """
+    if not _WORD.search(text):
+        return None
+    hashes = np.fromiter(shingles(text), dtype=np.uint64) % _PRIME
+    # (a * x + b) mod p for every hash function and every shingle; the
+    # values are below 2**31, so the products fit in 64 bits
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """
+    :return: the estimated Jaccard similarity of the texts of the signatures
+    """
+    return float(np.mean(np.asarray(signature) == np.asarray(other)))
+
+
+def lsh_buckets(signature):
+    """
+    :return: list with the bucket of every band of the signature; the
+    band is part of the bucket, so the buckets of all the bands can be
+    stored in, and looked up from, a single column
+    """
+    signature = np.asarray(signature, dtype="<u4")
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            band.to_bytes(2, "little") + rows.tobytes(), digest_size=8
+        ).digest()
+        # positive, to fit in a signed BIGINT
+        buckets.append(int.from_bytes(digest, "little") >> 1)
+    return buckets
@@ -2,6 +2,7 @@ import newspaper
 from langdetect import detect
 from zeeguu.core.model import Article, LowQualityTypes
 from zeeguu.core.ml_models import is_paywalled, ID_TO_LABEL_PAYWALL
+from zeeguu.core.util.pattern_matcher import PatternMatcher
 
 HTML_READ_MORE_PATTERNS = [
     "To continue reading this premium",  # New Scientist
@@ -37,18 +38,32 @@ LIVE_BLOG_KIND_OF_PATTERNS = [
 ]
 
 
-def sufficient_quality_html(html):
-    for each in HTML_READ_MORE_PATTERNS:
-        if html.find(each) > 0:
-            return (
-                False,
-                f"Incomplete Article (based on HTML analysis). Contains: {each}",
-                LowQualityTypes.HTML_PATTERN,
-            )
+# every text is scanned once for all the patterns of a list
+HTML_READ_MORE_MATCHER = PatternMatcher(HTML_READ_MORE_PATTERNS)
+PLAIN_TEXT_PAYWALL_MATCHER = PatternMatcher(PLAIN_TEXT_PAYWALL_PATTERNS)
+LIVE_BLOG_KIND_OF_MATCHER = PatternMatcher(LIVE_BLOG_KIND_OF_PATTERNS)
+
+
+def _report_pattern(crawl_report, feed, pattern, url):
+    if crawl_report is not None:
+        crawl_report.add_pattern_matched(feed, pattern, url)
+
+
+def sufficient_quality_html(html, crawl_report=None, feed=None, url=None):
+    pattern = HTML_READ_MORE_MATCHER.search(html)
+    if pattern:
+        _report_pattern(crawl_report, feed, pattern, url)
+        return (
+            False,
+            f"Incomplete Article (based on HTML analysis). Contains: {pattern}",
+            LowQualityTypes.HTML_PATTERN,
+        )
     return True, "", ""
 
 
-def sufficient_quality_plain_text(text, lang_code=None):
+def sufficient_quality_plain_text(
+    text, lang_code=None, crawl_report=None, feed=None, url=None
+):
     word_count = len(text.split())
     if word_count < Article.MINIMUM_WORD_COUNT:
         return (
@@ -57,13 +72,14 @@ def sufficient_quality_plain_text(text, lang_code=None):
             LowQualityTypes.TOO_SHORT,
         )
 
-    for each in PLAIN_TEXT_PAYWALL_PATTERNS:
-        if text.find(each) >= 0:
-            return (
-                False,
-                f"Incomplete pattern in text: {each}",
-                LowQualityTypes.TEXT_PAYWALL_PATTERN,
-            )
+    pattern = PLAIN_TEXT_PAYWALL_MATCHER.search(text)
+    if pattern:
+        _report_pattern(crawl_report, feed, pattern, url)
+        return (
+            False,
+            f"Incomplete pattern in text: {pattern}",
+            LowQualityTypes.TEXT_PAYWALL_PATTERN,
+        )
 
     if text.endswith(incomplete_suggesting_terminations):
         return (
@@ -80,9 +96,10 @@ def sufficient_quality_plain_text(text, lang_code=None):
             LowQualityTypes.LANGUAGE_DOES_NOT_MATCH_FEED,
         )
 
-    for each in LIVE_BLOG_KIND_OF_PATTERNS:
-        if text.find(each) >= 0:
-            return False, "Live blog kind of article", LowQualityTypes.LIVE_BLOG
+    pattern = LIVE_BLOG_KIND_OF_MATCHER.search(text)
+    if pattern:
+        _report_pattern(crawl_report, feed, pattern, url)
+        return False, "Live blog kind of article", LowQualityTypes.LIVE_BLOG
 
     paywall_pred = is_paywalled(text)
     if paywall_pred > 0:
@@ -97,11 +114,19 @@ def sufficient_quality_plain_text(text, lang_code=None):
     return True, "", ""
 
 
-def sufficient_quality(art: newspaper.Article, lang_code=None) -> tuple[bool, str, str]:
-    res, reason, code = sufficient_quality_html(art.html)
+def sufficient_quality(
+    art: newspaper.Article, lang_code=None, crawl_report=None, feed=None, url=None
+) -> tuple[bool, str, str]:
+    """
+    When a crawl_report is given, the patterns that made an article
+    be rejected are counted in it.
+    """
+    res, reason, code = sufficient_quality_html(art.html, crawl_report, feed, url)
     if not res:
         return False, reason, code
-    res, reason, code = sufficient_quality_plain_text(art.text, lang_code)
+    res, reason, code = sufficient_quality_plain_text(
+        art.text, lang_code, crawl_report, feed, url
+    )
     if not res:
         return False, reason, code
 
@@ -30,6 +30,12 @@ from zeeguu.core.elastic.elastic_query_builder import (
     build_elastic_search_query_for_videos,
 )
 from zeeguu.core.util.timer_logging_decorator import time_this
+from zeeguu.core.language.difficulty_estimator_factory import (
+    DifficultyEstimatorFactory,
+)
+from zeeguu.core.language.strategies.personalized_difficulty_estimator import (
+    PersonalizedDifficultyEstimator,
+)
 from zeeguu.core.elastic.settings import ES_CONN_STRING, ES_ZINDEX
 
 
@@ -171,6 +177,15 @@ def article_recommendations_for_user(
     ] + articles_from_searches[:maximum_added_search_articles]
 
     sorted_articles = sorted(articles, key=lambda x: x.published_time, reverse=True)
+
+    # Users that chose the personalized estimator get the articles
+    # re-ranked by the ratio of words they don't know in them
+    estimator = DifficultyEstimatorFactory.get_difficulty_estimator(
+        user.preferred_difficulty_estimator()
+    )
+    if estimator is PersonalizedDifficultyEstimator:
+        return PersonalizedDifficultyEstimator.rerank_articles(user, sorted_articles)
+
     return sorted_articles
 
 
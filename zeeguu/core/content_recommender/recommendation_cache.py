@@ -0,0 +1,251 @@
+"""
+Per-process cache of the home page recommendations of the users.
+
+The recommendations only change when there is new content in the
+language of the user, when the user changes what they want to see
+(language, levels, topics, searches, filters, difficulty estimator), or
+when the user opens or likes content. So the cache key of a page is
+made of:
+
+ - a fingerprint of the constraints of the user, which changes with
+   their preferences, subscriptions and filters, and, for the users of
+   the personalized difficulty estimator, which reranks the pages, with
+   the words they know (see KnownWords.for_user),
+ - the generation of the content of the language, bumped by the crawler
+   when it indexes new articles or videos,
+ - the generation of the user, bumped when they open or like content,
+ - the count and the page.
+
+The generations are stored in the DB (see CacheGeneration) since they
+are bumped by other processes; the entries of an old generation are not
+found anymore and eventually evicted. The entries also expire after
+TTL_SECONDS, since the ranking in ES favours the recent articles.
+
+Only the ids are cached; the articles and videos are loaded again, and
+the ones that became broken are left out. After a page is served, the
+next one is computed in the background, for when the user scrolls on.
+
+RECOMMENDATION_CACHE=False in the config (the default for the tests)
+computes the recommendations for every request.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import zeeguu.core
+from zeeguu.core.content_recommender.elastic_recommender import (
+    _prepare_user_constraints,
+    article_recommendations_for_user,
+    video_recommendations_for_user,
+)
+from zeeguu.core.language.difficulty_estimator_factory import (
+    DifficultyEstimatorFactory,
+)
+from zeeguu.core.language.known_words import KnownWords
+from zeeguu.core.language.strategies.personalized_difficulty_estimator import (
+    PersonalizedDifficultyEstimator,
+)
+from zeeguu.core.model import Article, CacheGeneration, User, Video
+from zeeguu.logging import warning
+
+MAX_ENTRIES = 10000
+TTL_SECONDS = 30 * 60
+VIDEOS_PER_PAGE = 3
+
+
+def _language_generation(language_id):
+    return f"recommendations:language:{language_id}"
+
+
+def _user_generation(user_id):
+    return f"recommendations:user:{user_id}"
+
+
+def new_content_for_language(session, language_id):
+    """
+    To be called when new articles or videos of the language are indexed;
+    adds to the session without committing.
+    """
+    CacheGeneration.bump(session, _language_generation(language_id))
+
+
+def user_interacted_with_content(session, user_id):
+    """
+    To be called when the user opens or likes an article or a video; adds
+    to the session without committing.
+    """
+    CacheGeneration.bump(session, _user_generation(user_id))
+
+
+def _compute(user, count, page):
+    """
+    :return: (articles, videos) of the page, computed without the cache
+    """
+    articles = article_recommendations_for_user(user, count, page)
+    videos = video_recommendations_for_user(user, VIDEOS_PER_PAGE, page)
+    return articles, [each for each in videos if each]
+
+
+def _load(model, ids):
+    """
+    :return: the objects with the ids, in the same order, without the
+    ones that are missing or broken
+    """
+    if not ids:
+        return []
+    by_id = {each.id: each for each in model.query.filter(model.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id and not by_id[i].broken]
+
+
+class RecommendationCache:
+    def __init__(self, app, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, prefetch=True):
+        self.app = app
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefetch = prefetch
+
+        # key -> (time, article ids, video ids), the least recently used first
+        self._entries = OrderedDict()
+        self._metrics = dict(hits=0, misses=0, prefetched=0)
+        self._lock = threading.Lock()
+        # (user id, count, page) of the prefetches that are not done yet
+        self._prefetching = set()
+        self._executor = None
+        self._executor_pid = None
+
+    def key(self, user, count, page):
+        constraints = _prepare_user_constraints(user)
+        language = constraints[0]
+        estimator = user.preferred_difficulty_estimator()
+        state = (language.id,) + constraints[1:] + (estimator,)
+        if (
+            DifficultyEstimatorFactory.get_difficulty_estimator(estimator)
+            is PersonalizedDifficultyEstimator
+        ):
+            # the pages are reranked by the words the user knows
+            state += (KnownWords.for_user(user, language).fingerprint(),)
+        fingerprint = hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
+        generations = CacheGeneration.current(
+            [_language_generation(language.id), _user_generation(user.id)]
+        )
+        return user.id, fingerprint, tuple(generations.values()), count, page
+
+    def recommendations(self, user, count, page=0):
+        """
+        :return: (articles, videos) of the page of the home page of the user
+        """
+        key = self.key(user, count, page)
+        cached = self._get(key)
+        if cached is not None:
+            self._count("hits")
+            articles, videos = _load(Article, cached[0]), _load(Video, cached[1])
+        else:
+            self._count("misses")
+            articles, videos = _compute(user, count, page)
+            self._put(key, articles, videos)
+
+        if self.prefetch:
+            self._prefetch(user.id, count, page + 1)
+        return articles, videos
+
+    def prefetch_page(self, user, count, page):
+        key = self.key(user, count, page)
+        if self._get(key) is None:
+            self._put(key, *_compute(user, count, page))
+            self._count("prefetched")
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics, entries=len(self._entries))
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def _put(self, key, articles, videos):
+        entry = (
+            time.time(),
+            [each.id for each in articles],
+            [each.id for each in videos],
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, metric):
+        with self._lock:
+            self._metrics[metric] += 1
+
+    def _prefetch(self, user_id, count, page):
+        with self._lock:
+            if (user_id, count, page) in self._prefetching:
+                return
+            self._prefetching.add((user_id, count, page))
+
+            # the executor of the master does not survive the fork
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="recommendation-prefetch"
+                )
+                self._executor_pid = os.getpid()
+            executor = self._executor
+
+        executor.submit(self._run_prefetch, user_id, count, page)
+
+    def _run_prefetch(self, user_id, count, page):
+        try:
+            with self.app.app_context():
+                self.prefetch_page(User.find_by_id(user_id), count, page)
+        except Exception as e:
+            warning(f"could not prefetch the recommendations of {user_id}: {e}")
+        finally:
+            with self._lock:
+                self._prefetching.discard((user_id, count, page))
+
+
+_cache = None
+
+
+def recommendation_cache():
+    """
+    :return: the cache of this process, created on first use; None when
+    it is disabled
+    """
+    global _cache
+
+    app = zeeguu.core.app
+    if not app.config.get("RECOMMENDATION_CACHE", not app.testing):
+        return None
+    if _cache is None or _cache.app is not app:
+        _cache = RecommendationCache(
+            app,
+            max_entries=app.config.get("RECOMMENDATION_CACHE_MAX_ENTRIES", MAX_ENTRIES),
+            ttl=app.config.get("RECOMMENDATION_CACHE_SECONDS", TTL_SECONDS),
+            prefetch=app.config.get("PREFETCH_RECOMMENDATIONS", True),
+        )
+    return _cache
+
+
+def recommendations_for_user(user, count, page=0):
+    """
+    :return: (articles, videos) of the page of the home page of the user,
+    from the cache if it is enabled
+    """
+    cache = recommendation_cache()
+    if cache is not None:
+        return cache.recommendations(user, count, page)
+
+    return _compute(user, count, page)
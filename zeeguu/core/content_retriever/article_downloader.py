@@ -20,7 +20,9 @@ from zeeguu.core.semantic_search import (
 )
 from zeeguu.core.content_quality.quality_filter import sufficient_quality
 from zeeguu.core.content_cleaning import cleanup_text_w_crawl_report
-from zeeguu.core.model import Url, Feed, UrlKeyword, Topic
+from zeeguu.core.model import Url, Feed, UrlKeyword, Topic, LowQualityTypes
+from zeeguu.core.model.source_signature import SourceSignature
+from zeeguu.core.util.pattern_matcher import PatternMatcher
 from zeeguu.core.model.article_topic_map import TopicOriginType
 from zeeguu.core.model.source_type import SourceType
 from zeeguu.core.model.source import Source
@@ -31,6 +33,10 @@ from zeeguu.core.model.article import MAX_CHAR_COUNT_IN_SUMMARY
 
 from sentry_sdk import capture_exception as capture_to_sentry
 from zeeguu.core.elastic.indexing import index_in_elasticsearch
+from zeeguu.core.semantic_vector_api import DocumentEmbedding
+from zeeguu.core.content_recommender.recommendation_cache import (
+    new_content_for_language,
+)
 
 from zeeguu.core.content_retriever import (
     readability_download_and_parse,
@@ -57,28 +63,33 @@ def _date_in_the_future(time):
     return time > datetime.now()
 
 
+BANNED_URL_PREFIXES = [
+    "https://www.dr.dk/sporten/seneste-sport/",
+    "https://www.dr.dk/nyheder/seneste/",
+    # Old Text interface for TVs
+    "https://www1.wdr.de/wdrtext/",
+    # Videos
+    "https://www.tagesschau.de/multimedia",
+    "https://www.1jour1actu.com/non-classe",
+    # Paywalled articles:
+    "https://www.faz.net/pro",
+    # Spanish URLs:
+    "https://www.rtve.es/play/",
+    "https://manualdeestilo.rtve.es/",
+    "https://lab.rtve.es/",
+    "https://www.rtve.es/v/",
+    "https://www.rtve.es/radio/",
+]
+BANNED_URL_MATCHER = PatternMatcher(BANNED_URL_PREFIXES)
+
+
 def banned_url(url):
-    banned = [
-        "https://www.dr.dk/sporten/seneste-sport/",
-        "https://www.dr.dk/nyheder/seneste/",
-        # Old Text interface for TVs
-        "https://www1.wdr.de/wdrtext/",
-        # Videos
-        "https://www.tagesschau.de/multimedia",
-        "https://www.1jour1actu.com/non-classe",
-        # Paywalled articles:
-        "https://www.faz.net/pro",
-        # Spanish URLs:
-        "https://www.rtve.es/play/",
-        "https://manualdeestilo.rtve.es/",
-        "https://lab.rtve.es/",
-        "https://www.rtve.es/v/",
-        "https://www.rtve.es/radio/",
-    ]
-    for each in banned:
-        if url.startswith(each) or url.replace("http://", "https://").startswith(each):
-            return True
-    return False
+    """
+    :return: the banned prefix that the url starts with, or None
+    """
+    return BANNED_URL_MATCHER.match_prefix(url) or BANNED_URL_MATCHER.match_prefix(
+        url.replace("http://", "https://")
+    )
 
 
 def extract_article_image(np_article):
@@ -190,17 +201,22 @@ def download_from_feed(
                 f"- Could not get url after redirects for {feed_item['url']}"
             )
 
-        if banned_url(url):
-            logp("Banned Url")
+        banned_prefix = banned_url(url)
+        if banned_prefix:
+            logp(f"Banned Url ({banned_prefix})")
+            crawl_report.add_pattern_matched(feed, banned_prefix, url)
             continue
 
         try:
+            # shared by the topic inference and the indexing
+            embedding = DocumentEmbedding()
             new_article = download_feed_item(
                 session,
                 feed,
                 feed_item,
                 url,
                 crawl_report,
+                embedding,
             )
             # Politiken sometimes has titles that have
             # strange characters instead of å æ ø
@@ -214,7 +230,7 @@ def download_from_feed(
             downloaded += 1
             if save_in_elastic and not new_article.broken:
                 if new_article:
-                    index_in_elasticsearch(new_article, session)
+                    index_in_elasticsearch(new_article, session, embedding)
 
             downloaded_titles.append(
                 new_article.title + " " + new_article.url.as_string()
@@ -278,12 +294,15 @@ def download_from_feed(
     logp(f"*** Low Quality: {skipped_due_to_low_quality}")
     logp(f"*** Already in DB: {skipped_already_in_db}")
     logp(f"*** ")
+    if save_in_elastic and downloaded:
+        # the cached recommendations don't have the new articles
+        new_content_for_language(session, feed.language_id)
     session.commit()
 
     return summary_stream
 
 
-def download_feed_item(session, feed, feed_item, url, crawl_report):
+def download_feed_item(session, feed, feed_item, url, crawl_report, embedding=None):
 
     title = feed_item["title"]
 
@@ -297,12 +316,27 @@ def download_feed_item(session, feed, feed_item, url, crawl_report):
     np_article = readability_download_and_parse(url)
 
     is_quality_article, reason, code = sufficient_quality(
-        np_article, feed.language.code
+        np_article, feed.language.code, crawl_report, feed, str(url)
     )
+    signature = None
     if is_quality_article:
         np_article.text = cleanup_text_w_crawl_report(
             np_article.text, crawl_report, feed, url
         )
+        # before any of the processing of the text, which a near-duplicate
+        # of an article that we already have does not deserve; it is saved
+        # as broken, like the low quality ones, so it's not downloaded again
+        signature = SourceSignature.for_text(np_article.text)
+        duplicate = signature and SourceSignature.find_near_duplicate(
+            signature, feed.language
+        )
+        if duplicate:
+            duplicate_signature, similarity = duplicate
+            is_quality_article = False
+            code = LowQualityTypes.NEAR_DUPLICATE
+            reason = f"Near duplicate ({similarity:.2f}) of source {duplicate_signature.source_id}"
+            # only the originals are compared with the new articles
+            signature = None
     summary = feed_item["summary"]
     # however, this is not so easy... there have been cases where
     # the summary is just malformed HTML... thus we try to extract
@@ -327,6 +361,8 @@ def download_feed_item(session, feed, feed_item, url, crawl_report):
         0,
         commit=False,
     )
+    if signature is not None and new_source.signature is None:
+        new_source.signature = signature
     # Create new article and save it to DB
     new_article = zeeguu.core.model.Article(
         Url.find_or_create(session, url),
@@ -347,6 +383,8 @@ def download_feed_item(session, feed, feed_item, url, crawl_report):
         new_article.set_as_broken(session, code)
         session.add(new_article)
         print(f"Article was skipped, reason: '{reason}'")
+        if code == LowQualityTypes.NEAR_DUPLICATE:
+            raise SkippedAsNearDuplicate(reason)
         raise SkippedForLowQuality(reason)
 
     # Create fragments only if article isn't broken.
@@ -358,13 +396,13 @@ def download_feed_item(session, feed, feed_item, url, crawl_report):
 
     url_keywords = add_url_keywords(new_article, session)
     logp(f"Topic Keywords: ({url_keywords})")
-    _, topics = add_topics(new_article, feed, url_keywords, session)
+    _, topics = add_topics(new_article, feed, url_keywords, session, embedding)
     logp(f"Topics ({topics})")
     session.add(new_article)
     return new_article
 
 
-def add_topics(new_article, feed, url_keywords, session):
+def add_topics(new_article, feed, url_keywords, session, embedding=None):
     HARDCODED_FEEDS = {
         102: 8,  # The Onion EN
         121: 8,  # Lercio IT
@@ -409,7 +447,10 @@ def add_topics(new_article, feed, url_keywords, session):
 
     # Add based on KK neighbours:
     topic_to_assign = get_topic_classification_based_on_similar_content(
-        new_article.content, filter_ids=[new_article.id], verbose=True
+        new_article.content,
+        filter_ids=[new_article.id],
+        verbose=True,
+        sem_vec=embedding.of_article(new_article) if embedding else None,
     )
     if topic_to_assign:
         new_article.add_topic_if_doesnt_exist(
@@ -14,3 +14,7 @@ class SkippedForLowQuality(Exception):
 
 class SkippedAlreadyInDB(Exception):
     pass
+
+
+class SkippedAsNearDuplicate(SkippedForLowQuality):
+    pass
@@ -10,6 +10,7 @@ from zeeguu.core.semantic_vector_api import (
     get_embedding_from_video,
 )
 from zeeguu.core.model.video_topic_map import VideoTopicMap
+from zeeguu.core.semantic_search.vector_index import loaded_vector_index
 from zeeguu.core.model.video import MAX_CHAR_COUNT_IN_SUMMARY
 from elasticsearch_dsl import Search, Q
 
@@ -103,7 +104,11 @@ def find_filter_url_keywords(article_id, session):
     return topic_kewyords
 
 
-def document_from_video(video, session, current_doc=None):
+def document_from_video(video, session, current_doc=None, embedding=None):
+    """
+    :param embedding: the DocumentEmbedding of the video, if it is being
+    ingested, which might have been computed for the topic inference
+    """
     topics, topics_inferred = find_topics_video(video.id, session)
     embedding_generation_required = True
     video_text = video.get_content()
@@ -125,13 +130,19 @@ def document_from_video(video, session, current_doc=None):
     }
     if not embedding_generation_required and current_doc is not None:
         doc["sem_vec"] = current_doc["sem_vec"]
+    elif embedding is not None:
+        doc["sem_vec"] = embedding.of_video(video)
     else:
         doc["sem_vec"] = get_embedding_from_video(video)
 
     return doc
 
 
-def document_from_article(article, session, current_doc=None):
+def document_from_article(article, session, current_doc=None, embedding=None):
+    """
+    :param embedding: the DocumentEmbedding of the article, if it is being
+    ingested, which might have been computed for the topic inference
+    """
     topics, topics_inferred = find_topics_article(article.id, session)
     embedding_generation_required = current_doc is None
     # Embeddings only need to be re-computed if the document
@@ -160,6 +171,8 @@ def document_from_article(article, session, current_doc=None):
     }
     if not embedding_generation_required and current_doc is not None:
         doc["sem_vec"] = list(current_doc["sem_vec"])
+    elif embedding is not None:
+        doc["sem_vec"] = embedding.of_article(article)
     else:
         doc["sem_vec"] = get_embedding_from_article(article)
     return doc
@@ -176,12 +189,13 @@ def create_or_update_article(article, session):
         doc = document_from_article(article, session)
         res = es_index(body=doc)
 
+    _add_to_vector_index(doc)
     return res
 
 
-def index_video(video, session):
+def index_video(video, session, embedding=None):
 
-    doc = document_from_video(video, session)
+    doc = document_from_video(video, session, embedding=embedding)
     res = es_index(body=doc)
     return res
 
@@ -205,11 +219,12 @@ def create_or_update_doc_for_bulk(article, session):
     return doc
 
 
-def index_in_elasticsearch(new_article, session):
+def index_in_elasticsearch(new_article, session, embedding=None):
 
     try:
-        doc = document_from_article(new_article, session)
+        doc = document_from_article(new_article, session, embedding=embedding)
         es_index(doc)
+        _add_to_vector_index(doc)
 
     except Exception as e:
         from sentry_sdk import capture_exception
@@ -220,7 +235,18 @@ def index_in_elasticsearch(new_article, session):
         traceback.print_exc()
 
 
+def _add_to_vector_index(doc):
+    # so that the articles indexed since the vector index was loaded
+    # are found in it too
+    index = loaded_vector_index()
+    if index is not None:
+        index.add_document(doc)
+
+
 def remove_from_index(article):
+    index = loaded_vector_index()
+    if index is not None:
+        index.remove(article.id)
 
     hit = get_article_hit_in_es(article.id)
     es_id = hit["_id"]
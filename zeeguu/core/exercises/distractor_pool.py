@@ -0,0 +1,119 @@
+import random
+
+from zeeguu.core.word_stats import lang_info, rank_store, word_rank
+from zeeguu.logging import log
+
+# words that are close in frequency rank and length to the word
+# being practiced make for more plausible distractors
+RANK_BUCKET_SIZE = 2000
+MAX_LENGTH_BUCKET = 4
+
+_pools = {}
+
+
+def distractor_pool(language_code):
+    """
+    The pool of the language is built the first time it is needed and
+    then reused by all the exercises of all the users.
+    """
+    if language_code not in _pools:
+        _pools[language_code] = DistractorPool.for_language(language_code)
+    return _pools[language_code]
+
+
+def preload_distractor_pools(language_codes):
+    for each in language_codes:
+        distractor_pool(each)
+
+
+def _rank_bucket(rank):
+    return rank // RANK_BUCKET_SIZE
+
+
+def _length_bucket(word):
+    return min(len(word) // 3, MAX_LENGTH_BUCKET)
+
+
+class DistractorPool:
+    """
+    The candidate distractor words of a language, without the bad words,
+    the proper names and the single letter words.
+
+    The words are kept in one list sorted by (rank bucket, length bucket),
+    so every bucket is a contiguous slice of the list, and sampling from a
+    bucket is picking random indices in its slice.
+    """
+
+    def __init__(self, language_code, ranked_words):
+        """
+        :param ranked_words: list of (word, frequency rank) pairs
+        """
+        # the word lists are read from disk when the module is imported
+        from zeeguu.core.word_filter import BAD_WORD_LIST, PROPER_NAMES_LIST
+
+        self.language_code = language_code
+
+        excluded = set(BAD_WORD_LIST) | set(PROPER_NAMES_LIST)
+        candidates = sorted(
+            (
+                (_rank_bucket(rank), _length_bucket(word), word)
+                for word, rank in ranked_words
+                if len(word) > 1 and word not in excluded
+            ),
+        )
+
+        self.words = [word for _, _, word in candidates]
+
+        # (rank bucket, length bucket) -> (start, end) slice of self.words
+        self.buckets = {}
+        # rank bucket -> (start, end) slice of self.words
+        self.rank_buckets = {}
+        for i, (rank_bucket, length_bucket, _) in enumerate(candidates):
+            start, _ = self.buckets.get((rank_bucket, length_bucket), (i, i))
+            self.buckets[(rank_bucket, length_bucket)] = (start, i + 1)
+            start, _ = self.rank_buckets.get(rank_bucket, (i, i))
+            self.rank_buckets[rank_bucket] = (start, i + 1)
+
+    @classmethod
+    def for_language(cls, language_code):
+        log(f"building the distractor pool for {language_code}")
+        store = rank_store(language_code)
+        if store is not None:
+            words, ranks = store.words_by_rank()
+            return cls(language_code, zip(words, ranks.tolist()))
+
+        info = lang_info(language_code)
+        return cls(
+            language_code, [(word, info[word].rank) for word in info.all_words()]
+        )
+
+    def __len__(self):
+        return len(self.words)
+
+    def sample(self, word, count=2):
+        """
+        :return: count distinct words, different from the given word, from
+        the bucket with the same frequency rank and length as the word;
+        if that bucket is too small, from the same rank, and otherwise
+        from the whole pool
+        """
+        rank_bucket = _rank_bucket(word_rank(word, self.language_code))
+        slices = [
+            self.buckets.get((rank_bucket, _length_bucket(word))),
+            self.rank_buckets.get(rank_bucket),
+            (0, len(self.words)),
+        ]
+        for start, end in [each for each in slices if each]:
+            # the word itself might be in the slice
+            if end - start > count:
+                return self._sample_from(start, end, word, count)
+
+        return [each for each in self.words if each != word][:count]
+
+    def _sample_from(self, start, end, word_to_avoid, count):
+        sample = []
+        while len(sample) < count:
+            candidate = self.words[random.randrange(start, end)]
+            if candidate != word_to_avoid and candidate not in sample:
+                sample.append(candidate)
+        return sample
@@ -1,30 +1,15 @@
 import random
 
-from zeeguu.core.word_stats import lang_info
-from zeeguu.core.word_filter import (
-    BAD_WORD_LIST,
-    PROPER_NAMES_LIST,
-    remove_words_based_on_list,
-)
+from zeeguu.core.exercises.distractor_pool import distractor_pool
 
 
 def similar_words(word, language, user, number_of_words_to_return=2):
+    from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
 
-    words_the_user_must_study = user.scheduled_bookmarks(10)
+    words_the_user_must_study = StudyQueueEntry.words_to_study(user, 10)
 
     if len(words_the_user_must_study) == 10:
-        candidates = [each.origin.word for each in words_the_user_must_study]
-    else:
-        candidates = lang_info(language.code).all_words()
-        candidates_filtered = remove_words_based_on_list(candidates, BAD_WORD_LIST)
-        candidates_filtered = remove_words_based_on_list(
-            candidates_filtered, PROPER_NAMES_LIST
-        )
-        # Update candidates to be based on the filtered words.
-        candidates = [w for w in candidates_filtered if len(w) > 1]
+        candidates = [each for each in words_the_user_must_study if each != word]
+        return random.sample(candidates, number_of_words_to_return)
 
-    random_sample = random.sample(candidates, number_of_words_to_return)
-    while word in random_sample:
-        random_sample = random.sample(candidates, number_of_words_to_return)
-
-    return random_sample
+    return distractor_pool(language.code).sample(word, number_of_words_to_return)
@@ -3,12 +3,13 @@ from typing import Type
 from zeeguu.core.language.difficulty_estimator_strategy import DifficultyEstimatorStrategy
 from zeeguu.core.language.strategies.default_difficulty_estimator import DefaultDifficultyEstimator
 from zeeguu.core.language.strategies.flesch_kincaid_difficulty_estimator import FleschKincaidDifficultyEstimator
+from zeeguu.core.language.strategies.personalized_difficulty_estimator import PersonalizedDifficultyEstimator
 
 
 class DifficultyEstimatorFactory:
 
     # Todo: Discover Difficulty Estimators
-    _difficulty_estimators = {FleschKincaidDifficultyEstimator}
+    _difficulty_estimators = {FleschKincaidDifficultyEstimator, PersonalizedDifficultyEstimator}
     _default_estimator = DefaultDifficultyEstimator
 
     @classmethod
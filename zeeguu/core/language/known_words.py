@@ -0,0 +1,233 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from zeeguu.core.util.text import split_words_from_text
+from zeeguu.core.word_stats import UNKNOWN_RANK, word_ranks
+
+# How many of the most frequent words of a language we assume a learner
+# knows at every CEFR level (1 = A1 ... 6 = C2), before looking at their
+# bookmarks. Learners that did not declare a level are assumed to be A2.
+KNOWN_VOCABULARY_BY_CEFR_LEVEL = {
+    1: 500,
+    2: 1000,
+    3: 2000,
+    4: 4000,
+    5: 8000,
+    6: 16000,
+}
+DEFAULT_CEFR_LEVEL = 2
+
+KNOWN_WORDS_CACHE_SECONDS = 300
+ARTICLE_WORD_RANKS_CACHE_SIZE = 5000
+
+# (user id, language id) -> (time computed, KnownWords)
+_known_words_cache = {}
+# article id -> ranks of its words; least recently used first
+_article_word_ranks_cache = OrderedDict()
+
+
+class KnownWords:
+    """
+    The words a user knows in a language, as a bitset indexed by the
+    frequency rank of the words: bit r is set if the user knows the word
+    with rank r. A few tens of KB per user and language.
+
+    The words of a text are looked up in it with one vectorized operation
+    over the array of their ranks.
+    """
+
+    def __init__(self, frequent_words_known, known_ranks=(), unknown_ranks=()):
+        """
+        :param frequent_words_known: all the words with a lower rank are known
+        :param known_ranks: ranks of other words that are known
+        :param unknown_ranks: ranks of words that are not known, even if
+        they are among the frequent ones
+        """
+        known_ranks = np.asarray(known_ranks, dtype=np.int64)
+        unknown_ranks = np.asarray(unknown_ranks, dtype=np.int64)
+        known_ranks = known_ranks[known_ranks != UNKNOWN_RANK]
+        unknown_ranks = unknown_ranks[unknown_ranks != UNKNOWN_RANK]
+
+        size = max(
+            [frequent_words_known]
+            + [
+                int(each.max()) + 1
+                for each in [known_ranks, unknown_ranks]
+                if len(each)
+            ]
+        )
+        known = np.zeros(size, dtype=bool)
+        known[:frequent_words_known] = True
+        known[known_ranks] = True
+        known[unknown_ranks] = False
+
+        self.size = size
+        self.bits = np.packbits(known)
+
+    def fingerprint(self):
+        """
+        :return: a digest that changes when the known words change, for
+        the caches of what is computed from them
+        """
+        return hashlib.sha1(self.bits.tobytes() + str(self.size).encode()).hexdigest()
+
+    def knows(self, ranks):
+        """
+        :return: boolean array, True for the ranks of known words
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        in_range = ranks < self.size
+        safe = np.where(in_range, ranks, 0)
+        bits = (self.bits[safe >> 3] >> (7 - (safe & 7))) & 1
+        return in_range & (bits == 1)
+
+    def unknown_ratios(self, rank_arrays):
+        """
+        :param rank_arrays: list with the array of the word ranks of every text
+        :return: array with the ratio of unknown words in every text; the words
+        that are not in the frequency lists (names, numbers, typos) are not
+        counted. A text without any counted word has ratio 0.
+        """
+        ratios = np.zeros(len(rank_arrays))
+        lengths = np.array([len(each) for each in rank_arrays])
+        non_empty = lengths > 0
+        if not non_empty.any():
+            return ratios
+
+        all_ranks = np.concatenate([each for each in rank_arrays if len(each)])
+        starts = np.concatenate(([0], np.cumsum(lengths[non_empty])[:-1]))
+
+        counted = all_ranks != UNKNOWN_RANK
+        unknown = counted & ~self.knows(all_ranks)
+
+        counted_per_text = np.add.reduceat(counted.astype(np.int64), starts)
+        unknown_per_text = np.add.reduceat(unknown.astype(np.int64), starts)
+        ratios[non_empty] = np.divide(
+            unknown_per_text,
+            counted_per_text,
+            out=np.zeros(len(starts)),
+            where=counted_per_text > 0,
+        )
+        return ratios
+
+    @classmethod
+    def for_user(cls, user, language):
+        """
+        Built from the level of the user and their bookmarks: the words of
+        learned bookmarks and of bookmarks that were practiced correctly at
+        least once (their cooling interval grew) are known; the words of the
+        other bookmarks are not, since the user had to look them up.
+
+        Cached for a few minutes.
+        """
+        key = (user.id, language.id)
+        cached = _known_words_cache.get(key)
+        if cached and time.time() - cached[0] < KNOWN_WORDS_CACHE_SECONDS:
+            return cached[1]
+
+        known_words = cls._compute_for_user(user, language)
+        _known_words_cache[key] = (time.time(), known_words)
+        return known_words
+
+    @classmethod
+    def invalidate(cls, user_id=None):
+        for key in list(_known_words_cache.keys()):
+            if user_id is None or key[0] == user_id:
+                del _known_words_cache[key]
+
+    @classmethod
+    def _compute_for_user(cls, user, language):
+        from sqlalchemy.orm.exc import NoResultFound
+
+        from zeeguu.core.model import db, Bookmark, UserLanguage, UserWord
+        from zeeguu.core.word_scheduling.basicSR.basicSR import BasicSRSchedule
+
+        try:
+            cefr_level = UserLanguage.with_language_id(language.id, user).cefr_level
+        except NoResultFound:
+            cefr_level = None
+        frequent_words_known = KNOWN_VOCABULARY_BY_CEFR_LEVEL.get(
+            cefr_level, KNOWN_VOCABULARY_BY_CEFR_LEVEL[DEFAULT_CEFR_LEVEL]
+        )
+
+        bookmarks = (
+            db.session.query(
+                UserWord.word, Bookmark.learned_time, BasicSRSchedule.cooling_interval
+            )
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .outerjoin(BasicSRSchedule, BasicSRSchedule.bookmark_id == Bookmark.id)
+            .filter(Bookmark.user_id == user.id)
+            .filter(UserWord.language_id == language.id)
+            .all()
+        )
+
+        known, unknown = [], []
+        for word, learned_time, cooling_interval in bookmarks:
+            if learned_time is not None or (cooling_interval or 0) > 0:
+                known.append(word)
+            else:
+                unknown.append(word)
+
+        return cls(
+            frequent_words_known,
+            word_ranks(known, language.code),
+            word_ranks(unknown, language.code),
+        )
+
+
+def text_word_ranks(text, language_code):
+    """
+    :return: array with the rank of every word of the text
+    """
+    return word_ranks(split_words_from_text(text), language_code)
+
+
+def article_word_ranks(article):
+    """
+    :return: array with the rank of every word of the article
+    """
+    return articles_word_ranks([article])[0]
+
+
+def articles_word_ranks(articles):
+    """
+    The ranks come from the SourceVocabulary of the articles, loaded in
+    bulk; only the articles without one are tokenized. Either way they are
+    kept in a bounded in-memory cache, since the same candidates come up
+    in the recommendations of many users.
+
+    :return: list with the array of the word ranks of every article
+    """
+    from zeeguu.core.model.source_vocabulary import SourceVocabulary
+
+    missing = [each for each in articles if each.id not in _article_word_ranks_cache]
+    vocabularies = SourceVocabulary.for_articles(missing) if missing else {}
+    for article in missing:
+        if article.id in vocabularies:
+            ranks = vocabularies[article.id].all_word_ranks()
+        else:
+            ranks = text_word_ranks(article.get_content() or "", article.language.code)
+        _article_word_ranks_cache[article.id] = ranks
+
+    result = []
+    for article in articles:
+        _article_word_ranks_cache.move_to_end(article.id)
+        result.append(_article_word_ranks_cache[article.id])
+
+    while len(_article_word_ranks_cache) > ARTICLE_WORD_RANKS_CACHE_SIZE:
+        _article_word_ranks_cache.popitem(last=False)
+    return result
+
+
+def forget_article_word_ranks(article_id=None):
+    """
+    To be called when the content of an article changes; without an id
+    the whole cache is cleared.
+    """
+    if article_id is None:
+        _article_word_ranks_cache.clear()
+    else:
+        _article_word_ranks_cache.pop(article_id, None)
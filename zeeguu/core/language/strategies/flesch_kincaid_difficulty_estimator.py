@@ -1,6 +1,6 @@
-import nltk
+import math
+
 import pyphen
-from numpy import math
 
 from zeeguu.core.language.difficulty_estimator_strategy import (
     DifficultyEstimatorStrategy,
@@ -54,6 +54,8 @@ class FleschKincaidDifficultyEstimator(DifficultyEstimatorStrategy):
             )
             number_of_syllables += syllables_in_word * freq
 
+        import nltk
+
         number_of_sentences = len(nltk.sent_tokenize(text))
 
         constants = cls.get_constants_for_language(language)
@@ -1,11 +1,12 @@
 from nltk import SnowballStemmer
-from wordstats import Word, WordInfo
 from zeeguu.core import model
 from zeeguu.core.language.difficulty_estimator_strategy import DifficultyEstimatorStrategy
 from zeeguu.core.util.text import split_words_from_text
-from wordstats.file_handling.loading_from_hermit import *
+from zeeguu.core.word_stats import lang_info, rank_store
 from collections import defaultdict
 
+import numpy as np
+
 class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
 
     CUSTOM_NAMES = ["frequency"]
@@ -13,6 +14,10 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
     def __init__(self, language: 'model.Language'):
         self.language = language
         self.score_map = dict()
+        # when the language has a compiled rank store, the stem frequencies
+        # are looked up in it instead of being computed into score_map
+        self.rank_store = None
+        self.max_stem_frequency = None
 
         # determines word scores
         #words_history = WordInteractionHistory.find_all_word_histories_for_user_language(user, language)
@@ -35,11 +40,17 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
 
         estimator = cls(language)
 
-        freq_list = load_language_from_hermit(language.code)
+        store = rank_store(language.code)
+        if store is not None and len(store.stems) > 0:
+            estimator.rank_store = store
+            estimator.max_stem_frequency = float(store.stem_frequencies_array.max())
+            return estimator
+
+        freq_list = lang_info(language.code)
 
         word_dict = dict()
-        for k,v in freq_list.word_info_dict.items():
-            word_dict[k] = v.frequency
+        for k in freq_list.all_words():
+            word_dict[k] = freq_list[k].frequency
 
         stemmer = SnowballStemmer(language.name.lower())
 
@@ -80,7 +91,8 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
             total_words += 1
             words_freq[w] += 1
 
-        word_scores = [self.word_difficulty(self.score_map, True, w) * (words_freq[w] / total_words) for w in
+        stem_scores = self.stem_scores(list(words_freq.keys()))
+        word_scores = [stem_scores[w] * (words_freq[w] / total_words) for w in
                        words_freq.keys()]
 
         # If we can't compute the text difficulty, we estimate hard
@@ -104,6 +116,20 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
 
         return difficulty_scores
 
+    def stem_scores(self, stems):
+        """
+        :return: stem -> difficulty, for all the given stems at once
+        """
+        if self.rank_store is None:
+            return {s: self.word_difficulty(self.score_map, True, s) for s in stems}
+
+        frequencies = self.rank_store.stem_frequencies(stems)
+        scores = np.sqrt(1 - frequencies / self.max_stem_frequency)
+        # the score_map is a defaultdict(int): the stems that are not in
+        # the frequency lists get a 0 there, so we do the same here
+        scores[frequencies == 0] = 0
+        return dict(zip(stems, scores.tolist()))
+
     @classmethod
     def discrete_text_difficulty(cls, median_difficulty: float):
         """
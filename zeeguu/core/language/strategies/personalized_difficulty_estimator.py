@@ -0,0 +1,90 @@
+from zeeguu.core import model
+from zeeguu.core.language.difficulty_estimator_strategy import (
+    DifficultyEstimatorStrategy,
+)
+from zeeguu.core.language.known_words import (
+    KnownWords,
+    articles_word_ranks,
+    text_word_ranks,
+)
+
+# Readers need to know about 95% of the words of a text to read it
+# comfortably, and struggle below 90%
+EASY_UNKNOWN_RATIO = 0.05
+MEDIUM_UNKNOWN_RATIO = 0.10
+# Below this there is hardly anything new to learn in a text
+TOO_EASY_UNKNOWN_RATIO = 0.01
+
+
+class PersonalizedDifficultyEstimator(DifficultyEstimatorStrategy):
+    """
+    The difficulty of a text for a given user is the ratio of its words
+    that the user does not know; see KnownWords for how the known words
+    of a user are determined.
+    """
+
+    CUSTOM_NAMES = ["personalized", "known-words"]
+
+    @classmethod
+    def estimate_difficulty(
+        cls, text: str, language: "model.Language", user: "model.User"
+    ):
+        """
+        :param text: See DifficultyEstimatorStrategy
+        :param language: See DifficultyEstimatorStrategy
+        :param user: See DifficultyEstimatorStrategy
+        :rtype: dict
+        :return: The dictionary contains the keys and return types
+                    normalized: float (0<=normalized<=1), the unknown word ratio
+                    discrete: string [EASY, MEDIUM, HARD]
+        """
+        known_words = KnownWords.for_user(user, language)
+        [ratio] = known_words.unknown_ratios([text_word_ranks(text, language.code)])
+        return cls._difficulty_scores(ratio)
+
+    @classmethod
+    def estimate_article_difficulties(cls, user: "model.User", articles):
+        """
+        Scores a batch of articles in the learned language of the user at once.
+
+        :return: list with the unknown word ratio of every article
+        """
+        known_words = KnownWords.for_user(user, user.learned_language)
+        ratios = known_words.unknown_ratios(articles_word_ranks(articles))
+        return ratios.tolist()
+
+    @classmethod
+    def rerank_articles(cls, user: "model.User", articles):
+        """
+        Re-ranking stage for the recommendations: first the articles with
+        a few unknown words, then the ones that are too easy, and last the
+        ones that are too hard. Within each group the order is kept.
+        """
+        if not articles:
+            return articles
+
+        def group(ratio):
+            if ratio >= MEDIUM_UNKNOWN_RATIO:
+                return 2
+            if ratio < TOO_EASY_UNKNOWN_RATIO:
+                return 1
+            return 0
+
+        ratios = cls.estimate_article_difficulties(user, articles)
+        order = sorted(range(len(articles)), key=lambda i: group(ratios[i]))
+        return [articles[i] for i in order]
+
+    @classmethod
+    def discrete_difficulty(cls, unknown_ratio):
+        if unknown_ratio < EASY_UNKNOWN_RATIO:
+            return "EASY"
+        if unknown_ratio < MEDIUM_UNKNOWN_RATIO:
+            return "MEDIUM"
+        return "HARD"
+
+    @classmethod
+    def _difficulty_scores(cls, unknown_ratio):
+        return dict(
+            normalized=float(unknown_ratio),
+            discrete=cls.discrete_difficulty(unknown_ratio),
+        )
@@ -2,12 +2,21 @@
 import os
 from langdetect import detect
 from .utils import stem_pre_process
-from joblib import load
 
 ml_models_path = os.path.dirname(__file__)
-PAYWALL_TFIDF_MODEL = load(os.path.join(ml_models_path,'binary', 'tfidf_multi_paywall_detect.joblib'))
+PAYWALL_TFIDF_MODEL_PATH = os.path.join(ml_models_path,'binary', 'tfidf_multi_paywall_detect.joblib')
+
+# Loaded on first use; unpickling the model imports joblib and sklearn
+_paywall_tfidf_model = None
+
+def paywall_tfidf_model():
+    global _paywall_tfidf_model
+    if _paywall_tfidf_model is None:
+        from joblib import load
+        _paywall_tfidf_model = load(PAYWALL_TFIDF_MODEL_PATH)
+    return _paywall_tfidf_model
 
 def is_paywalled(article_txt:str):
     lang = detect(article_txt)
     #print("Language detected was: ", lang)
-    return PAYWALL_TFIDF_MODEL.predict([stem_pre_process(article_txt, lang)])[0]
\ No newline at end of file
+    return paywall_tfidf_model().predict([stem_pre_process(article_txt, lang)])[0]
\ No newline at end of file
@@ -1,5 +1,4 @@
 import re
-from nltk.stem import SnowballStemmer 
 from zeeguu.core.model import Language
 
 def remove_non_alphanumeric(s:str):
@@ -9,6 +8,8 @@ def remove_non_alphanumeric(s:str):
     return s.strip()
 
 def stem_pre_process(s:str, language:str):
+    from nltk.stem import SnowballStemmer
+
     s = remove_non_alphanumeric(s)
     lang_name = Language.LANGUAGE_NAMES[language].lower()
     if lang_name in SnowballStemmer.languages:
@@ -33,6 +33,8 @@ from .language import Language
 from .url import Url
 from .domain_name import DomainName
 from .article import Article
+from .source_vocabulary import SourceVocabulary
+from .source_signature import SourceSignature
 from .bookmark import Bookmark
 from .text import Text
 from .user_word import UserWord
@@ -80,11 +82,14 @@ from .topic_filter import TopicFilter
 
 from .user_reading_session import UserReadingSession
 from .user_exercise_session import UserExerciseSession
+from .daily_activity import DailyActivity
+from .cache_generation import CacheGeneration
 
 
 # bookmark scheduling
 from .word_to_study import WordToStudy
 from ..word_scheduling.basicSR.basicSR import BasicSRSchedule
+from ..word_scheduling.study_queue import StudyQueueEntry
 
 from .personal_copy import PersonalCopy
 
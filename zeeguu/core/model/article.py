@@ -556,7 +556,8 @@ class Article(db.Model):
 
     @classmethod
     def find_by_id(cls, id: int):
-        return Article.query.filter(Article.id == id).first()
+        # from the identity map, without a query, if it's loaded already
+        return db.session.get(Article, id)
 
     @classmethod
     def find_by_source_id(cls, source_id: int):
@@ -15,6 +15,7 @@ class LowQualityTypes:
     LIVE_BLOG = "LIVE_BLOG"
     ML_PREDICTION = "ML_PREDICTION"
     LANGUAGE_DOES_NOT_MATCH_FEED = "LANGUAGE_DOES_NOT_MATCH_FEED"
+    NEAR_DUPLICATE = "NEAR_DUPLICATE"
 
 
 class ArticleBrokenMap(db.Model):
@@ -1,8 +1,8 @@
 from datetime import datetime
 
 import sqlalchemy
-from sqlalchemy import Column, ForeignKey, Integer, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, ForeignKey, Integer, Table, insert, tuple_
+from sqlalchemy.orm import joinedload, relationship
 from sqlalchemy.orm.exc import NoResultFound
 
 from zeeguu.core.model.caption import Caption
@@ -22,6 +22,7 @@ from zeeguu.core.model.user_word import UserWord
 from zeeguu.core.model.learning_cycle import LearningCycle
 from zeeguu.core.model.bookmark_user_preference import UserWordExPreference
 from zeeguu.core.model.bookmark_context import BookmarkContext, ContextIdentifier
+from zeeguu.core.model.daily_activity import DailyActivity
 
 from zeeguu.core.model import db
 
@@ -108,7 +109,12 @@ class Bookmark(db.Model):
         total_tokens: int = None,
         context: BookmarkContext = None,
         level: int = 0,
+        bookmarks_in_context: list = None,
     ):
+        """
+        :param bookmarks_in_context: the other bookmarks of the user in
+        the context, when the caller has them already; see fit_for_study
+        """
         self.origin = origin
         self.translation = translation
         self.user = user
@@ -123,7 +129,7 @@ class Bookmark(db.Model):
         self.total_tokens = total_tokens
         self.context = context
         self.level = level
-        self.fit_for_study = fit_for_study(self)
+        self.fit_for_study = fit_for_study(self, bookmarks_in_context)
 
     def __repr__(self):
         return "Bookmark[{3} of {4}: {0}->{1} in '{2}...']\n".format(
@@ -172,9 +178,12 @@ class Bookmark(db.Model):
         :param session:
         :return:
         """
+        from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
+
         self.fit_for_study = fit_for_study(self)
         if session:
             session.add(self)
+        StudyQueueEntry.refresh(session or db.session, self)
 
     def add_new_exercise_result(
         self,
@@ -199,6 +208,8 @@ class Bookmark(db.Model):
         self.add_new_exercise(exercise)
         db.session.add(exercise)
 
+        DailyActivity.record_exercise(db.session, self, exercise_outcome.outcome, time)
+
         return exercise
 
     def report_exercise_outcome(
@@ -229,6 +240,64 @@ class Bookmark(db.Model):
         # self.update_fit_for_study(db_session)
         # self.update_learned_status(db_session)
 
+    @classmethod
+    def report_exercise_outcomes(cls, db_session, user, exercise_outcomes: list):
+        """
+        Batch version of report_exercise_outcome, used to submit all the
+        outcomes of an exercise session at once.
+
+        The exercise sources and outcomes are resolved once per distinct
+        value, the schedules of all the bookmarks are loaded in one query
+        and everything is committed once at the end.
+
+        :param exercise_outcomes: list of dictionaries with the keys
+            bookmark_id, outcome, source, solving_speed, session_id and,
+            optionally, other_feedback and time
+        :return: the ids of the bookmarks for which an outcome was recorded;
+            raises ValueError without recording any outcome when one of the
+            bookmarks does not belong to the user
+        """
+        from zeeguu.core.word_scheduling import get_scheduler
+
+        bookmark_ids = set(int(each["bookmark_id"]) for each in exercise_outcomes)
+        bookmarks = {
+            bookmark.id: bookmark
+            for bookmark in cls.query.filter(cls.id.in_(bookmark_ids)).filter(
+                cls.user_id == user.id
+            )
+        }
+        if len(bookmarks) < len(bookmark_ids):
+            raise ValueError(
+                f"Bookmarks {sorted(bookmark_ids - bookmarks.keys())} are not of user {user.id}"
+            )
+        sources = {
+            source: ExerciseSource.find_or_create(db_session, source)
+            for source in set(each["source"] for each in exercise_outcomes)
+        }
+        outcomes = {
+            outcome: ExerciseOutcome.find_or_create(db_session, outcome)
+            for outcome in set(each["outcome"] for each in exercise_outcomes)
+        }
+
+        bookmark_outcomes = []
+        for each in exercise_outcomes:
+            bookmark = bookmarks[int(each["bookmark_id"])]
+            time = each.get("time", None) or datetime.now()
+            bookmark.add_new_exercise_result(
+                sources[each["source"]],
+                outcomes[each["outcome"]],
+                each["solving_speed"],
+                each["session_id"],
+                each.get("other_feedback", ""),
+                time=time,
+            )
+            bookmark_outcomes.append((bookmark, each["outcome"], time))
+
+        get_scheduler(user).update_all(db_session, bookmark_outcomes)
+        db_session.commit()
+
+        return [bookmark.id for bookmark, _, _ in bookmark_outcomes]
+
     def to_json(
         self,
         with_context,
@@ -541,78 +610,299 @@ class Bookmark(db.Model):
         if the bookmark does not exist, it creates it and returns it
         if it exists, it ** updates the translation** and returns the bookmark object
         """
-        origin_lang = Language.find_or_create(_origin_lang)
-        translation_lang = Language.find_or_create(_translation_lang)
-
-        origin = UserWord.find_or_create(session, _origin, origin_lang)
-        source = Source.find_by_id(source_id)
-        print("Source retrieved: ", source)
-        # TODO: This will be temporary.
-        article = None
-        if source_id and not article_id:
-            article = Article.find_by_source_id(source_id)
-        if article_id:
-            article = Article.query.filter_by(id=article_id).one()
-
-        context = BookmarkContext.find_or_create(
+        [bookmark] = cls.import_all(
             session,
-            _context,
-            context_identifier.context_type if context_identifier else None,
-            origin_lang,
-            c_sentence_i,
-            c_token_i,
-            left_ellipsis,
-            right_ellipsis,
+            user,
+            [
+                dict(
+                    origin=_origin,
+                    origin_lang=_origin_lang,
+                    translation=_translation,
+                    translation_lang=_translation_lang,
+                    context=_context,
+                    article_id=article_id,
+                    source_id=source_id,
+                    learning_cycle=learning_cycle,
+                    sentence_i=sentence_i,
+                    token_i=token_i,
+                    total_tokens=total_tokens,
+                    c_paragraph_i=c_paragraph_i,
+                    c_sentence_i=c_sentence_i,
+                    c_token_i=c_token_i,
+                    in_content=in_content,
+                    left_ellipsis=left_ellipsis,
+                    right_ellipsis=right_ellipsis,
+                    context_identifier=context_identifier,
+                    level=level,
+                )
+            ],
         )
+        return bookmark
 
-        text = Text.find_or_create(
+    @classmethod
+    def import_all(cls, session, user, bookmarks: list):
+        """
+        Batch version of find_or_create, e.g. for importing the words of a
+        user from elsewhere; find_or_create is this with a single bookmark.
+
+        The languages come from the reference data cache. The words, the
+        contexts and the texts of all the bookmarks are looked up with IN
+        queries and the missing ones are inserted with one statement per
+        table; the articles are loaded together with their sources, and
+        the bookmarks of the user in the contexts with one more query. The
+        new bookmarks are inserted with one statement too, their study
+        queue entries refreshed in one pass, and everything is committed
+        once at the end.
+
+        :param bookmarks: list of dictionaries with the keys origin,
+            origin_lang, translation, translation_lang and context and,
+            optionally, the other parameters of find_or_create
+        :return: the bookmarks, in the same order
+        """
+        from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
+
+        languages = {
+            code: Language.find_or_create(code)
+            for each in bookmarks
+            for code in [each["origin_lang"], each["translation_lang"]]
+        }
+        words = UserWord.find_or_create_all(
             session,
-            _context,
-            origin_lang,
-            None,
-            article,
-            c_paragraph_i,
-            c_sentence_i,
-            c_token_i,
-            in_content,
-            left_ellipsis,
-            right_ellipsis,
+            [(each["origin"], languages[each["origin_lang"]]) for each in bookmarks]
+            + [
+                (each["translation"], languages[each["translation_lang"]])
+                for each in bookmarks
+            ],
+            commit=False,
+        )
+        origins, translations = words[: len(bookmarks)], words[len(bookmarks) :]
+        articles_by_id, articles_by_source_id, sources = cls._articles_and_sources(
+            bookmarks
         )
 
-        translation = UserWord.find_or_create(session, _translation, translation_lang)
+        articles = []
+        for each in bookmarks:
+            article_id = _int_or_none(each.get("article_id"))
+            source_id = _int_or_none(each.get("source_id"))
+
+            # TODO: This will be temporary.
+            article = None
+            if source_id and not article_id:
+                article = articles_by_source_id.get(source_id)
+            if article_id:
+                article = articles_by_id.get(article_id)
+                if article is None:
+                    raise NoResultFound(f"No article with id {article_id}")
+            articles.append(article)
+
+        contexts = BookmarkContext.find_or_create_all(
+            session,
+            [
+                (
+                    each["context"],
+                    (
+                        each["context_identifier"].context_type
+                        if each.get("context_identifier")
+                        else None
+                    ),
+                    languages[each["origin_lang"]],
+                    each.get("c_sentence_i"),
+                    each.get("c_token_i"),
+                    each.get("left_ellipsis"),
+                    each.get("right_ellipsis"),
+                )
+                for each in bookmarks
+            ],
+        )
+        texts = Text.find_or_create_all(
+            session,
+            [
+                (
+                    each["context"],
+                    languages[each["origin_lang"]],
+                    None,
+                    article,
+                    each.get("c_paragraph_i"),
+                    each.get("c_sentence_i"),
+                    each.get("c_token_i"),
+                    each.get("in_content"),
+                    each.get("left_ellipsis"),
+                    each.get("right_ellipsis"),
+                )
+                for each, article in zip(bookmarks, articles)
+            ],
+        )
+        bookmarks_in_contexts = cls._bookmarks_in_contexts(
+            user, set(each.id for each in contexts)
+        )
 
         now = datetime.now()
-
-        try:
-            # try to find this bookmark
-            bookmark = Bookmark.find_by_user_word_and_context(user, origin, context)
-
-            # update the translation
-            bookmark.translation = translation
-
-        except sqlalchemy.orm.exc.NoResultFound as e:
-            bookmark = cls(
-                origin,
-                translation,
-                user,
-                source,
-                text,
-                now,
-                learning_cycle=learning_cycle,
-                sentence_i=sentence_i,
-                token_i=token_i,
-                total_tokens=total_tokens,
-                context=context,
-                level=level,
+        result = []
+        new_bookmarks = []
+        for each, origin, translation, context, text in zip(
+            bookmarks, origins, translations, contexts, texts
+        ):
+            bookmarks_in_context = bookmarks_in_contexts.setdefault(context.id, [])
+            bookmark = next(
+                (b for b in bookmarks_in_context if b.origin_id == origin.id), None
             )
-        except Exception as e:
-            raise e
+            if bookmark is not None:
+                # update the translation
+                bookmark.translation = translation
+            else:
+                bookmark = cls(
+                    origin,
+                    translation,
+                    user,
+                    sources.get(_int_or_none(each.get("source_id"))),
+                    text,
+                    now,
+                    learning_cycle=each.get("learning_cycle", LearningCycle.NOT_SET),
+                    sentence_i=each.get("sentence_i"),
+                    token_i=each.get("token_i"),
+                    total_tokens=each.get("total_tokens"),
+                    context=context,
+                    level=each.get("level", 0),
+                    bookmarks_in_context=list(bookmarks_in_context),
+                )
+                bookmarks_in_context.append(bookmark)
+                new_bookmarks.append(bookmark)
+            result.append(bookmark)
+
+        # the translations of the existing bookmarks
+        session.flush()
+        inserted = cls._insert_all(session, user, new_bookmarks)
+        result = [
+            inserted.get((each.origin.id, each.context.id), each) for each in result
+        ]
+
+        for each, bookmark in zip(bookmarks, result):
+            bookmark.create_context_mapping(
+                session, each.get("context_identifier"), commit=False
+            )
+        cls._record_new_bookmarks(session, inserted.values())
+        StudyQueueEntry.refresh_all(session, result)
 
-        session.add(bookmark)
-        bookmark.create_context_mapping(session, context_identifier, commit=False)
-        session.add(bookmark)
         session.commit()
-        return bookmark
+        return result
+
+    @classmethod
+    def _insert_all(cls, session, user, new_bookmarks, chunk_size=500):
+        """
+        Inserts the new bookmarks with one multi-row INSERT, rather than the
+        one INSERT per row that the ORM needs for getting the generated ids,
+        and reads them back.
+
+        :param new_bookmarks: transient bookmarks, with different origins
+            or contexts
+        :return: dict from the (origin id, context id) of every bookmark to
+            the bookmark as inserted
+        """
+        if not new_bookmarks:
+            return {}
+
+        mapper = sqlalchemy.inspect(cls)
+        rows = []
+        for bookmark in new_bookmarks:
+            row = {
+                column.key: getattr(bookmark, column.key)
+                for column in mapper.column_attrs
+                if not column.columns[0].primary_key
+            }
+            # the foreign keys are only set from the relationships on flush
+            for many_to_one in mapper.relationships:
+                if many_to_one.direction is not sqlalchemy.orm.MANYTOONE:
+                    continue
+                related = getattr(bookmark, many_to_one.key)
+                for local, remote in many_to_one.local_remote_pairs:
+                    row[local.key] = getattr(related, remote.key) if related else None
+            rows.append(row)
+        session.execute(insert(cls.__table__), rows)
+
+        keys = [(each["origin_id"], each["context_id"]) for each in rows]
+        inserted = {}
+        for start in range(0, len(keys), chunk_size):
+            for each in (
+                cls.query.filter(cls.user_id == user.id)
+                .filter(
+                    tuple_(cls.origin_id, cls.context_id).in_(
+                        keys[start : start + chunk_size]
+                    )
+                )
+                .order_by(cls.id)
+            ):
+                # the latest, if the same word was imported concurrently
+                inserted[(each.origin_id, each.context_id)] = each
+        return inserted
+
+    @staticmethod
+    def _bookmarks_in_contexts(user, context_ids, chunk_size=500):
+        """
+        :return: dict from the id of every context to the list of the
+            bookmarks of the user in it
+        """
+        context_ids = list(context_ids)
+        result = {}
+        for start in range(0, len(context_ids), chunk_size):
+            for each in (
+                Bookmark.query.filter(Bookmark.user_id == user.id)
+                .filter(
+                    Bookmark.context_id.in_(context_ids[start : start + chunk_size])
+                )
+                .order_by(Bookmark.id)
+            ):
+                result.setdefault(each.context_id, []).append(each)
+        return result
+
+    @staticmethod
+    def _record_new_bookmarks(session, new_bookmarks):
+        # one increment of the daily activity per day and language
+        by_day_and_language = {}
+        for each in new_bookmarks:
+            key = (each.time.date(), each.origin.language_id)
+            by_day_and_language.setdefault(key, []).append(each)
+        for day_and_language in by_day_and_language.values():
+            DailyActivity.record_bookmark(
+                session, day_and_language[0], count=len(day_and_language)
+            )
+
+    @staticmethod
+    def _articles_and_sources(bookmarks):
+        """
+        Loads the articles and the sources referred to by the bookmarks
+        with one query, plus one for the sources that are not of articles.
+
+        :return: dicts from article id to article, from source id to
+            article and from source id to source
+        """
+        article_ids = set(_int_or_none(each.get("article_id")) for each in bookmarks)
+        source_ids = set(_int_or_none(each.get("source_id")) for each in bookmarks)
+        article_ids.discard(None)
+        source_ids.discard(None)
+
+        articles = []
+        if article_ids or source_ids:
+            articles = (
+                Article.query.options(joinedload(Article.source))
+                .filter(
+                    sqlalchemy.or_(
+                        Article.id.in_(article_ids), Article.source_id.in_(source_ids)
+                    )
+                )
+                .all()
+            )
+
+        sources = {each.source_id: each.source for each in articles if each.source}
+        missing_source_ids = source_ids - sources.keys()
+        if missing_source_ids:
+            for each in Source.query.filter(Source.id.in_(missing_source_ids)):
+                sources[each.id] = each
+
+        return (
+            {each.id: each for each in articles},
+            {each.source_id: each for each in articles if each.source_id},
+            sources,
+        )
 
     def sorted_exercise_log(self):
         from zeeguu.core.model.sorted_exercise_log import SortedExerciseLog
@@ -702,5 +992,15 @@ class Bookmark(db.Model):
             log(f"Log: {exercise_log.summary()}: bookmark {self.id} learned!")
             self.learned_time = exercise_log.last_exercise_time()
             session.add(self)
+
+            DailyActivity.record_learned_word(session, self)
+
+            from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
+
+            StudyQueueEntry.refresh(session, self)
         else:
             log(f"Log: {exercise_log.summary()}: bookmark {self.id} not learned yet.")
+
+
+def _int_or_none(value):
+    return int(value) if value else None
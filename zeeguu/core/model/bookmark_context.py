@@ -2,8 +2,12 @@ from zeeguu.core.model.language import Language
 from zeeguu.core.model.new_text import NewText
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import (
+    find_or_create_all_atomically,
+    find_or_create_atomically,
+)
 import sqlalchemy
-import time
+from sqlalchemy.orm import joinedload
 import json
 
 
@@ -61,7 +65,15 @@ class BookmarkContext(db.Model):
 
     from zeeguu.core.model.context_type import ContextType
 
-    __table_args__ = {"mysql_collate": "utf8_bin"}
+    __table_args__ = (
+        db.UniqueConstraint(
+            "text_id",
+            "context_type_key",
+            "language_key",
+            name="bookmark_context_text",
+        ),
+        {"mysql_collate": "utf8_bin"},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     text_id = db.Column(db.Integer, db.ForeignKey(NewText.id))
@@ -75,6 +87,15 @@ class BookmarkContext(db.Model):
     language_id = db.Column(db.Integer, db.ForeignKey(Language.id))
     language = db.relationship(Language)
 
+    # the ids, with 0 instead of NULL, for the unique index; MySQL allows
+    # any number of rows with the same key when the key has a NULL
+    context_type_key = db.Column(
+        db.Integer, db.Computed("coalesce(context_type_id, 0)", persisted=True)
+    )
+    language_key = db.Column(
+        db.Integer, db.Computed("coalesce(language_id, 0)", persisted=True)
+    )
+
     right_ellipsis = db.Column(db.Boolean)
     left_ellipsis = db.Column(db.Boolean)
     sentence_i = db.Column(db.Integer)
@@ -171,39 +192,80 @@ class BookmarkContext(db.Model):
         if context_type:
             context_type = ContextType.find_by_type(context_type)
 
-        try:
-            return (
-                cls.query.filter(cls.text == text_row)
-                .filter(cls.context_type == context_type)
-                .filter(cls.language == language)
-                .one()
+        return find_or_create_atomically(
+            session,
+            cls,
+            [
+                cls.text == text_row,
+                cls.context_type == context_type,
+                cls.language == language,
+            ],
+            lambda: cls(
+                text_row,
+                context_type,
+                language,
+                sentence_i,
+                token_i,
+                left_ellipsis,
+                right_ellipsis,
+            ),
+            commit=commit,
+        )
+
+    @classmethod
+    def find_or_create_all(cls, session, contexts):
+        """
+        Bulk version of find_or_create, e.g. for importing many bookmarks:
+        the texts and the contexts that exist are looked up with IN queries
+        and the missing ones are inserted with one statement per table.
+        Does not commit.
+
+        :param contexts: list of tuples with the arguments of find_or_create,
+            (content, context_type, language, sentence_i, token_i,
+            left_ellipsis, right_ellipsis)
+        :return: list with the Context of every tuple, in the same order
+        """
+        from zeeguu.core.model.context_type import ContextType
+
+        text_ids = NewText.find_or_create_all(session, [each[0] for each in contexts])
+
+        keys = []
+        rows = {}
+        for (
+            content,
+            context_type,
+            language,
+            sentence_i,
+            token_i,
+            left_ellipsis,
+            right_ellipsis,
+        ) in contexts:
+            context_type_id = (
+                ContextType.find_by_type(context_type).id if context_type else None
+            )
+            # the values of the unique index, with 0 instead of NULL
+            key = (text_ids[content.strip()], context_type_id or 0, language.id)
+            keys.append(key)
+            rows.setdefault(
+                key,
+                dict(
+                    text_id=key[0],
+                    context_type_id=context_type_id,
+                    language_id=language.id,
+                    sentence_i=sentence_i,
+                    token_i=token_i,
+                    left_ellipsis=left_ellipsis,
+                    right_ellipsis=right_ellipsis,
+                ),
             )
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            try:
-                new = cls(
-                    text_row,
-                    context_type,
-                    language,
-                    sentence_i,
-                    token_i,
-                    left_ellipsis,
-                    right_ellipsis,
-                )
-                session.add(new)
-                if commit:
-                    session.commit()
-                return new
-            except Exception as e:
-                print("Exception was: ", e)
-                for i in range(10):
-                    try:
-                        session.rollback()
-                        t = cls.query.filter(cls.text == text_row).one()
-                        print("found text after recovering from race")
-                        return t
-                    except:
-                        print(
-                            "exception of second degree in BookmarkContext..." + str(i)
-                        )
-                        time.sleep(0.3)
-                        continue
+
+        found = find_or_create_all_atomically(
+            session,
+            cls,
+            [cls.text_id, cls.context_type_key, cls.language_key],
+            keys,
+            rows.get,
+            # the content of the contexts is needed by the new bookmarks
+            options=[joinedload(cls.text)],
+        )
+        return [found[key] for key in keys]
@@ -0,0 +1,71 @@
+from sqlalchemy import Column, Integer, String, insert, update
+
+from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
+
+
+class CacheGeneration(db.Model):
+    """
+    Named counters that are bumped whenever something changes that cached
+    results depend on, e.g. new articles in a language; the caches make
+    the current generations part of their keys, so the results computed
+    before a bump are not used anymore.
+
+    Stored in the DB since the changes (e.g. by the crawler) and the
+    caches (e.g. in every API worker) are in different processes.
+    """
+
+    __tablename__ = "cache_generation"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    name = Column(String(64), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+    def __init__(self, name):
+        self.name = name
+        self.generation = 0
+
+    def __repr__(self):
+        return f"<CacheGeneration {self.name}: {self.generation}>"
+
+    @classmethod
+    def current(cls, names):
+        """
+        :return: dict with the generation of every name; 0 for the names
+        that were never bumped
+        """
+        found = dict(
+            db.session.query(cls.name, cls.generation).filter(cls.name.in_(names))
+        )
+        return {name: found.get(name, 0) for name in names}
+
+    @classmethod
+    def bump(cls, session, name):
+        """
+        Adds the increment to the session, without committing; the
+        increment is done by the DB, so concurrent bumps are not lost.
+        """
+        counter = find_or_create_atomically(
+            session, cls, [cls.name == name], lambda: cls(name), commit=False
+        )
+        counter.generation = cls.generation + 1
+        session.add(counter)
+
+    @classmethod
+    def bump_with_connection(cls, connection, name):
+        """
+        Like bump, for when the session can't be used, e.g. in the mapper
+        events during a flush; in the transaction of the connection.
+        """
+        table = cls.__table__
+        connection.execute(
+            insert(table)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            dict(name=name, generation=0),
+        )
+        connection.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(generation=table.c.generation + 1)
+        )
@@ -1,4 +1,5 @@
 import sqlalchemy
+from sqlalchemy import insert
 from zeeguu.core.model import db
 from zeeguu.core.model.new_text import NewText
 
@@ -46,7 +47,39 @@ class Caption(db.Model):
         session.add(caption)
         session.commit()
         return caption
-    
+
+    @classmethod
+    def create_all(cls, session, video, captions):
+        """
+        Bulk version of create: resolves the texts of all the captions at
+        once and inserts the captions with one multi-row INSERT. Does not
+        commit.
+
+        :param video: Video, already flushed
+        :param captions: list of dicts with time_start, time_end and text
+        :return: the number of captions
+        """
+        if not captions:
+            return 0
+        text_ids = NewText.find_or_create_all(
+            session, [each["text"] for each in captions]
+        )
+        session.execute(
+            insert(cls),
+            [
+                dict(
+                    video_id=video.id,
+                    time_start=each["time_start"],
+                    time_end=each["time_end"],
+                    text_id=text_ids[each["text"].strip()],
+                )
+                for each in captions
+            ],
+        )
+        # the relationship does not know about the inserted rows
+        session.expire(video, ["captions"])
+        return len(captions)
+
     @classmethod
     def find_by_id(cls, caption_id: int):
         return cls.query.filter_by(id=caption_id).first()
@@ -0,0 +1,295 @@
+from datetime import date, datetime
+
+from sqlalchemy import func, insert, update
+
+from zeeguu.core.model import db
+from zeeguu.core.model.language import Language
+from zeeguu.core.model.user import User
+
+
+class DailyActivity(db.Model):
+    """
+    Per user, language and day rollup of the learning activity: time spent
+    reading and doing exercises, number of exercises and of correct ones,
+    bookmarks created and words learned.
+
+    The rows are incremented when the sessions, exercises and bookmarks are
+    saved, so the statistics of a user can be computed from one row per day
+    instead of scanning all the underlying events.
+
+    Durations are in milliseconds, like in the sessions.
+    """
+
+    __tablename__ = "daily_activity"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id), primary_key=True)
+    language_id = db.Column(db.Integer, db.ForeignKey(Language.id), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+
+    reading_duration = db.Column(db.Integer, nullable=False, default=0)
+    exercise_duration = db.Column(db.Integer, nullable=False, default=0)
+    exercise_count = db.Column(db.Integer, nullable=False, default=0)
+    correct_exercise_count = db.Column(db.Integer, nullable=False, default=0)
+    bookmark_count = db.Column(db.Integer, nullable=False, default=0)
+    learned_word_count = db.Column(db.Integer, nullable=False, default=0)
+
+    COUNTERS = [
+        "reading_duration",
+        "exercise_duration",
+        "exercise_count",
+        "correct_exercise_count",
+        "bookmark_count",
+        "learned_word_count",
+    ]
+
+    def __init__(self, user_id, language_id, day: date):
+        self.user_id = user_id
+        self.language_id = language_id
+        self.day = day
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+
+    def __repr__(self):
+        return f"<DailyActivity {self.user_id} {self.language_id} {self.day}>"
+
+    @classmethod
+    def increment(cls, db_session, user_id, language_id, time: datetime, **deltas):
+        """
+        Adds the deltas (counter name -> value) to the row of the day of
+        the given time. Not committed.
+
+        The row is created with an INSERT IGNORE and the counters are
+        incremented by the DB, so concurrent requests for the same user
+        and day neither fail nor lose updates.
+        """
+        if not user_id or not language_id or not time:
+            return
+
+        key = dict(user_id=user_id, language_id=language_id, day=time.date())
+        db_session.execute(
+            insert(cls.__table__)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            key,
+        )
+        columns = cls.__table__.c
+        db_session.execute(
+            update(cls.__table__)
+            .where(*[columns[name] == value for name, value in key.items()])
+            .values(
+                {counter: columns[counter] + delta for counter, delta in deltas.items()}
+            )
+        )
+
+    @classmethod
+    def exercise_session_languages(cls, db_session, user_id, session_ids=None):
+        """
+        Exercise sessions don't have a language; theirs is the one of the
+        words practiced in them. Sessions without exercises get the language
+        the user is learning. Used both by the incremental updates and by
+        the rebuild, so that they agree.
+
+        :return: dict from session id to language id, for the sessions
+        with exercises
+        """
+        from zeeguu.core.model import Bookmark, Exercise, UserWord
+        from zeeguu.core.model.bookmark import bookmark_exercise_mapping
+
+        mapping = bookmark_exercise_mapping.c
+        query = (
+            db_session.query(Exercise.session_id, func.min(UserWord.language_id))
+            .join(bookmark_exercise_mapping, mapping.exercise_id == Exercise.id)
+            .join(Bookmark, mapping.bookmark_id == Bookmark.id)
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .filter(Bookmark.user_id == user_id)
+        )
+        if session_ids is not None:
+            query = query.filter(Exercise.session_id.in_(session_ids))
+        return dict(query.group_by(Exercise.session_id))
+
+    @classmethod
+    def add_session_duration(cls, db_session, session, duration_delta):
+        """
+        To be called when the duration of a reading or an exercise session
+        changes. The time is accounted on the day the session started.
+        """
+        from zeeguu.core.model import UserReadingSession, UserExerciseSession
+
+        if not duration_delta:
+            return
+
+        if isinstance(session, UserReadingSession):
+            cls.increment(
+                db_session,
+                session.user_id,
+                session.article.language_id if session.article else None,
+                session.start_time,
+                reading_duration=duration_delta,
+            )
+        elif isinstance(session, UserExerciseSession):
+            languages = cls.exercise_session_languages(
+                db_session, session.user_id, [session.id]
+            )
+            cls.increment(
+                db_session,
+                session.user_id,
+                languages.get(session.id, session.user.learned_language_id),
+                session.start_time,
+                exercise_duration=duration_delta,
+            )
+
+    @classmethod
+    def record_exercise(cls, db_session, bookmark, outcome: str, time: datetime):
+        from zeeguu.core.model import ExerciseOutcome
+
+        cls.increment(
+            db_session,
+            bookmark.user_id or bookmark.user.id,
+            bookmark.origin.language_id,
+            time,
+            exercise_count=1,
+            correct_exercise_count=int(
+                outcome in ExerciseOutcome.correct_on_first_try_outcomes
+            ),
+        )
+
+    @classmethod
+    def record_bookmark(cls, db_session, bookmark, count=1):
+        """
+        :param count: -1 when the bookmark is deleted
+        """
+        cls.increment(
+            db_session,
+            bookmark.user_id or bookmark.user.id,
+            bookmark.origin.language_id,
+            bookmark.time,
+            bookmark_count=count,
+        )
+
+    @classmethod
+    def record_learned_word(cls, db_session, bookmark):
+        cls.increment(
+            db_session,
+            bookmark.user_id or bookmark.user.id,
+            bookmark.origin.language_id,
+            bookmark.learned_time,
+            learned_word_count=1,
+        )
+
+    @classmethod
+    def by_day(
+        cls, user_id, from_day: date = None, to_day: date = None, language_id=None
+    ):
+        """
+        :return: list of (day, {counter: value}) sorted by day, with the
+        activity in all the languages summed up unless language_id is given
+        """
+        query = db.session.query(
+            cls.day, *[func.sum(getattr(cls, counter)) for counter in cls.COUNTERS]
+        ).filter(cls.user_id == user_id)
+        if language_id:
+            query = query.filter(cls.language_id == language_id)
+        if from_day:
+            query = query.filter(cls.day >= from_day)
+        if to_day:
+            query = query.filter(cls.day <= to_day)
+        query = query.group_by(cls.day).order_by(cls.day)
+
+        return [
+            (row[0], dict(zip(cls.COUNTERS, [int(each or 0) for each in row[1:]])))
+            for row in query
+        ]
+
+    @classmethod
+    def rebuild_for_user(cls, db_session, user):
+        """
+        Recomputes the rollup of the user from the sessions, exercises
+        and bookmarks. Used for backfilling.
+        """
+        from zeeguu.core.model import (
+            Article,
+            Bookmark,
+            Exercise,
+            ExerciseOutcome,
+            UserExerciseSession,
+            UserReadingSession,
+            UserWord,
+        )
+        from zeeguu.core.model.bookmark import bookmark_exercise_mapping
+
+        mapping = bookmark_exercise_mapping.c
+
+        cls.query.filter_by(user_id=user.id).delete()
+
+        rows = {}
+
+        def add(language_id, time, counter, delta):
+            if not language_id or not time or not delta:
+                return
+            key = (language_id, time.date())
+            if key not in rows:
+                rows[key] = {each: 0 for each in cls.COUNTERS}
+            rows[key][counter] += delta
+
+        reading_sessions = (
+            db_session.query(
+                Article.language_id,
+                UserReadingSession.start_time,
+                UserReadingSession.duration,
+            )
+            .join(Article, UserReadingSession.article_id == Article.id)
+            .filter(UserReadingSession.user_id == user.id)
+        )
+        for language_id, start_time, duration in reading_sessions:
+            add(language_id, start_time, "reading_duration", duration)
+
+        session_languages = cls.exercise_session_languages(db_session, user.id)
+        exercise_sessions = db_session.query(
+            UserExerciseSession.id,
+            UserExerciseSession.start_time,
+            UserExerciseSession.duration,
+        ).filter(UserExerciseSession.user_id == user.id)
+        for session_id, start_time, duration in exercise_sessions:
+            language_id = session_languages.get(session_id, user.learned_language_id)
+            add(language_id, start_time, "exercise_duration", int(duration or 0))
+
+        exercises = (
+            db_session.query(
+                UserWord.language_id, Exercise.time, ExerciseOutcome.outcome
+            )
+            .select_from(Exercise)
+            .join(bookmark_exercise_mapping, mapping.exercise_id == Exercise.id)
+            .join(Bookmark, mapping.bookmark_id == Bookmark.id)
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .join(ExerciseOutcome, Exercise.outcome_id == ExerciseOutcome.id)
+            .filter(Bookmark.user_id == user.id)
+        )
+        for language_id, time, outcome in exercises:
+            add(language_id, time, "exercise_count", 1)
+            add(
+                language_id,
+                time,
+                "correct_exercise_count",
+                int(outcome in ExerciseOutcome.correct_on_first_try_outcomes),
+            )
+
+        bookmarks = (
+            db_session.query(UserWord.language_id, Bookmark.time, Bookmark.learned_time)
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .filter(Bookmark.user_id == user.id)
+        )
+        for language_id, time, learned_time in bookmarks:
+            add(language_id, time, "bookmark_count", 1)
+            add(language_id, learned_time, "learned_word_count", 1)
+
+        if rows:
+            db_session.execute(
+                insert(cls),
+                [
+                    dict(user_id=user.id, language_id=language_id, day=day, **counters)
+                    for (language_id, day), counters in rows.items()
+                ],
+            )
+
+        return len(rows)
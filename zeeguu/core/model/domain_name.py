@@ -2,13 +2,11 @@ import re
 
 import sqlalchemy
 from sqlalchemy.orm.exc import NoResultFound
-import time
-
-import logging
 
 import zeeguu.core
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 
 class DomainName(db.Model):
@@ -53,25 +51,6 @@ class DomainName(db.Model):
     @classmethod
     def find_or_create(cls, session, url: str):
         _domain = cls.get_domain(url)
-        try:
-            return cls.find(_domain)
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            # except:
-            try:
-                new = cls(_domain)
-                session.add(new)
-                session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError or sqlalchemy.exc.DatabaseError:
-                # except:
-                for i in range(10):
-                    try:
-                        session.rollback()
-                        d = cls.find(_domain)
-                        logging.info("found domain after recovering from race")
-                        return d
-                    except:
-                        logging.info("exception of second degree in domain..." + str(i))
-                        time.sleep(0.1)
-                        continue
-                    break
+        return find_or_create_atomically(
+            session, cls, [cls.domain_name == _domain], lambda: cls(_domain)
+        )
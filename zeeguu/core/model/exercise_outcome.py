@@ -2,6 +2,7 @@ import sqlalchemy
 import zeeguu.core
 
 from zeeguu.core.model import db
+from zeeguu.core.model import reference_data_cache
 
 
 class ExerciseOutcome(db.Model):
@@ -23,6 +24,7 @@ class ExerciseOutcome(db.Model):
     OTHER_FEEDBACK = "other_feedback"
 
     correct_outcomes = [CORRECT, TOO_EASY, "Correct"]
+    correct_on_first_try_outcomes = [CORRECT, "Correct"]
 
     too_easy_outcomes = ["too_easy", TOO_EASY]
 
@@ -82,12 +84,15 @@ class ExerciseOutcome(db.Model):
 
     @classmethod
     def find(cls, outcome: str):
-        return cls.query.filter_by(outcome=outcome).one()
+        result = reference_data_cache.find(cls, "outcome", outcome)
+        if result is None:
+            raise sqlalchemy.orm.exc.NoResultFound(f"No exercise outcome: {outcome}")
+        return result
 
     @classmethod
     def find_or_create(cls, session, _outcome: str):
         try:
-            outcome = cls.find(_outcome)
+            return cls.find(_outcome)
 
         except sqlalchemy.orm.exc.NoResultFound as e:
             outcome = cls(_outcome)
@@ -3,6 +3,7 @@ from sqlalchemy.orm.exc import NoResultFound
 import zeeguu.core
 
 from zeeguu.core.model import db
+from zeeguu.core.model import reference_data_cache
 
 
 class ExerciseSource(db.Model):
@@ -22,12 +23,15 @@ class ExerciseSource(db.Model):
 
     @classmethod
     def find(cls, source):
-        return cls.query.filter_by(source=source).one()
+        result = reference_data_cache.find(cls, "source", source)
+        if result is None:
+            raise NoResultFound(f"No exercise source: {source}")
+        return result
 
     @classmethod
     def find_or_create(cls, session, _source):
         try:
-            source = cls.find(_source)
+            return cls.find(_source)
 
         except NoResultFound as e:
             source = cls(_source)
@@ -6,6 +6,7 @@ from zeeguu.logging import logp
 import zeeguu
 
 from zeeguu.core.model import db
+from zeeguu.core.model import reference_data_cache
 
 
 class Language(db.Model):
@@ -139,7 +140,9 @@ class Language(db.Model):
 
     @classmethod
     def find(cls, code):
-        result = cls.query.filter(Language.code == code).one()
+        result = reference_data_cache.find(cls, "code", code)
+        if result is None:
+            raise NoResultFound(f"No language with code: {code}")
         return result
 
     @classmethod
@@ -164,7 +167,10 @@ class Language(db.Model):
 
     @classmethod
     def find_by_id(cls, i):
-        return cls.query.filter(Language.id == i).one()
+        result = reference_data_cache.find(cls, "id", i)
+        if result is None:
+            raise NoResultFound(f"No language with id: {i}")
+        return result
 
     def get_articles(
         self, after_date=None, most_recent_first=False, easiest_first=False
@@ -1,10 +1,8 @@
-import sqlalchemy.orm
-import time
-
-from sqlalchemy import UnicodeText
+from sqlalchemy import UnicodeText, insert
 
 from zeeguu.core.util import long_hash
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 
 class NewText(db.Model):
@@ -13,7 +11,7 @@ class NewText(db.Model):
     id = db.Column(db.Integer, primary_key=True)
 
     content = db.Column(UnicodeText)
-    content_hash = db.Column(db.String(64))
+    content_hash = db.Column(db.String(64), unique=True)
 
     def __init__(
         self,
@@ -55,28 +53,64 @@ class NewText(db.Model):
         # and some other times don't.
         # we fix it here now
         clean_text = text.strip()
-        try:
-            return cls.query.filter(cls.content_hash == long_hash(clean_text)).one()
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            try:
-                new = cls(
-                    clean_text,
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.content_hash == long_hash(clean_text)],
+            lambda: cls(clean_text),
+            commit=commit,
+        )
+
+    @classmethod
+    def find_or_create_all(cls, session, texts):
+        """
+        Bulk version of find_or_create, for e.g. the hundreds of captions
+        of a video: the existing texts are found with IN queries and the
+        missing ones are inserted with one multi-row INSERT; the texts
+        inserted concurrently by others are skipped by the DB, based on
+        the unique hash. Does not commit.
+
+        :param texts: list of strings
+        :return: dict from every (stripped) text to the id of its NewText
+        """
+        hashes = {}
+        for text in texts:
+            clean_text = text.strip()
+            hashes[long_hash(clean_text)] = clean_text
+
+        ids = cls._ids_by_hash(session, hashes.keys())
+        missing = [
+            dict(content=content, content_hash=content_hash)
+            for content_hash, content in hashes.items()
+            if content_hash not in ids
+        ]
+        if missing:
+            session.execute(
+                insert(cls.__table__)
+                .prefix_with("IGNORE", dialect="mysql")
+                .prefix_with("OR IGNORE", dialect="sqlite"),
+                missing,
+            )
+            # A locking read, since with MySQL's REPEATABLE READ a plain
+            # SELECT reads from the snapshot of the first lookup, which misses
+            # the texts that others inserted since; see upsert.py
+            ids.update(
+                cls._ids_by_hash(
+                    session, [each["content_hash"] for each in missing], lock=True
                 )
-                session.add(new)
-                if commit:
-                    session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError or sqlalchemy.exc.DatabaseError:
-                for i in range(10):
-                    try:
-                        session.rollback()
-                        t = cls.query.filter(
-                            cls.content_hash == long_hash(clean_text)
-                        ).one()
-                        print("found text after recovering from race")
-                        return t
-                    except Exception as e:
-                        print(f"Exception: '{e}'")
-                        print("exception of second degree in find NewText..." + str(i))
-                        time.sleep(0.3)
-                        continue
+            )
+
+        return {content: ids[content_hash] for content_hash, content in hashes.items()}
+
+    @classmethod
+    def _ids_by_hash(cls, session, hashes, lock=False, batch_size=1000):
+        hashes = list(hashes)
+        ids = {}
+        for start in range(0, len(hashes), batch_size):
+            query = session.query(cls.content_hash, cls.id).filter(
+                cls.content_hash.in_(hashes[start : start + batch_size])
+            )
+            if lock:
+                query = query.with_for_update(read=True)
+            ids.update(query)
+        return ids
@@ -0,0 +1,218 @@
+"""
+
+In-memory cache for the rows of the small reference tables
+(languages, exercise sources and outcomes, source and context
+types, topics).
+
+These tables have tens of rows that are practically never updated,
+but they are looked up in hot loops (per crawled article, per
+exercise, per translation). We keep a detached copy of every row
+and merge it into the current session when it is requested, which
+does not need a round trip to the DB.
+
+A lookup that misses looks for the row in the DB, so rows added by
+other processes are picked up; the values that are not found are
+remembered as well, so looking them up again does not go to the DB.
+
+Every insert, update or delete of these tables through the ORM bumps
+the "reference_data" CacheGeneration, in the same transaction, and
+drops the table from the cache of the process. The other processes
+compare the generation with the one of their cache at most every
+VERSION_CHECK_SECONDS and drop everything when it changed. Changes
+that are not done through the ORM must call bump_version.
+
+The cached tables are replaced, never modified, so the lookups of
+other threads don't see them half built.
+
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from zeeguu.core.model import db
+
+GENERATION = "reference_data"
+VERSION_CHECK_SECONDS = 60
+
+
+class _CachedTable:
+    def __init__(self, rows):
+        # detached copies of all the rows
+        self.rows = rows
+        # attribute -> {value: detached copy}
+        self.indexes = {}
+        # (attribute, value) of the lookups that found no row
+        self.misses = set()
+
+    def index(self, attribute):
+        index = self.indexes.get(attribute)
+        if index is None:
+            index = {getattr(each, attribute): each for each in self.rows}
+            self.indexes[attribute] = index
+        return index
+
+
+# model -> _CachedTable
+_tables = {}
+_lock = threading.Lock()
+
+# the generation the cache is of, and when it was compared with the DB
+_version = None
+_version_checked_at = 0
+
+
+def version():
+    return _version
+
+
+def bump_version(session):
+    """
+    To be called after changing the reference tables without the ORM;
+    drops the cache of this process now and the one of the others on
+    their next version check. Adds to the session without committing.
+    """
+    from zeeguu.core.model.cache_generation import CacheGeneration
+
+    CacheGeneration.bump(session, GENERATION)
+    invalidate()
+
+
+def invalidate(model=None):
+    with _lock:
+        if model is None:
+            _tables.clear()
+        else:
+            _tables.pop(model, None)
+
+
+def preload(models=None):
+    """
+    Loads the given reference tables (by default all of them) in the cache.
+    Called at startup; anything that was cached before is dropped.
+    """
+    invalidate()
+    _check_version(force=True)
+    for model in models or _default_models():
+        _load(model)
+
+
+def find(model, attribute: str, value):
+    """
+    :return: the row of the model for which attribute == value, merged into
+    the current session, or None if there is no such row
+    """
+    _check_version()
+
+    table = _table(model)
+    snapshot = table.index(attribute).get(value)
+    if snapshot is None:
+        if (attribute, value) in table.misses:
+            return None
+        # the row might have been added after the table was loaded
+        snapshot = _load_row(model, table, attribute, value)
+        if snapshot is None:
+            return None
+
+    return db.session.merge(snapshot, load=False)
+
+
+def all_rows(model):
+    _check_version()
+    return [db.session.merge(each, load=False) for each in _table(model).rows]
+
+
+def _default_models():
+    from zeeguu.core.model import (
+        Language,
+        ExerciseSource,
+        ExerciseOutcome,
+        Topic,
+    )
+    from zeeguu.core.model.source_type import SourceType
+    from zeeguu.core.model.context_type import ContextType
+
+    return [Language, ExerciseSource, ExerciseOutcome, SourceType, ContextType, Topic]
+
+
+def _check_version(force=False):
+    global _version, _version_checked_at
+
+    now = time.monotonic()
+    if not force and now - _version_checked_at < VERSION_CHECK_SECONDS:
+        return
+    _version_checked_at = now
+
+    from zeeguu.core.model.cache_generation import CacheGeneration
+
+    current = CacheGeneration.current([GENERATION])[GENERATION]
+    if current != _version:
+        invalidate()
+        _version = current
+
+
+def _table(model):
+    table = _tables.get(model)
+    if table is None:
+        table = _load(model)
+    return table
+
+
+def _load(model):
+    table = _CachedTable([_detached_copy(each) for each in model.query.all()])
+    with _lock:
+        _tables[model] = table
+    return table
+
+
+def _load_row(model, table, attribute, value):
+    """
+    Looks for a row that is not in the cached table; the table is replaced
+    with one that has the row, or remembers that there is none.
+    """
+    row = model.query.filter(getattr(model, attribute) == value).first()
+    if row is None:
+        with _lock:
+            table.misses.add((attribute, value))
+        return None
+
+    snapshot = _detached_copy(row)
+    with _lock:
+        # unless the table was dropped or reloaded in the meantime
+        if _tables.get(model) is table:
+            _tables[model] = _CachedTable(table.rows + [snapshot])
+    return snapshot
+
+
+def _detached_copy(instance):
+    mapper = inspect(instance).mapper
+    snapshot = mapper.class_manager.new_instance()
+    for column in mapper.column_attrs:
+        setattr(snapshot, column.key, getattr(instance, column.key))
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+_cached_models = None
+
+
+def _changed(mapper, connection, target):
+    global _cached_models
+
+    if _cached_models is None:
+        _cached_models = tuple(_default_models())
+    if not isinstance(target, _cached_models):
+        return
+
+    from zeeguu.core.model.cache_generation import CacheGeneration
+
+    # in the transaction of the change, with its connection, since the
+    # session can't be used during a flush
+    CacheGeneration.bump_with_connection(connection, GENERATION)
+    invalidate(type(target))
+
+
+for _event in ["after_insert", "after_update", "after_delete"]:
+    event.listen(db.Model, _event, _changed, propagate=True)
@@ -30,8 +30,27 @@ class Source(db.Model):
     word_count = Column(Integer)
     broken = Column(Integer)
 
+    # see SourceVocabulary; None for the sources of languages without word
+    # frequencies and for the ones crawled before it was introduced
+    vocabulary = relationship(
+        "SourceVocabulary",
+        uselist=False,
+        back_populates="source",
+        cascade="all, delete-orphan",
+    )
+
+    # see SourceSignature; only for the crawled articles that were not
+    # near-duplicates of another one
+    signature = relationship(
+        "SourceSignature",
+        uselist=False,
+        back_populates="source",
+        cascade="all, delete-orphan",
+    )
+
     def __init__(self, source_text, source_type, language: Language, broken=0):
         from zeeguu.core.util import compute_fk_and_wordcount
+        from zeeguu.core.model.source_vocabulary import SourceVocabulary
 
         self.source_text = source_text
         self.source_type = source_type
@@ -41,6 +60,7 @@ class Source(db.Model):
         self.fk_difficulty, self.word_count = compute_fk_and_wordcount(
             source_text.content, language
         )
+        self.vocabulary = SourceVocabulary.for_text(source_text.content, language)
 
     def get_content(self):
         return self.source_text.content
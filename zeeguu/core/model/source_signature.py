@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import relationship
+
+from zeeguu.core.content_quality import minhash
+from zeeguu.core.model import db
+from zeeguu.core.model.source import Source
+
+# the estimated share of common shingles from which two texts are
+# considered the same story
+NEAR_DUPLICATE_SIMILARITY = 0.8
+
+# the copies of a story are published within hours of each other; the
+# articles that recur with similar text (e.g. the daily weather report)
+# are compared only with the ones of the last days
+NEAR_DUPLICATE_WINDOW = timedelta(days=2)
+
+
+class SourceSignature(db.Model):
+    """
+    The MinHash signature of the text of a Source, and its LSH buckets,
+    to find the near-duplicates of a new text among the existing sources
+    without comparing it with all of them (see content_quality/minhash.py).
+
+    Stored for the articles that are crawled, when they are not
+    near-duplicates themselves.
+    """
+
+    __tablename__ = "source_signature"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    source_id = Column(Integer, ForeignKey(Source.id), primary_key=True)
+    source = relationship(Source, back_populates="signature")
+
+    # NUM_HASHES uint32
+    minhash = Column(LargeBinary)
+
+    buckets = relationship(
+        "SourceSignatureBucket",
+        back_populates="signature",
+        cascade="all, delete-orphan",
+    )
+
+    def __init__(self, signature):
+        """
+        :param signature: array as returned by minhash.minhash
+        """
+        self.minhash = np.asarray(signature, dtype="<u4").tobytes()
+        self.buckets = [
+            SourceSignatureBucket(each) for each in minhash.lsh_buckets(signature)
+        ]
+
+    def __repr__(self):
+        return f"<SourceSignature {self.source_id}>"
+
+    def values(self):
+        return np.frombuffer(self.minhash, dtype="<u4")
+
+    @classmethod
+    def for_text(cls, text):
+        """
+        :return: the signature of the text, or None for a text without words
+        """
+        signature = minhash.minhash(text)
+        return cls(signature) if signature is not None else None
+
+    @classmethod
+    def find(cls, source_id):
+        return cls.query.filter_by(source_id=source_id).first()
+
+    @classmethod
+    def find_near_duplicate(
+        cls, signature, language, since=None, threshold=NEAR_DUPLICATE_SIMILARITY
+    ):
+        """
+        :param signature: a SourceSignature that is not saved yet
+        :param language: only the articles in this language are compared
+        :param since: only the articles published since are compared; by
+        default the ones of the last NEAR_DUPLICATE_WINDOW
+        :return: (the stored signature that is most similar, its similarity),
+        or None if none reaches the threshold
+        """
+        from zeeguu.core.model.article import Article
+
+        if since is None:
+            since = datetime.now() - NEAR_DUPLICATE_WINDOW
+
+        candidates = (
+            cls.query.join(SourceSignatureBucket)
+            .join(Source, cls.source_id == Source.id)
+            .join(Article, Article.source_id == Source.id)
+            .filter(
+                SourceSignatureBucket.bucket.in_(
+                    [each.bucket for each in signature.buckets]
+                )
+            )
+            .filter(Source.language_id == language.id)
+            .filter(Article.published_time >= since)
+            .distinct()
+            .all()
+        )
+
+        values = signature.values()
+        scored = [
+            (minhash.similarity(each.values(), values), each) for each in candidates
+        ]
+        scored = [each for each in scored if each[0] >= threshold]
+        if not scored:
+            return None
+        best_similarity, best = max(scored, key=lambda each: each[0])
+        return best, best_similarity
+
+    @classmethod
+    def compute_for_source(cls, session, source):
+        """
+        (Re)computes the signature of an existing source, e.g. one that
+        was crawled before the signatures were introduced.
+        """
+        if source.signature is not None:
+            session.delete(source.signature)
+            session.flush()
+        source.signature = cls.for_text(source.get_content())
+        if source.signature is not None:
+            session.add(source.signature)
+        return source.signature
+
+
+class SourceSignatureBucket(db.Model):
+    """
+    One of the LSH buckets of a SourceSignature; the sources that share a
+    bucket are the candidates for being near-duplicates of each other.
+    """
+
+    __tablename__ = "source_signature_bucket"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    # the bucket first, since the lookups are by bucket
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False)
+    source_id = Column(Integer, ForeignKey(SourceSignature.source_id), primary_key=True)
+    signature = relationship(SourceSignature, back_populates="buckets")
+
+    def __init__(self, bucket):
+        self.bucket = bucket
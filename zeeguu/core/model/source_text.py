@@ -1,11 +1,8 @@
-import sqlalchemy.orm
-import time
-
 from sqlalchemy import UnicodeText
 
 from zeeguu.core.util import text_hash
 from zeeguu.core.model import db
-
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 TWO_MB = 2 * 10**6
 
@@ -16,7 +13,7 @@ class SourceText(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     # this mapes to TEXT in the mysql which can hold about 15K words
     content = db.Column(UnicodeText)
-    content_hash = db.Column(db.String(64))
+    content_hash = db.Column(db.String(64), unique=True)
 
     def __init__(
         self,
@@ -55,31 +52,10 @@ class SourceText(db.Model):
         # and some other times don't.
         # we fix it here now
         clean_text = text.strip()
-        try:
-            return cls.query.filter(cls.content_hash == text_hash(clean_text)).one()
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            try:
-                new = cls(
-                    clean_text,
-                )
-                session.add(new)
-                if commit:
-                    session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError or sqlalchemy.exc.DatabaseError:
-                for i in range(10):
-                    try:
-                        session.rollback()
-                        t = cls.query.filter(
-                            cls.content_hash == text_hash(clean_text)
-                        ).one()
-                        print("found text after recovering from race")
-                        return t
-                    except Exception as e:
-                        print(f"Exception: '{e}'")
-                        print(
-                            "exception of second degree in find SourceText..." + str(i)
-                        )
-                        time.sleep(0.3)
-                        continue
-                    break
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.content_hash == text_hash(clean_text)],
+            lambda: cls(clean_text),
+            commit=commit,
+        )
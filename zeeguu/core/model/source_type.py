@@ -1,14 +1,12 @@
 from zeeguu.core.model import db
+from zeeguu.core.model import reference_data_cache
 from sqlalchemy.orm.exc import NoResultFound
 
 
 class SourceType(db.Model):
     """
-    The values are never updated, so we can cache them after being fetched the first
-    time, avoiding the select.
-
-    Maybe we could use this?
-    https://docs.sqlalchemy.org/en/20/core/type_api.html#sqlalchemy.types.ExternalType.cache_ok
+    The values are never updated, so the lookups go through the
+    reference_data_cache, avoiding the select.
     """
 
     VIDEO = "Video"
@@ -32,16 +30,22 @@ class SourceType(db.Model):
 
     @classmethod
     def find_by_id(cls, source_type_id: int):
-        return cls.query.filter(cls.id == source_type_id).one()
+        result = reference_data_cache.find(cls, "id", source_type_id)
+        if result is None:
+            raise NoResultFound(f"No source type with id: {source_type_id}")
+        return result
 
     @classmethod
     def find_by_type(cls, type: str):
-        return cls.query.filter(cls.type == type).one()
+        result = reference_data_cache.find(cls, "type", type)
+        if result is None:
+            raise NoResultFound(f"No source type: {type}")
+        return result
 
     @classmethod
     def find_or_create(cls, session, type: str, commit=False):
         try:
-            return cls.query.filter(cls.type == type).one()
+            return cls.find_by_type(type)
         except NoResultFound:
             new_source_type = cls(type=type)
             session.add(new_source_type)
@@ -0,0 +1,162 @@
+import numpy as np
+from sqlalchemy import Column, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import relationship
+
+from zeeguu.core.model import db
+from zeeguu.core.model.source import Source
+from zeeguu.core import word_stats
+from zeeguu.core.word_stats import UNKNOWN_RANK
+from zeeguu.logging import log
+
+# Upper bounds (exclusive) of the buckets of the rank histogram; after them
+# comes one more bucket for the words that are not in the frequency lists
+RANK_HISTOGRAM_EDGES = np.array([500, 1000, 2000, 4000, 8000, 16000, UNKNOWN_RANK])
+
+MAX_WORD_COUNT = np.iinfo(np.uint16).max
+
+# MEDIUMBLOB in MySQL; a plain BLOB holds only 16K distinct words
+MEDIUM_BLOB = 2**24 - 1
+
+BULK_LOAD_CHUNK_SIZE = 1000
+
+
+class SourceVocabulary(db.Model):
+    """
+    The vocabulary of a Source, computed once when the source is created,
+    so that the features that look at the words of a text (difficulty for a
+    user, known-word highlighting, words to study in a text) do not have
+    to tokenize its content again.
+
+    The words are identified by their frequency rank in the language
+    (see zeeguu.core.word_stats) and stored as packed arrays:
+
+        word_ranks      the distinct ranks of the words, sorted, int32
+        word_counts     how many times every one of them occurs, uint16
+        rank_histogram  how many words of the text fall in every bucket
+                        of RANK_HISTOGRAM_EDGES, uint32
+
+    The words that are not in the frequency lists (names, numbers, typos)
+    all share UNKNOWN_RANK.
+    """
+
+    __tablename__ = "source_vocabulary"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    source_id = Column(Integer, ForeignKey(Source.id), primary_key=True)
+    source = relationship(Source, back_populates="vocabulary")
+
+    word_ranks = Column(LargeBinary(MEDIUM_BLOB))
+    word_counts = Column(LargeBinary(MEDIUM_BLOB))
+    rank_histogram = Column(LargeBinary)
+    word_count = Column(Integer)
+
+    def __init__(self, ranks):
+        """
+        :param ranks: the rank of every word of the text, in any order
+        """
+        ranks = np.asarray(ranks, dtype=np.int64)
+        distinct, counts = np.unique(ranks, return_counts=True)
+
+        self.word_ranks = distinct.astype("<i4").tobytes()
+        self.word_counts = np.minimum(counts, MAX_WORD_COUNT).astype("<u2").tobytes()
+        self.rank_histogram = self._histogram(distinct, counts).astype("<u4").tobytes()
+        self.word_count = len(ranks)
+
+    def __repr__(self):
+        return f"<SourceVocabulary {self.source_id}: {len(self.ranks())} words>"
+
+    @staticmethod
+    def _histogram(ranks, counts):
+        buckets = np.searchsorted(RANK_HISTOGRAM_EDGES, ranks, side="right")
+        return np.bincount(
+            buckets, weights=counts, minlength=len(RANK_HISTOGRAM_EDGES) + 1
+        ).astype(np.int64)
+
+    @classmethod
+    def for_text(cls, text, language):
+        """
+        :return: the vocabulary of the text, or None if there are no
+        word frequencies for the language
+        """
+        from zeeguu.core.util.text import split_words_from_text
+
+        try:
+            ranks = word_stats.word_ranks(split_words_from_text(text), language.code)
+        except FileNotFoundError:
+            log(f"no word frequencies for {language.code}; skipping the vocabulary")
+            return None
+        return cls(ranks)
+
+    def ranks(self):
+        return np.frombuffer(self.word_ranks, dtype="<i4")
+
+    def counts(self):
+        return np.frombuffer(self.word_counts, dtype="<u2")
+
+    def histogram(self):
+        """
+        :return: array with the number of words of the text in every bucket
+        of RANK_HISTOGRAM_EDGES, followed by the number of unknown words
+        """
+        return np.frombuffer(self.rank_histogram, dtype="<u4")
+
+    def unknown_word_count(self):
+        return int(self.histogram()[-1])
+
+    def all_word_ranks(self):
+        """
+        :return: array with a rank for every word of the text, as if it
+        was tokenized again, but in rank order
+        """
+        return np.repeat(self.ranks(), self.counts())
+
+    @classmethod
+    def find(cls, source_id):
+        return cls.query.filter_by(source_id=source_id).first()
+
+    @classmethod
+    def for_sources(cls, source_ids):
+        """
+        Loads the vocabularies of many sources with a few queries.
+
+        :return: dict from source id to SourceVocabulary; sources without
+        a vocabulary are missing from it
+        """
+        source_ids = list(set(each for each in source_ids if each is not None))
+        result = {}
+        for start in range(0, len(source_ids), BULK_LOAD_CHUNK_SIZE):
+            chunk = source_ids[start : start + BULK_LOAD_CHUNK_SIZE]
+            for each in cls.query.filter(cls.source_id.in_(chunk)).all():
+                result[each.source_id] = each
+        return result
+
+    @classmethod
+    def for_articles(cls, articles):
+        """
+        :return: dict from article id to SourceVocabulary, for the
+        articles that have one
+        """
+        by_source = cls.for_sources([each.source_id for each in articles])
+        return {
+            each.id: by_source[each.source_id]
+            for each in articles
+            if each.source_id in by_source
+        }
+
+    @classmethod
+    def compute_for_source(cls, session, source):
+        """
+        (Re)computes the vocabulary of an existing source, e.g. one that
+        was crawled before the vocabularies were introduced.
+        """
+        computed = cls.for_text(source.get_content(), source.language)
+        if computed is None:
+            return None
+
+        if source.vocabulary is None:
+            source.vocabulary = computed
+        else:
+            for column in ["word_ranks", "word_counts", "rank_histogram", "word_count"]:
+                setattr(source.vocabulary, column, getattr(computed, column))
+        session.add(source.vocabulary)
+        return source.vocabulary
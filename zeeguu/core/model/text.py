@@ -1,7 +1,8 @@
 import re
 
 import sqlalchemy.orm
-import time
+from sqlalchemy import UniqueConstraint
+
 from zeeguu.core.model import Article
 
 from zeeguu.core.util import text_hash
@@ -10,10 +11,17 @@ from zeeguu.core.model.url import Url
 from zeeguu.core.model.user_word import UserWord
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import (
+    find_or_create_all_atomically,
+    find_or_create_atomically,
+)
 
 
 class Text(db.Model):
-    __table_args__ = {"mysql_collate": "utf8_bin"}
+    __table_args__ = (
+        UniqueConstraint("content_hash", "article_key", name="text_in_article"),
+        {"mysql_collate": "utf8_bin"},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text()) # Before this was db.Column(db.String(64000), but that caused the following MySQL error: sqlalchemy.exc.OperationalError: (MySQLdb.OperationalError) (1074, "Column length too big for column 'content' (max = 21845); use BLOB or TEXT instead")
@@ -26,6 +34,11 @@ class Text(db.Model):
     url = db.relationship(Url)
 
     article_id = db.Column(db.Integer, db.ForeignKey(Article.id))
+    # article_id, with 0 instead of NULL, for the unique index; MySQL allows
+    # any number of rows with the same key when the key has a NULL
+    article_key = db.Column(
+        db.Integer, db.Computed("coalesce(article_id, 0)", persisted=True)
+    )
     article = db.relationship(Article)
 
     """
@@ -171,6 +184,7 @@ class Text(db.Model):
         in_content,
         left_elipsis,
         right_elipsis,
+        commit=True,
     ):
         """
         :param text: string
@@ -185,40 +199,73 @@ class Text(db.Model):
         # we fix it here now
 
         clean_text = text.strip()
-        try:
-            return (
-                cls.query.filter(cls.content_hash == text_hash(clean_text))
-                .filter(cls.article == article)
-                .one()
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.content_hash == text_hash(clean_text), cls.article == article],
+            lambda: cls(
+                clean_text,
+                language,
+                url,
+                article,
+                paragraph_i,
+                sentence_i,
+                token_i,
+                in_content,
+                left_elipsis,
+                right_elipsis,
+            ),
+            commit=commit,
+        )
+
+    @classmethod
+    def find_or_create_all(cls, session, texts):
+        """
+        Bulk version of find_or_create: the texts that exist are looked up
+        with IN queries and the missing ones are inserted with one
+        statement. Does not commit.
+
+        :param texts: list of tuples with the arguments of find_or_create,
+            (text, language, url, article, paragraph_i, sentence_i, token_i,
+            in_content, left_elipsis, right_elipsis)
+        :return: list with the Text of every tuple, in the same order
+        """
+        keys = []
+        rows = {}
+        for (
+            text,
+            language,
+            url,
+            article,
+            paragraph_i,
+            sentence_i,
+            token_i,
+            in_content,
+            left_elipsis,
+            right_elipsis,
+        ) in texts:
+            clean_text = text.strip()
+            # the values of the unique index, with 0 instead of NULL
+            key = (text_hash(clean_text), article.id if article else 0)
+            keys.append(key)
+            rows.setdefault(
+                key,
+                dict(
+                    content=clean_text,
+                    content_hash=key[0],
+                    language_id=language.id if language else None,
+                    url_id=url.id if url else None,
+                    article_id=article.id if article else None,
+                    paragraph_i=paragraph_i,
+                    sentence_i=sentence_i,
+                    token_i=token_i,
+                    in_content=in_content,
+                    left_ellipsis=left_elipsis,
+                    right_ellipsis=right_elipsis,
+                ),
             )
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            try:
-                new = cls(
-                    clean_text,
-                    language,
-                    url,
-                    article,
-                    paragraph_i,
-                    sentence_i,
-                    token_i,
-                    in_content,
-                    left_elipsis,
-                    right_elipsis,
-                )
-                session.add(new)
-                session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError or sqlalchemy.exc.DatabaseError:
-                for i in range(10):
-                    try:
-                        session.rollback()
-                        t = cls.query.filter(
-                            cls.content_hash == text_hash(clean_text)
-                        ).one()
-                        print("found text after recovering from race")
-                        return t
-                    except:
-                        print("exception of second degree in find text..." + str(i))
-                        time.sleep(0.3)
-                        continue
-                    break
+
+        found = find_or_create_all_atomically(
+            session, cls, [cls.content_hash, cls.article_key], keys, rows.get
+        )
+        return [found[key] for key in keys]
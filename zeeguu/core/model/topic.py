@@ -2,7 +2,9 @@ from zeeguu.logging import logp
 
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.exc import NoResultFound
 from zeeguu.core.model import db
+from zeeguu.core.model import reference_data_cache
 from zeeguu.core.model.language import Language
 from zeeguu.core.model.article_topic_map import ArticleTopicMap
 from datetime import datetime
@@ -71,7 +73,10 @@ class Topic(db.Model):
     @classmethod
     def find(cls, name: str):
         try:
-            return cls.query.filter(cls.title == name).one()
+            result = reference_data_cache.find(cls, "title", name)
+            if result is None:
+                raise NoResultFound(f"No topic: {name}")
+            return result
         except Exception as e:
             from sentry_sdk import capture_exception
 
@@ -81,7 +86,9 @@ class Topic(db.Model):
     @classmethod
     def find_by_id(cls, i):
         try:
-            result = cls.query.filter(cls.id == i).one()
+            result = reference_data_cache.find(cls, "id", i)
+            if result is None:
+                raise NoResultFound(f"No topic with id: {i}")
             return result
         except Exception as e:
             from sentry_sdk import capture_exception
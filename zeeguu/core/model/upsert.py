@@ -0,0 +1,93 @@
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+
+
+def find_or_create_atomically(session, model, filters, create, commit=True):
+    """
+    Finds the row of the model that matches the filters, or creates it,
+    without the race between two requests that try to create the same row.
+
+    The filters must match the columns of a unique index of the table. The
+    new row is inserted in a SAVEPOINT; if another request inserted the
+    same row in the meantime the unique index rejects ours, only the
+    savepoint is rolled back (the other pending changes of the session
+    are kept), and the row of the other request is returned. There is
+    no waiting and retrying.
+
+    :param filters: list of SQLAlchemy criteria, e.g. [Url.path == path]
+    :param create: function that returns the new object; not called
+    when the row exists
+    :param commit: whether to commit the session after creating the row
+    """
+    query = session.query(model).filter(*filters)
+
+    existing = query.first()
+    if existing is not None:
+        return existing
+
+    new = create()
+    try:
+        with session.begin_nested():
+            session.add(new)
+    except IntegrityError:
+        # A locking read, since with MySQL's REPEATABLE READ a plain SELECT
+        # would read from the snapshot taken before the other insert.
+        # SQLite ignores it; it has no concurrent writers anyway.
+        return query.with_for_update(read=True).one()
+
+    if commit:
+        session.commit()
+    return new
+
+
+def find_or_create_all_atomically(
+    session, model, key_columns, keys, new_row, options=(), chunk_size=500
+):
+    """
+    Bulk version of find_or_create_atomically: the existing rows are found
+    with chunked IN queries and the missing ones are inserted with one
+    multi-row INSERT IGNORE, so the rows that others inserted in the
+    meantime are skipped by the unique index instead of failing the
+    insert. Does not commit.
+
+    :param key_columns: the columns of a unique index of the table
+    :param keys: the values of the key columns of the rows, as tuples
+    :param new_row: function from a key to the dict of the column values
+    of the row; only called for the missing rows
+    :param options: loader options for the queries, e.g. joinedload(...)
+    :return: dict from every key to the object of its row
+    """
+    keys = list(dict.fromkeys(keys))
+    found = _find_by_keys(session, model, key_columns, keys, options, chunk_size)
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        session.execute(
+            insert(model.__table__)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            [new_row(key) for key in missing],
+        )
+        # a locking read, for the rows that others inserted; see above
+        found.update(
+            _find_by_keys(
+                session, model, key_columns, missing, options, chunk_size, lock=True
+            )
+        )
+
+    return found
+
+
+def _find_by_keys(session, model, key_columns, keys, options, chunk_size, lock=False):
+    found = {}
+    for start in range(0, len(keys), chunk_size):
+        query = (
+            session.query(model)
+            .options(*options)
+            .filter(tuple_(*key_columns).in_(keys[start : start + chunk_size]))
+        )
+        if lock:
+            query = query.with_for_update(read=True)
+        for each in query:
+            found[tuple(getattr(each, column.key) for column in key_columns)] = each
+    return found
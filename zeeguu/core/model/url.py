@@ -7,10 +7,9 @@ from requests import Request
 from sqlalchemy import UniqueConstraint
 
 import zeeguu.core
-import time
-import random
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 from zeeguu.core.model.domain_name import DomainName
 
@@ -94,42 +93,12 @@ class Url(db.Model):
             print(f"Path was too long. Was: {len(path)}, max: 255.")
             return None
 
-        try:
-            return cls.query.filter(cls.path == path).filter(cls.domain == domain).one()
-        except sqlalchemy.orm.exc.NoResultFound or sqlalchemy.exc.InterfaceError:
-            try:
-                new = cls(_url, title, domain)
-                session.add(new)
-                session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError or sqlalchemy.exc.DatabaseError:
-                for i in range(10):
-                    try:
-                        print("doing a rollback")
-                        session.rollback()
-                        domain = DomainName.find_or_create(session, _url)
-                        path = Url.get_path(_url)
-                        print(
-                            f"after rollback trying to find again: {domain.domain_name} + {path}"
-                        )
-                        u = (
-                            cls.query.filter(cls.path == path)
-                            .filter(cls.domain == domain)
-                            .first()
-                        )
-                        print("Found url after recovering from race")
-                        return u
-                    except Exception as e:
-                        print("Exception of second degree in url..." + str(i) + str(e))
-                        time.sleep(random.randrange(1, 10) * 0.1)
-                        from sentry_sdk import capture_message
-
-                        capture_message(
-                            "Exception of second degree in url..." + str(i) + str(e)
-                        )
-
-                        continue
-                    break
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.path == path, cls.domain == domain],
+            lambda: cls(_url, title, domain),
+        )
 
     @classmethod
     def find(cls, url, title=""):
@@ -1,8 +1,15 @@
 import json
 from datetime import datetime, timedelta
-from time import sleep
-
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, desc
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+    desc,
+    insert,
+)
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import relationship
 from zeeguu.core.model.user_reading_session import ALL_ARTICLE_INTERACTION_ACTIONS
@@ -26,10 +33,18 @@ from zeeguu.core.behavioral_modeling import (
 import zeeguu
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 
 class UserActivityData(db.Model):
-    __table_args__ = dict(mysql_collate="utf8_bin")
+    __table_args__ = (
+        # the same event can be uploaded more than once; see
+        # insert_ignoring_duplicates
+        UniqueConstraint(
+            "user_id", "time", "event", "value", name="user_activity_data_event"
+        ),
+        dict(mysql_collate="utf8_bin"),
+    )
     __tablename__ = "user_activity_data"
 
     id = Column(Integer, primary_key=True)
@@ -122,44 +137,17 @@ class UserActivityData(db.Model):
 
     @classmethod
     def find_or_create(cls, session, user, time, event, value, extra_data, source_id):
-        try:
-            log("found existing event; returning it instead of creating a new one")
-            return (
-                cls.query.filter_by(user=user)
-                .filter_by(time=time)
-                .filter_by(event=event)
-                .filter_by(value=value)
-                .one()
-            )
-        except sqlalchemy.orm.exc.MultipleResultsFound:
-            return (
-                cls.query.filter_by(user=user)
-                .filter_by(time=time)
-                .filter_by(event=event)
-                .filter_by(value=value)
-                .first()
-            )
-        except sqlalchemy.orm.exc.NoResultFound:
-            try:
-                new = cls(user, time, event, value, extra_data, source_id)
-                session.add(new)
-                session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError:
-                for _ in range(10):
-                    try:
-                        session.rollback()
-                        ev = (
-                            cls.query.filter_by(user=user)
-                            .filter_by(time=time)
-                            .filter_by(event=event)
-                            .one()
-                        )
-                        print("successfully avoided race condition. nice! ")
-                        return ev
-                    except sqlalchemy.orm.exc.NoResultFound:
-                        sleep(0.3)
-                        continue
+        return find_or_create_atomically(
+            session,
+            cls,
+            [
+                cls.user == user,
+                cls.time == time,
+                cls.event == event,
+                cls.value == value,
+            ],
+            lambda: cls(user, time, event, value, extra_data, source_id),
+        )
 
     @classmethod
     def find(
@@ -385,8 +373,37 @@ class UserActivityData(db.Model):
                 break
         return list_of_sessions
 
+    @staticmethod
+    def deduplication_key(row):
+        return row["user_id"], row["time"], row["event"], row["value"]
+
     @classmethod
-    def create_from_post_data(cls, session, data, user):
+    def insert_ignoring_duplicates(cls, session, rows):
+        """
+        Inserts all the rows with one multi-row INSERT; the rows of events
+        that are already in the DB are skipped by the DB, based on the
+        unique (user, time, event, value) key. Does not commit.
+
+        :param rows: list of dicts with the columns of the table
+        :return: the number of inserted rows
+        """
+        if not rows:
+            return 0
+        statement = (
+            insert(cls.__table__)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+        result = session.execute(statement, rows)
+        # not all the drivers report the row count of a multi-row insert
+        return result.rowcount if result.rowcount >= 0 else len(rows)
+
+    @classmethod
+    def row_from_post_data(cls, data, user_id):
+        """
+        :param data: the parameters of an event, as in /upload_user_activity_data
+        :return: dict with the columns of the row of the event
+        """
         _time = data.get("time", None)
         time = None
         if _time:
@@ -410,16 +427,38 @@ class UserActivityData(db.Model):
         if source_id == "":
             source_id = None
 
+        if not isinstance(extra_data, str):
+            # the batch upload sends JSON, where extra_data can be an object
+            extra_data = json.dumps(extra_data)
+
         log(
             f"{event} value[:42]: {value[:42]} extra_data[:42]: {extra_data[:42]} source_id: {source_id}"
         )
 
-        new_entry = UserActivityData.find_or_create(
-            session, user, time, event, value, extra_data, source_id
+        return dict(
+            user_id=user_id,
+            time=time,
+            event=event,
+            value=value,
+            extra_data=extra_data,
+            source_id=source_id,
         )
 
-        session.add(new_entry)
-        session.commit()
+    @classmethod
+    def create_from_post_data(cls, session, data, user):
+        """
+        Hands the event over to the activity ingestion, which writes it
+        in a batch with the events of the other requests.
+        """
+        cls.create_all_from_post_data(session, [data], user)
+
+    @classmethod
+    def create_all_from_post_data(cls, session, events, user):
+        from zeeguu.core.activity_ingestion import activity_ingestion
+
+        activity_ingestion().submit(
+            [cls.row_from_post_data(each, user.id) for each in events]
+        )
 
     @classmethod
     def get_last_activity_timestamp(cls, user_id):
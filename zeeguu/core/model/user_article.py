@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from sqlalchemy import (
     Column,
@@ -6,16 +7,19 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     Boolean,
+    Float,
     or_,
     desc,
+    tuple_,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import contains_eager, relationship
 from sqlalchemy.orm.exc import NoResultFound
 
 from zeeguu.core.model import Article, User
 from zeeguu.core.model.article_topic_user_feedback import ArticleTopicUserFeedback
 from zeeguu.core.model.article_difficulty_feedback import ArticleDifficultyFeedback
 from zeeguu.core.model.personal_copy import PersonalCopy
+from zeeguu.core.constants import EVENT_USER_SCROLL
 from zeeguu.core.util.encoding import datetime_to_json
 
 from zeeguu.core.model import db
@@ -65,12 +69,25 @@ class UserArticle(db.Model):
     # this tracks the state of that button
     liked = Column(Boolean)
 
+    # How much of the article the user read, from 0 to 1. Kept up to date
+    # from the scroll events and the reading sessions, so that the article
+    # lists don't have to compute it; NULL for the rows that are older than
+    # it and were not backfilled (tools/backfill_reading_completion.py)
+    reading_completion = Column(Float)
+
+    # above it an article is considered read
+    READ_THRESHOLD = 0.9
+    # the scroll position is not meaningful for the texts that fit in a
+    # screen or two; they are read when the user spent enough time on them
+    SHORT_ARTICLE_WORD_COUNT = 200
+
     def __init__(self, user, article, opened=None, starred=None, liked=None):
         self.user = user
         self.article = article
         self.opened = opened
         self.starred = starred
         self.liked = liked
+        self.reading_completion = 0
 
     def __repr__(self):
         return f"{self.user} and {self.article}: Opened: {self.opened}, Starred: {self.starred}, Liked: {self.liked}"
@@ -107,6 +124,86 @@ class UserArticle(db.Model):
             return self.starred
         return None
 
+    def update_reading_completion(self, completion):
+        """
+        The completion only grows: scrolling back up, or opening the
+        article again later, does not make it less read.
+        """
+        if completion > self.READ_THRESHOLD:
+            completion = 1
+        self.reading_completion = max(self.reading_completion or 0, completion)
+
+    @classmethod
+    def record_scroll_events(cls, db_session, rows):
+        """
+        Updates the reading completion from a batch of uploaded activity
+        events; the ones that are not scrolls are ignored. Does not commit.
+
+        :param rows: list of dicts as UserActivityData.row_from_post_data
+        """
+        from zeeguu.core.behavioral_modeling import find_last_reading_percentage
+
+        # (user id, source id) -> the furthest point read in the batch
+        read = {}
+        for row in rows:
+            if row["event"] != EVENT_USER_SCROLL or not row["source_id"]:
+                continue
+            if not row["extra_data"] or not row["value"]:
+                continue
+            try:
+                percentage = find_last_reading_percentage(json.loads(row["extra_data"]))
+            except (ValueError, TypeError, ZeroDivisionError):
+                # truncated JSON, or scroll points that are not (second, %)
+                continue
+            key = (row["user_id"], int(row["source_id"]))
+            read[key] = max(read.get(key, 0), percentage)
+
+        if not read:
+            return
+
+        user_articles = (
+            cls.query.join(Article)
+            .options(contains_eager(cls.article))
+            .filter(tuple_(cls.user_id, Article.source_id).in_(list(read.keys())))
+            .all()
+        )
+        for each in user_articles:
+            if (each.article.word_count or 0) < cls.SHORT_ARTICLE_WORD_COUNT:
+                continue
+            each.update_reading_completion(read[(each.user_id, each.article.source_id)])
+            db_session.add(each)
+
+    @classmethod
+    def record_reading_time(cls, db_session, reading_session):
+        """
+        To be called when the duration of a reading session changes: a
+        short article is read once the user spent on it, over all their
+        sessions, at least the time it takes to read it. Does not commit.
+        """
+        from zeeguu.core.model.user_reading_session import UserReadingSession
+        from zeeguu.core.util import ms_to_m, estimate_read_time
+
+        article = reading_session.article
+        if article is None:
+            return
+        if (article.word_count or 0) >= cls.SHORT_ARTICLE_WORD_COUNT:
+            return
+
+        user_article = cls.query.filter_by(
+            user_id=reading_session.user_id, article_id=article.id
+        ).first()
+        if user_article is None or user_article.reading_completion == 1:
+            return
+
+        total_reading_time = UserReadingSession.get_total_reading_for_user_article(
+            article, reading_session.user
+        )
+        if ms_to_m(total_reading_time or 0) >= estimate_read_time(
+            article.word_count or 0, ceil=False
+        ):
+            user_article.update_reading_completion(1)
+            db_session.add(user_article)
+
     @classmethod
     def find_by_article(cls, article: Article):
         try:
@@ -284,11 +381,14 @@ class UserArticle(db.Model):
             returned_info["translations"] = []
 
         else:
-            returned_info["reading_completion"] = (
-                UserActivityData.get_reading_completion_for_article(
-                    user_article_info.article_id, user_article_info.user_id
+            returned_info["reading_completion"] = user_article_info.reading_completion
+            if returned_info["reading_completion"] is None:
+                # not backfilled yet
+                returned_info["reading_completion"] = (
+                    UserActivityData.get_reading_completion_for_article(
+                        user_article_info.article_id, user_article_info.user_id
+                    )
                 )
-            )
             returned_info["starred"] = user_article_info.starred is not None
             returned_info["opened"] = user_article_info.opened is not None
             returned_info["liked"] = user_article_info.liked
@@ -1,7 +1,6 @@
 import sqlalchemy
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, UniqueConstraint
 from sqlalchemy.orm.exc import NoResultFound
-from datetime import time
 
 from zeeguu.core.model.user import User
 
@@ -10,6 +9,7 @@ from zeeguu.logging import log, logp
 import zeeguu
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import find_or_create_atomically
 
 
 class UserPreference(db.Model):
@@ -26,7 +26,10 @@ class UserPreference(db.Model):
 
     """
 
-    __table_args__ = {"mysql_collate": "utf8_bin"}
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="user_preference_key"),
+        {"mysql_collate": "utf8_bin"},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -132,23 +135,9 @@ class UserPreference(db.Model):
 
     @classmethod
     def find_or_create(cls, session, user: User, key: str, value: str = None):
-        try:
-            return cls._find(user, key)
-        except NoResultFound:
-            try:
-                new_pref = cls(user, key, value)
-                session.add(new_pref)
-                session.commit()
-                log("Created new preference since original was missing")
-                return new_pref
-            except sqlalchemy.exc.IntegrityError:
-                for _ in range(10):
-                    try:
-                        session.rollback()
-                        pref = cls._find(user, key)
-                        log("Successfully avoided race condition. Nice! ")
-                        return pref
-                    except sqlalchemy.orm.exc.NoResultFound:
-                        time.sleep(0.3)
-                        continue
-                    break
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.user == user, cls.key == key],
+            lambda: cls(user, key, value),
+        )
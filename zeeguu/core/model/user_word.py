@@ -2,11 +2,19 @@ import sqlalchemy.orm
 from sqlalchemy.orm.exc import NoResultFound
 from wordstats import Word
 
+from zeeguu.core.word_stats import word_rank
+
 import zeeguu.core
 
 from zeeguu.core.model.language import Language
 
 from zeeguu.core.model import db
+from zeeguu.core.model.upsert import (
+    find_or_create_all_atomically,
+    find_or_create_atomically,
+)
+
+FIND_ALL_CHUNK_SIZE = 500
 
 
 class UserWord(db.Model):
@@ -31,14 +39,17 @@ class UserWord(db.Model):
     def __init__(self, word, language):
         self.word = word
         self.language = language
+        self.rank = self._rank(word, language)
 
+    @staticmethod
+    def _rank(word, language):
         # TODO: Performance
         try:
-            self.rank = Word.stats(self.word, self.language.code).rank
+            return word_rank(word, language.code)
         except FileNotFoundError:
-            self.rank = None
+            return None
         except Exception:
-            self.rank = None
+            return None
 
     def __repr__(self):
         return f"<@UserWord {self.word} {self.language_id} {self.rank}>"
@@ -71,28 +82,47 @@ class UserWord(db.Model):
         )
 
     @classmethod
-    def find_or_create(cls, session, _word: str, language: Language):
-        try:
-            return cls.find(_word, language)
-        except sqlalchemy.orm.exc.NoResultFound:
-            try:
-                new = cls(_word, language)
-                session.add(new)
-                session.commit()
-                return new
-            except sqlalchemy.exc.IntegrityError:
-                for _ in range(10):
-                    try:
-                        session.rollback()
-                        w = cls.find(_word, language)
-                        print("successfully avoided race condition. nice! ")
-                        return w
-                    except sqlalchemy.orm.exc.NoResultFound:
-                        import time
-
-                        time.sleep(0.3)
-                        continue
-                    break
+    def find_or_create(cls, session, _word: str, language: Language, commit=True):
+        return find_or_create_atomically(
+            session,
+            cls,
+            [cls.word == _word, cls.language == language],
+            lambda: cls(_word, language),
+            commit=commit,
+        )
+
+    @classmethod
+    def find_or_create_all(cls, session, words_and_languages, commit=True):
+        """
+        Like find_or_create for many words at once; the ones that exist
+        are looked up with IN queries and the missing ones are inserted
+        with a single statement.
+
+        :param words_and_languages: list of (word, Language) pairs
+        :return: list with the UserWord of every pair, in the same order
+        """
+        languages = {language.id: language for _, language in words_and_languages}
+
+        def new_row(key):
+            word, language_id = key
+            return dict(
+                word=word,
+                language_id=language_id,
+                rank=cls._rank(word, languages[language_id]),
+            )
+
+        found = find_or_create_all_atomically(
+            session,
+            cls,
+            [cls.word, cls.language_id],
+            [(word, language.id) for word, language in words_and_languages],
+            new_row,
+            chunk_size=FIND_ALL_CHUNK_SIZE,
+        )
+
+        if commit:
+            session.commit()
+        return [found[(word, language.id)] for word, language in words_and_languages]
 
     @classmethod
     def find_all(cls):
@@ -94,6 +94,10 @@ class Video(db.Model):
         upload_index=True,
     ):
         from zeeguu.core.elastic.indexing import index_video
+        from zeeguu.core.semantic_vector_api import DocumentEmbedding
+        from zeeguu.core.content_recommender.recommendation_cache import (
+            new_content_for_language,
+        )
 
         # Import here to avoid circular dependency:
         # video -> youtube_api -> util -> compute_fk -> model -> video
@@ -165,37 +169,23 @@ class Video(db.Model):
         if video_info["broken"] != 0:
             return new_video
 
-        # Add captions
+        # Add captions and tags, in bulk since a video has hundreds of captions
         try:
-            for caption in video_info["captions"]:
-                new_caption = Caption.create(
-                    session=session,
-                    video=new_video,
-                    time_start=caption["time_start"],
-                    time_end=caption["time_end"],
-                    text=caption["text"],
-                )
-                session.add(new_caption)
+            Caption.create_all(session, new_video, video_info["captions"])
+            tags = VideoTag.find_or_create_all(session, video_info["tags"])
+            VideoTagMap.create_all(session, new_video, tags)
             session.commit()
         except Exception as e:
             session.rollback()
             raise e
 
-        try:
-            for tag_text in video_info["tags"]:
-                new_tag = VideoTag.find_or_create(session, tag_text)
-                video_tag_map = VideoTagMap.find_or_create(
-                    session, video=new_video, tag=new_tag
-                )
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
+        # shared by the topic inference and the indexing
+        embedding = DocumentEmbedding()
 
         # add topic
         print("Adding topic")
         try:
-            new_video.assign_inferred_topics(session)
+            new_video.assign_inferred_topics(session, embedding=embedding)
         except Exception as e:
             print(
                 f"Error adding topic to video ({video_unique_key}) with elastic search: {e}"
@@ -205,18 +195,23 @@ class Video(db.Model):
 
         # Index video if it is not broken
         if new_video.broken == 0:
-            index_video(new_video, session)
+            index_video(new_video, session, embedding)
+            # the cached recommendations don't have the new video
+            new_content_for_language(session, new_video.language_id)
+            session.commit()
 
         return new_video
 
-    def assign_inferred_topics(self, session, commit=True):
+    def assign_inferred_topics(self, session, commit=True, embedding=None):
         from zeeguu.core.model.article_topic_map import TopicOriginType
         from zeeguu.core.semantic_search import (
             get_topic_classification_based_on_similar_content,
         )
 
         topic = get_topic_classification_based_on_similar_content(
-            self.get_content(), verbose=True
+            self.get_content(),
+            verbose=True,
+            sem_vec=embedding.of_video(self) if embedding else None,
         )
         if topic:
             video_topic_map = VideoTopicMap(
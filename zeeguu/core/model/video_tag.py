@@ -39,4 +39,25 @@ class VideoTag(db.Model):
             session.rollback()
             raise e
         
-        return new_tag
\ No newline at end of file
+        return new_tag
+
+    @classmethod
+    def find_or_create_all(cls, session, tag_texts):
+        """
+        Bulk version of find_or_create: finds the existing tags with one
+        IN query and flushes the missing ones together. Does not commit.
+
+        :return: list with the VideoTag of every distinct tag text
+        """
+        tag_texts = list(dict.fromkeys(tag_texts))
+        if not tag_texts:
+            return []
+        existing = {
+            each.tag: each for each in session.query(cls).filter(cls.tag.in_(tag_texts))
+        }
+        for tag_text in tag_texts:
+            if tag_text not in existing:
+                existing[tag_text] = cls(tag_text)
+                session.add(existing[tag_text])
+        session.flush()
+        return [existing[tag_text] for tag_text in tag_texts]
@@ -1,3 +1,5 @@
+from sqlalchemy import insert
+
 from zeeguu.core.model import db
 
 
@@ -35,3 +37,17 @@ class VideoTagMap(db.Model):
             session.add(new_v_t_map)
             session.commit()
             return new_v_t_map
+
+    @classmethod
+    def create_all(cls, session, video, tags):
+        """
+        Maps the video to all the tags with one multi-row INSERT; for a new
+        video, which has no tags yet. Does not commit.
+
+        :param video: Video, already flushed
+        :param tags: list of distinct VideoTag, already flushed
+        """
+        if tags:
+            session.execute(
+                insert(cls), [dict(video_id=video.id, tag_id=tag.id) for tag in tags]
+            )
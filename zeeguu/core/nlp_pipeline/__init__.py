@@ -1,23 +1,71 @@
-from .spacy_wrapper import SpacyWrapper
-from .confusion_generator import NoiseGenerator
-from .automatic_gec_tagging import AutoGECTagging
-from .reduce_context import ContextReducer
-import confusionwords
-from confusionwords import ConfusionSets
-
-# Initialize the models, use the WV.
-SPACY_EN_MODEL = SpacyWrapper("english", False, True)
-SPACY_DK_MODEL = SpacyWrapper("danish", False, True)
-SPACY_DE_MODEL = SpacyWrapper("german", False, True)
-
-SpacyWrappers = {"en": SPACY_EN_MODEL, "da": SPACY_DK_MODEL, "de": SPACY_DE_MODEL}
-
-NoiseWordsGenerator = {
-    "da": NoiseGenerator(SPACY_DK_MODEL, "danish",
-                         confusionwords.ConfusionSets["da"].get_lemma_set(),
-                         confusionwords.ConfusionSets["da"].get_filter_dictionary(),
-                         confusionwords.ConfusionSets["da"].word_list)
-}
-AutoGECTagger = {
-    "da": AutoGECTagging(SPACY_DK_MODEL, "danish")
+import importlib
+
+from .model_registry import LazyModelRegistry
+
+# The spaCy models take a few seconds and a few hundred MB each to load,
+# and only a handful of endpoints need them. They are loaded the first time
+# a language is used; PRELOAD_NLP_MODELS in the config lists the languages
+# to load at startup instead. The classes below are imported on first use too,
+# since importing them pulls in spaCy.
+_LAZY_CLASSES = {
+    "SpacyWrapper": ".spacy_wrapper",
+    "NoiseGenerator": ".confusion_generator",
+    "AutoGECTagging": ".automatic_gec_tagging",
+    "ContextReducer": ".reduce_context",
 }
+
+
+def __getattr__(name):
+    if name in _LAZY_CLASSES:
+        module = importlib.import_module(_LAZY_CLASSES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+
+def _spacy_model(language):
+    # Initialize the models, use the WV.
+    return lambda: __getattr__("SpacyWrapper")(language, False, True)
+
+
+SpacyWrappers = LazyModelRegistry(
+    "spaCy model",
+    {
+        "en": _spacy_model("english"),
+        "da": _spacy_model("danish"),
+        "de": _spacy_model("german"),
+    },
+)
+
+
+def _danish_noise_generator():
+    import confusionwords
+
+    return __getattr__("NoiseGenerator")(
+        SpacyWrappers["da"],
+        "danish",
+        confusionwords.ConfusionSets["da"].get_lemma_set(),
+        confusionwords.ConfusionSets["da"].get_filter_dictionary(),
+        confusionwords.ConfusionSets["da"].word_list,
+    )
+
+
+NoiseWordsGenerator = LazyModelRegistry(
+    "noise generator", {"da": _danish_noise_generator}
+)
+
+AutoGECTagger = LazyModelRegistry(
+    "GEC tagger",
+    {"da": lambda: __getattr__("AutoGECTagging")(SpacyWrappers["da"], "danish")},
+)
+
+
+def preload(language_codes):
+    SpacyWrappers.preload(language_codes)
+    NoiseWordsGenerator.preload(language_codes)
+
+
+def memory_usage():
+    return {
+        registry.name: registry.memory_usage()
+        for registry in [SpacyWrappers, NoiseWordsGenerator, AutoGECTagger]
+    }
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+from zeeguu.logging import log
+
+
+def current_rss():
+    """
+    :return: the resident memory of this process in bytes, or None
+    where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class LazyModelRegistry(Mapping):
+    """
+    A read-only mapping from language code to a model that is only
+    loaded the first time it is accessed and then kept for the lifetime
+    of the process.
+
+    The keys are known upfront, so checking whether a language is
+    supported never loads anything. For every loaded model we keep the
+    load time and the growth of the resident memory during the load,
+    which is a good enough approximation of the memory taken by it.
+    """
+
+    def __init__(self, name, factories):
+        """
+        :param factories: language code -> function that builds the model
+        """
+        self.name = name
+        self._factories = dict(factories)
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, language_code):
+        if language_code not in self._factories:
+            raise KeyError(language_code)
+
+        if language_code not in self._models:
+            with self._lock:
+                if language_code not in self._models:
+                    self._load(language_code)
+        return self._models[language_code]
+
+    def __contains__(self, language_code):
+        # Mapping implements this with __getitem__, which would load the model
+        return language_code in self._factories
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def _load(self, language_code):
+        rss_before = current_rss()
+        start = time.time()
+
+        model = self._factories[language_code]()
+
+        rss_after = current_rss()
+        self._stats[language_code] = {
+            "load_seconds": round(time.time() - start, 2),
+            "rss_bytes": (
+                rss_after - rss_before
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+        }
+        log(f"Loaded {self.name} for {language_code}: {self._stats[language_code]}")
+        self._models[language_code] = model
+
+    def is_loaded(self, language_code):
+        return language_code in self._models
+
+    def loaded(self):
+        return list(self._models.keys())
+
+    def preload(self, language_codes=None):
+        """
+        :param language_codes: if None, all the supported languages are loaded;
+        the languages that are not supported are ignored
+        """
+        if language_codes is None:
+            language_codes = self.keys()
+        for each in language_codes:
+            if each in self._factories:
+                self[each]
+
+    def memory_usage(self):
+        """
+        :return: language code -> load time and memory of the loaded models
+        """
+        return dict(self._stats)
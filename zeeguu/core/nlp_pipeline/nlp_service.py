@@ -0,0 +1,182 @@
+"""
+The operations of the NLP endpoints, on top of the lazily loaded models.
+
+By default they run in the API process. When NLP_WORKER_ADDRESS is set in
+the config (e.g. "localhost:9005") they are forwarded to a separate worker
+process started with tools/nlp_worker.py, so that all the API workers
+share a single copy of the models instead of loading one each.
+
+The worker exchanges pickled data, so NLP_WORKER_AUTHKEY must be set to
+a secret shared by the worker and the API; there is no default.
+"""
+
+import threading
+from multiprocessing.managers import BaseManager
+
+import zeeguu.core
+from zeeguu.logging import log, warning
+
+
+class NLPService:
+    def supports(self, language):
+        from zeeguu.core.nlp_pipeline import SpacyWrappers
+
+        return language in SpacyWrappers
+
+    def supports_confusion_words(self, language):
+        from zeeguu.core.nlp_pipeline import NoiseWordsGenerator
+
+        return language in NoiseWordsGenerator
+
+    def tokenize_sentence(self, language, phrase):
+        from zeeguu.core.nlp_pipeline import SpacyWrappers
+
+        return SpacyWrappers[language].tokenize_sentence(phrase)
+
+    def confusion_words(self, language, sentence):
+        from zeeguu.core.nlp_pipeline import NoiseWordsGenerator
+
+        return NoiseWordsGenerator[language].generate_confusion_words(sentence)
+
+    def annotate_clues(self, language, word_with_props, original_sentence):
+        from zeeguu.core.nlp_pipeline import SpacyWrappers, AutoGECTagging
+
+        return AutoGECTagging(SpacyWrappers[language], language).anottate_clues(
+            word_with_props, original_sentence
+        )
+
+    def similar_sentences(self, language, article_text, sentence):
+        from zeeguu.core.nlp_pipeline import SpacyWrappers, ContextReducer
+
+        return ContextReducer.get_similar_sentences(
+            SpacyWrappers[language], article_text, sentence
+        )
+
+    def smaller_context(self, language, context, word, max_length):
+        from zeeguu.core.nlp_pipeline import SpacyWrappers, ContextReducer
+
+        return ContextReducer.reduce_context_for_bookmark(
+            SpacyWrappers[language], context, word, max_length
+        )
+
+    def preload(self, language_codes):
+        from zeeguu.core.nlp_pipeline import preload
+
+        preload(language_codes)
+
+    def memory_usage(self):
+        from zeeguu.core.nlp_pipeline import memory_usage
+
+        return memory_usage()
+
+
+class NLPWorkerManager(BaseManager):
+    pass
+
+
+_local_service = NLPService()
+NLPWorkerManager.register("nlp_service", callable=lambda: _local_service)
+
+
+def _worker_address(address):
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def _authkey(config=None):
+    """
+    :return: the secret of the worker; raises ValueError when it is not
+    configured, since a known key lets anyone who reaches the port run
+    code in the worker
+    """
+    config = config if config is not None else zeeguu.core.app.config
+    authkey = config.get("NLP_WORKER_AUTHKEY")
+    if not authkey:
+        raise ValueError(
+            "NLP_WORKER_AUTHKEY must be set in the config when NLP_WORKER_ADDRESS is"
+        )
+    return authkey.encode()
+
+
+def check_nlp_worker_config(config):
+    """
+    To be called at startup; fails early when the worker is configured
+    without a secret.
+    """
+    if config.get("NLP_WORKER_ADDRESS"):
+        _authkey(config)
+
+
+# the exceptions of a call on a proxy whose worker is gone
+_CONNECTION_ERRORS = (ConnectionError, EOFError)
+
+
+class RemoteNLPService:
+    """
+    Forwards the calls to the worker. The proxy is dropped when the
+    connection fails, e.g. because the worker was restarted, and the call
+    is retried once on a new connection.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self._proxy = None
+        self._lock = threading.Lock()
+
+    def _service(self):
+        with self._lock:
+            if self._proxy is None:
+                manager = NLPWorkerManager(
+                    _worker_address(self.address), authkey=_authkey()
+                )
+                manager.connect()
+                self._proxy = manager.nlp_service()
+                log(f"Using the NLP worker at {self.address}")
+            return self._proxy
+
+    def _disconnect(self, proxy):
+        with self._lock:
+            if self._proxy is proxy:
+                self._proxy = None
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            proxy = self._service()
+            try:
+                return getattr(proxy, name)(*args, **kwargs)
+            except _CONNECTION_ERRORS as e:
+                warning(f"Lost the connection to the NLP worker ({e}); reconnecting")
+                self._disconnect(proxy)
+                return getattr(self._service(), name)(*args, **kwargs)
+
+        return call
+
+
+_remote_service = None
+
+
+def nlp_service():
+    """
+    :return: the service of the shared worker if one is configured,
+    otherwise the one of this process
+    """
+    global _remote_service
+
+    address = zeeguu.core.app.config.get("NLP_WORKER_ADDRESS")
+    if not address:
+        return _local_service
+
+    if _remote_service is None or _remote_service.address != address:
+        _remote_service = RemoteNLPService(address)
+    return _remote_service
+
+
+def serve_nlp_worker(address, preload_languages=()):
+    """
+    Blocks, serving the NLP operations to the API processes.
+    """
+    _local_service.preload(preload_languages)
+    manager = NLPWorkerManager(_worker_address(address), authkey=_authkey())
+    server = manager.get_server()
+    log(f"NLP worker listening on {address}")
+    server.serve_forever()
@@ -1,5 +1,3 @@
-import spacy
-
 # For details on the models look: https://spacy.io/models/
 # spaCy recommends using the models with embs, which are then used across the pipeline
 # for better results ~1-2% in POS and MORPH
@@ -56,6 +54,9 @@ class SpacyWrapper:
             or ((not use_tranf) == use_tranf)
             or (not use_tranf and not use_wv)
         ), f"use_transf and use_wv cannot be used together. Set one of them to false."
+        # spacy itself takes a while to import; only pay for it when a model is loaded
+        import spacy
+
         if use_tranf:
             self.spacy_pipe = spacy.load(
                 SPACY_LANGUAGE_DICTIONARY_TRANSF[language_to_use]
@@ -20,6 +20,15 @@ from zeeguu.core.semantic_vector_api import (
     get_embedding_from_article,
     get_embedding_from_text,
 )
+from zeeguu.core.semantic_search.topic_classifier import (
+    majority_topic,
+    topic_classifier,
+)
+from zeeguu.core.semantic_search.vector_index import (
+    as_es_hits,
+    local_vector_search_enabled,
+    vector_index,
+)
 
 
 @time_this
@@ -43,10 +52,43 @@ def articles_like_this_tfidf(article: Article):
     return [a for a in final_article_mix if a is not None and not a.broken], hit_list
 
 
+def _local_vector_search(sem_vec, k, **filters):
+    """
+    :return: (articles, hits) as found in the vector index of the process,
+    or None if the lookups should go to ES
+    """
+    if not local_vector_search_enabled():
+        return None
+    index = vector_index()
+    if index is None:
+        return None
+
+    hit_list = as_es_hits(index.search(sem_vec, k, **filters))
+    found_articles = _to_articles_from_ES_hits(hit_list)
+    return [a for a in found_articles if a is not None and not a.broken], hit_list
+
+
 @time_this
 def articles_like_this_semantic(article: Article):
+    index = vector_index() if local_vector_search_enabled() else None
+    # the embedding API is not needed for an article that is in the index
+    sem_vec = index.vector(article.id) if index is not None else None
+    if sem_vec is None:
+        sem_vec = get_embedding_from_article(article)
+
+    # like the ES query, only the articles with topics
+    found = _local_vector_search(
+        sem_vec,
+        10,
+        language=article.language.name,
+        labelled_only=True,
+        exclude_ids=[article.id],
+    )
+    if found is not None:
+        return found
+
     query_body = build_elastic_semantic_sim_query(
-        10, article.language, get_embedding_from_article(article), article
+        10, article.language, sem_vec, article
     )
     final_article_mix = []
 
@@ -67,13 +109,21 @@ def articles_like_this_semantic(article: Article):
     return [], []
 
 
-def get_article_w_topics_based_on_text_similarity(text, k: int = 9, filter_ids=None):
+def get_article_w_topics_based_on_text_similarity(
+    text, k: int = 9, filter_ids=None, sem_vec=None
+):
 
     if filter_ids is None:
         filter_ids = []
+    if sem_vec is None:
+        sem_vec = get_embedding_from_text(text)
+
+    found = _local_vector_search(sem_vec, k, labelled_only=True, exclude_ids=filter_ids)
+    if found is not None:
+        return found
 
     query_body = build_elastic_semantic_sim_query_for_topic_cls(
-        k, get_embedding_from_text(text), filter_ids=filter_ids
+        k, sem_vec, filter_ids=filter_ids
     )
     final_article_mix = []
 
@@ -99,41 +149,37 @@ def get_topic_classification_based_on_similar_content(
     k: int = 9,
     filter_ids: list[int] = None,
     verbose=False,
+    sem_vec=None,
 ):
-    from collections import Counter
-
+    """
+    :param sem_vec: the embedding of the text, if it is already computed
+    (see DocumentEmbedding)
+    """
     if filter_ids is None:
         filter_ids = []
+    if sem_vec is None:
+        sem_vec = get_embedding_from_text(text)
+
+    classifier = topic_classifier()
+    if classifier is not None:
+        return classifier.classify(sem_vec, k, filter_ids=filter_ids, verbose=verbose)
 
     found_articles, _ = get_article_w_topics_based_on_text_similarity(
-        text, k, filter_ids=filter_ids
+        text, k, filter_ids=filter_ids, sem_vec=sem_vec
     )
     neighbouring_topics = [t.topic for a in found_articles for t in a.topics]
-    if len(neighbouring_topics) > 0:
-        topics_counter = Counter(neighbouring_topics)
-
-        if verbose:
-            from pprint import pprint
-
-            pprint(topics_counter)
-
-        top_topic, count = topics_counter.most_common(1)[0]
-        threshold = (
-            sum(topics_counter.values()) // 2
-        )  # The threshold is being at least half or above rounded down
-
-        if count >= threshold:
-            if verbose:
-                print(f"Used INFERRED: {top_topic}, {count}, with t={threshold}")
-            return top_topic
-    return None
+    return majority_topic(neighbouring_topics, verbose)
 
 
 @time_this
 def find_articles_based_on_text(text, k: int = 9):  # hood = (slang) neighborhood
-    query_body = build_elastic_semantic_sim_query_for_text(
-        k, get_embedding_from_text(text)
-    )
+    sem_vec = get_embedding_from_text(text)
+
+    found = _local_vector_search(sem_vec, k)
+    if found is not None:
+        return found
+
+    query_body = build_elastic_semantic_sim_query_for_text(k, sem_vec)
     final_article_mix = []
 
     try:
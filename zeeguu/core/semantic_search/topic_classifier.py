@@ -0,0 +1,87 @@
+"""
+Topic inference with a kNN over the embeddings of the indexed articles
+whose topics were not inferred, kept in memory.
+
+Inferring the topic of a crawled article or video with a kNN query to ES
+costs a round trip per document; here the neighbours are looked up in
+the vector index of the process (see vector_index.py), among the
+articles that have topics that were not inferred, as in ES. The topics
+of a neighbour are the ones in its ES document (see
+document_from_article).
+
+LOCAL_TOPIC_CLASSIFIER=False in the config (the default for the tests)
+infers the topics with the kNN query to ES, as does a classifier that
+could not be loaded.
+"""
+
+from collections import Counter
+
+import zeeguu.core
+from zeeguu.core.semantic_search.vector_index import vector_index
+
+
+def majority_topic(neighbouring_topics, verbose=False):
+    """
+    :return: the most common of the topics of the neighbours, if it is at
+    least half of them (rounded down), or None
+    """
+    if len(neighbouring_topics) > 0:
+        topics_counter = Counter(neighbouring_topics)
+
+        if verbose:
+            from pprint import pprint
+
+            pprint(topics_counter)
+
+        top_topic, count = topics_counter.most_common(1)[0]
+        threshold = (
+            sum(topics_counter.values()) // 2
+        )  # The threshold is being at least half or above rounded down
+
+        if count >= threshold:
+            if verbose:
+                print(f"Used INFERRED: {top_topic}, {count}, with t={threshold}")
+            return top_topic
+    return None
+
+
+class LocalTopicClassifier:
+    def __init__(self, index):
+        """
+        :param index: an ArticleVectorIndex
+        """
+        self.index = index
+
+    def neighbours(self, sem_vec, k=9, filter_ids=None):
+        """
+        :return: the VectorHits of the k most similar articles that have
+        topics that were not inferred, in any language
+        """
+        return self.index.search(sem_vec, k, labelled_only=True, exclude_ids=filter_ids)
+
+    def classify(self, sem_vec, k=9, filter_ids=None, verbose=False):
+        """
+        :return: the Topic of the majority of the k nearest neighbours,
+        as get_topic_classification_based_on_similar_content, or None
+        """
+        from zeeguu.core.model import Topic
+
+        topics = [
+            Topic.find(title)
+            for each in self.neighbours(sem_vec, k, filter_ids)
+            for title in each.topics
+        ]
+        return majority_topic([each for each in topics if each], verbose)
+
+
+def topic_classifier():
+    """
+    :return: a LocalTopicClassifier over the vector index of this process;
+    None when it is disabled or the index could not be loaded
+    """
+    app = getattr(zeeguu.core, "app", None)
+    if app is None or not app.config.get("LOCAL_TOPIC_CLASSIFIER", not app.testing):
+        return None
+
+    index = vector_index()
+    return LocalTopicClassifier(index) if index is not None else None
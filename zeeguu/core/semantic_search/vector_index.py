@@ -0,0 +1,420 @@
+"""
+An in-process index of the embeddings (sem_vec) of the articles in ES,
+for the similarity lookups that would otherwise be kNN queries to ES:
+the articles like this one, the articles like a text, and the neighbours
+for the topic inference (see topic_classifier.py).
+
+The vectors are kept per language, normalized, so that the cosine
+similarity is a dot product. A language with at least IVF_MIN_VECTORS
+vectors also gets an inverted file: the vectors are clustered around
+about sqrt(n) centroids, and a lookup only scores the vectors of the
+clusters whose centroids are closest to the query, a fraction of the
+whole. Smaller languages are searched exhaustively.
+
+The index is loaded from ES, in a background thread, on first use (the
+most recent MAX_VECTORS articles of every language) and reloaded every
+REFRESH_SECONDS; in between, the indexing hooks in elastic/indexing.py
+add and remove the articles that this process indexes.
+
+The lookups fall back to ES when the index is disabled, not loaded yet,
+or could not be loaded: LOCAL_VECTOR_INDEX=True in the config enables it for the
+similar-article lookups, LOCAL_TOPIC_CLASSIFIER for the topic inference.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+import zeeguu.core
+from zeeguu.logging import log, warning
+
+REFRESH_SECONDS = 6 * 60 * 60
+# per language, the most recently published ones
+MAX_VECTORS = 50000
+IVF_MIN_VECTORS = 20000
+KMEANS_ITERATIONS = 8
+# the share of the clusters that are scored in a lookup
+PROBED_CLUSTERS = 1 / 8
+
+VectorHit = namedtuple("VectorHit", "article_id language topics similarity")
+
+
+def _normalized(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _timestamp(published_time):
+    if published_time is None:
+        return 0
+    if isinstance(published_time, str):
+        # as serialized in the ES documents
+        published_time = datetime.fromisoformat(published_time.replace("Z", ""))
+    return published_time.timestamp()
+
+
+class _LanguageVectors:
+    """
+    The vectors of one language, in arrays that grow by doubling; a
+    removed article keeps its row, but is not live anymore.
+    """
+
+    def __init__(self, dimensions, capacity=1024):
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.article_ids = np.zeros(capacity, dtype=np.int64)
+        self.published = np.zeros(capacity, dtype=np.float64)
+        self.labelled = np.zeros(capacity, dtype=bool)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.clusters = np.zeros(capacity, dtype=np.int32)
+        self.topics = []
+        # article id -> row
+        self.rows = {}
+        self.centroids = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, article_id, vector, published, topics):
+        row = self.rows.get(article_id)
+        if row is None:
+            row = len(self.topics)
+            if row == len(self.vectors):
+                self._grow()
+            self.topics.append(None)
+            self.rows[article_id] = row
+        self.vectors[row] = vector
+        self.article_ids[row] = article_id
+        self.published[row] = published
+        self.labelled[row] = bool(topics)
+        self.live[row] = True
+        self.topics[row] = topics
+        if self.centroids is not None:
+            self.clusters[row] = np.argmax(self.centroids @ vector)
+
+    def remove(self, article_id):
+        row = self.rows.pop(article_id, None)
+        if row is not None:
+            self.live[row] = False
+
+    def _grow(self):
+        for name in ["vectors", "article_ids", "published", "labelled", "live"]:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.clusters = np.concatenate([self.clusters, np.zeros_like(self.clusters)])
+
+    def build_inverted_file(self, seed=0):
+        """
+        Spherical k-means over the vectors; below IVF_MIN_VECTORS the
+        lookups are exhaustive.
+        """
+        size = len(self.topics)
+        if len(self) < IVF_MIN_VECTORS:
+            self.centroids = None
+            return
+
+        vectors = self.vectors[:size][self.live[:size]]
+        random = np.random.RandomState(seed)
+        cluster_count = int(np.sqrt(len(vectors)))
+        centroids = vectors[random.choice(len(vectors), cluster_count, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assigned = np.argmax(vectors @ centroids.T, axis=1)
+            counts = np.bincount(assigned, minlength=cluster_count)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            filled = counts > 0
+            # an empty cluster keeps its centroid
+            sums = centroids.copy()
+            sums[filled] = np.add.reduceat(
+                vectors[np.argsort(assigned, kind="stable")], starts[filled]
+            )
+            centroids = _normalized(sums)
+
+        self.centroids = centroids
+        self.clusters[:size] = np.argmax(self.vectors[:size] @ centroids.T, axis=1)
+
+    def search(
+        self, query, k, published_after=None, labelled_only=False, exclude_ids=None
+    ):
+        """
+        :return: (rows, similarities) of the k live vectors that are most
+        similar to the query and pass the filters, the most similar first
+        """
+        size = len(self.topics)
+        candidates = self.live[:size].copy()
+        if published_after is not None:
+            candidates &= self.published[:size] >= _timestamp(published_after)
+        if labelled_only:
+            candidates &= self.labelled[:size]
+        if exclude_ids:
+            candidates &= ~np.isin(self.article_ids[:size], exclude_ids)
+
+        if self.centroids is not None:
+            probed_count = max(1, int(len(self.centroids) * PROBED_CLUSTERS))
+            probed = np.argsort(-(self.centroids @ query))[:probed_count]
+            in_probed = candidates & np.isin(self.clusters[:size], probed)
+            # with strict filters, the probed clusters might not be enough
+            if np.count_nonzero(in_probed) >= k:
+                candidates = in_probed
+
+        rows = np.flatnonzero(candidates)
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        similarities = self.vectors[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return rows[top], similarities[top]
+
+
+class ArticleVectorIndex:
+    def __init__(self):
+        self._languages = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(each) for each in self._languages.values())
+
+    def languages(self):
+        return list(self._languages)
+
+    def add(self, article_id, sem_vec, language, published_time=None, topics=None):
+        """
+        :param language: the name of the language, as in the ES documents
+        :param topics: the titles of the topics that were not inferred
+        """
+        vector = _normalized(np.asarray(sem_vec, dtype=np.float32))
+        with self._lock:
+            for name, vectors in self._languages.items():
+                # in case the language of the article was corrected
+                if name != language:
+                    vectors.remove(article_id)
+            if language not in self._languages:
+                self._languages[language] = _LanguageVectors(len(vector))
+            self._languages[language].add(
+                article_id, vector, _timestamp(published_time), list(topics or [])
+            )
+
+    def add_document(self, doc):
+        """
+        :param doc: an ES document, as built by document_from_article
+        """
+        self.add(
+            doc["article_id"],
+            doc["sem_vec"],
+            doc["language"],
+            doc.get("published_time"),
+            doc.get("topics"),
+        )
+
+    def vector(self, article_id):
+        """
+        :return: the normalized vector of the article, or None if it is
+        not in the index
+        """
+        with self._lock:
+            for vectors in self._languages.values():
+                row = vectors.rows.get(article_id)
+                if row is not None:
+                    return vectors.vectors[row].copy()
+        return None
+
+    def remove(self, article_id):
+        with self._lock:
+            for vectors in self._languages.values():
+                vectors.remove(article_id)
+
+    def build_inverted_files(self):
+        with self._lock:
+            for vectors in self._languages.values():
+                vectors.build_inverted_file()
+
+    def search(
+        self,
+        sem_vec,
+        k=10,
+        language=None,
+        published_after=None,
+        labelled_only=False,
+        exclude_ids=None,
+    ):
+        """
+        :param language: the name of the language; all of them if None
+        :param published_after: a datetime
+        :param labelled_only: only the articles with topics that were
+        not inferred
+        :return: list of the VectorHits of the k articles that are most
+        similar, the most similar first
+        """
+        query = _normalized(np.asarray(sem_vec, dtype=np.float32))
+        names = [language] if language is not None else list(self._languages)
+
+        hits = []
+        with self._lock:
+            for name in names:
+                vectors = self._languages.get(name)
+                if vectors is None:
+                    continue
+                rows, similarities = vectors.search(
+                    query, k, published_after, labelled_only, exclude_ids
+                )
+                hits.extend(
+                    VectorHit(
+                        int(vectors.article_ids[row]),
+                        name,
+                        vectors.topics[row],
+                        float(similarity),
+                    )
+                    for row, similarity in zip(rows, similarities)
+                )
+
+        return sorted(hits, key=lambda each: -each.similarity)[:k]
+
+    @classmethod
+    def from_elasticsearch(cls, max_vectors=MAX_VECTORS):
+        from elasticsearch import Elasticsearch
+        from elasticsearch.helpers import scan
+        from zeeguu.core.elastic.settings import ES_CONN_STRING, ES_ZINDEX
+
+        es = Elasticsearch(ES_CONN_STRING)
+        languages = es.search(
+            index=ES_ZINDEX,
+            size=0,
+            aggs={"languages": {"terms": {"field": "language.keyword", "size": 100}}},
+        )["aggregations"]["languages"]["buckets"]
+
+        index = cls()
+        for language in [each["key"] for each in languages]:
+            query = {
+                "_source": [
+                    "article_id",
+                    "sem_vec",
+                    "language",
+                    "published_time",
+                    "topics",
+                ],
+                "query": {
+                    "bool": {
+                        "filter": [
+                            {"exists": {"field": "article_id"}},
+                            {"exists": {"field": "sem_vec"}},
+                            {"term": {"language.keyword": language}},
+                        ]
+                    }
+                },
+                "sort": [{"published_time": "desc"}],
+            }
+            hits = scan(
+                es, index=ES_ZINDEX, query=query, preserve_order=True, size=1000
+            )
+            count = 0
+            for hit in hits:
+                index.add_document(hit["_source"])
+                count += 1
+                if count >= max_vectors:
+                    break
+
+        index.build_inverted_files()
+        return index
+
+
+_index = None
+_index_app = None
+_loaded_at = 0
+_loading_lock = threading.Lock()
+# the thread that is loading the index, and the process that started it
+_loader = None
+_loader_pid = None
+
+
+def vector_index():
+    """
+    :return: the ArticleVectorIndex of this process; None until it is
+    loaded, or if it could not be loaded, so that the lookups go to ES.
+    It is loaded in the background on first use and reloaded periodically,
+    so the lookups never wait for a load.
+    """
+    global _index, _index_app, _loaded_at, _loader, _loader_pid
+
+    app = getattr(zeeguu.core, "app", None)
+    if app is None:
+        return None
+
+    refresh = app.config.get("LOCAL_VECTOR_INDEX_REFRESH_SECONDS", REFRESH_SECONDS)
+    with _loading_lock:
+        if _index_app is not app:
+            _index, _index_app, _loaded_at = None, app, 0
+
+        # a worker forked during a load does not inherit the loading thread
+        loading = _loader is not None and _loader_pid == os.getpid()
+        if not loading and time.time() - _loaded_at > refresh:
+            # also when the loading fails, so that it is not retried for
+            # every lookup
+            _loaded_at = time.time()
+            _loader = threading.Thread(
+                target=_load,
+                args=(
+                    app,
+                    app.config.get("LOCAL_VECTOR_INDEX_MAX_VECTORS", MAX_VECTORS),
+                ),
+                name="vector-index-loader",
+                daemon=True,
+            )
+            _loader_pid = os.getpid()
+            _loader.start()
+
+    return _index
+
+
+def _load(app, max_vectors):
+    global _index, _loader
+
+    try:
+        index = ArticleVectorIndex.from_elasticsearch(max_vectors)
+        log(f"loaded {len(index)} vectors in the vector index")
+    except Exception as e:
+        # the previous vectors, if any, are still good
+        warning(f"could not load the vector index: {e}")
+        index = None
+
+    with _loading_lock:
+        _loader = None
+        if index is not None and _index_app is app:
+            _index = index
+
+
+def loaded_vector_index():
+    """
+    :return: the ArticleVectorIndex of this process if it is loaded, for
+    the indexing hooks, which should not cause a load
+    """
+    if _index_app is not getattr(zeeguu.core, "app", None):
+        return None
+    return _index
+
+
+def local_vector_search_enabled():
+    app = getattr(zeeguu.core, "app", None)
+    return app is not None and app.config.get("LOCAL_VECTOR_INDEX", False)
+
+
+def as_es_hits(vector_hits):
+    """
+    :return: the hits in the shape of the ES kNN hits, for the callers
+    that look at the hits; like in ES, the score of the cosine similarity
+    is (1 + similarity) / 2
+    """
+    return [
+        {
+            "_id": None,
+            "_score": (1 + each.similarity) / 2,
+            "_source": {
+                "article_id": each.article_id,
+                "language": each.language,
+                "topics": each.topics,
+            },
+        }
+        for each in vector_hits
+    ]
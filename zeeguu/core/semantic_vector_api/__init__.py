@@ -4,3 +4,4 @@ from .retrieve_embeddings import (
     get_embedding_from_video,
     EMB_API_CONN_STRING,
 )
+from .document_embedding import DocumentEmbedding
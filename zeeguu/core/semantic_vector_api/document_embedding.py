@@ -0,0 +1,33 @@
+from zeeguu.core.semantic_vector_api.retrieve_embeddings import get_embedding_from_text
+
+
+class DocumentEmbedding:
+    """
+    The embedding of a document that is being ingested. Both the topic
+    inference and the indexing in ES need it, and a call to the embedding
+    API is the most expensive step of the ingestion, so it is computed at
+    most once, on first use, and shared by the two.
+
+    If the content of the document changes in between, the embedding is
+    computed again.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._sem_vec = None
+        self.computed = 0
+
+    def of_text(self, text, language_name=None):
+        key = (text, language_name)
+        if self._key != key:
+            self._sem_vec = get_embedding_from_text(text, language_name)
+            self._key = key
+            self.computed += 1
+        return self._sem_vec
+
+    def of_article(self, article):
+        # the same request as get_embedding_from_article
+        return self.of_text(article.get_content(), article.language.name.lower())
+
+    def of_video(self, video):
+        return self.of_text(video.get_content(), video.language.name.lower())
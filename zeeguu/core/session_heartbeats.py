@@ -0,0 +1,206 @@
+"""
+Coalescing of the heartbeats of the reading and watching sessions.
+
+While an article is open or a video plays, the client reports every few
+seconds the total duration of the session so far. Instead of an UPDATE
+and a commit for every heartbeat, the latest heartbeat of every session
+is kept in memory and a background thread writes them all periodically,
+with one query per session class and one commit.
+
+Only the last heartbeat of a session matters, since it carries the total
+duration; the increment of the DailyActivity is computed against the
+duration in the DB when the heartbeat is written, so the totals stay the
+same as with one write per heartbeat. Every worker process has its own
+heartbeats; when the heartbeats of a session reach several workers, the
+one with the latest time wins: an older heartbeat never overwrites a
+session whose last_action_time is newer.
+
+The end of a session and the reading of its duration flush its heartbeat
+first (see flush_session).
+
+COALESCED_SESSION_HEARTBEATS=False in the config (the default for the
+tests) writes every heartbeat before returning.
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime
+
+import zeeguu.core
+from zeeguu.logging import log, warning
+
+FLUSH_INTERVAL_SECONDS = 15
+
+
+class SessionHeartbeats:
+    def __init__(self, app, coalesced=True, flush_interval=FLUSH_INTERVAL_SECONDS):
+        self.app = app
+        self.coalesced = coalesced
+        self.flush_interval = flush_interval
+
+        # (session class, session id) -> (duration, time of the heartbeat)
+        self._pending = {}
+        self._metrics = dict(received=0, written=0, stale=0, failed=0, flushes=0)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flusher = None
+        self._flusher_pid = None
+
+    def record(self, session_class, session_id, duration, time=None):
+        """
+        :param duration: the total duration of the session so far, in ms
+        """
+        if time is None:
+            time = datetime.now()
+        heartbeat = {(session_class, session_id): (duration, time)}
+
+        self._count("received", 1)
+        if not self.coalesced:
+            self._write(heartbeat)
+            return
+
+        self._ensure_flusher()
+        with self._lock:
+            pending = self._pending.get((session_class, session_id))
+            if pending is None or pending[1] <= time:
+                self._pending.update(heartbeat)
+
+    def pending_duration(self, session_class, session_id):
+        with self._lock:
+            pending = self._pending.get((session_class, session_id))
+        return pending[0] if pending else None
+
+    def flush_session(self, session_class, session_id):
+        """
+        Writes the heartbeat of one session, if there is one; to be called
+        before the session is ended or its duration is read.
+        """
+        with self._lock:
+            pending = self._pending.pop((session_class, session_id), None)
+        if pending:
+            self._write({(session_class, session_id): pending})
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            with self.app.app_context():
+                self._write(pending)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._metrics, pending=len(self._pending))
+
+    def stop(self, timeout=10):
+        """
+        Stops the flusher and writes what is pending. Registered to run at
+        exit, so that the last heartbeats are not lost when a worker shuts down.
+        """
+        self._stopping.set()
+        if self._flusher is not None and self._flusher_pid == os.getpid():
+            self._flusher.join(timeout)
+        self.flush()
+        log(f"session heartbeats stopped: {self.metrics()}")
+
+    def _ensure_flusher(self):
+        # a worker forked from a preloaded master does not inherit its thread
+        if self._flusher is not None and self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._flusher = threading.Thread(
+                target=self._run, name="heartbeat-flusher", daemon=True
+            )
+            self._flusher_pid = os.getpid()
+            self._flusher.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def _write(self, heartbeats):
+        from zeeguu.core.model import (
+            db,
+            DailyActivity,
+            UserArticle,
+            UserReadingSession,
+        )
+
+        by_class = {}
+        for (session_class, session_id), heartbeat in heartbeats.items():
+            by_class.setdefault(session_class, {})[session_id] = heartbeat
+
+        written, stale = 0, 0
+        try:
+            for session_class, heartbeats_of_class in by_class.items():
+                # locked, so that the delta added to the daily activity is
+                # computed from the duration that is in the DB; otherwise two
+                # workers that write the same session both count the time
+                sessions = (
+                    session_class.query.filter(
+                        session_class.id.in_(heartbeats_of_class.keys())
+                    )
+                    .order_by(session_class.id)
+                    .with_for_update()
+                    .populate_existing()
+                    .all()
+                )
+                for session in sessions:
+                    duration, time = heartbeats_of_class[session.id]
+                    if session.last_action_time and session.last_action_time > time:
+                        # another worker, or the end of the session, was later
+                        stale += 1
+                        continue
+                    DailyActivity.add_session_duration(
+                        db.session, session, duration - (session.duration or 0)
+                    )
+                    session.duration = duration
+                    session.last_action_time = time
+                    if session_class is UserReadingSession:
+                        UserArticle.record_reading_time(db.session, session)
+                    written += 1
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self._count("failed", len(heartbeats))
+            warning(f"could not write {len(heartbeats)} session heartbeats: {e}")
+            return
+
+        with self._lock:
+            self._metrics["written"] += written
+            self._metrics["stale"] += stale
+            self._metrics["flushes"] += 1
+
+    def _count(self, metric, n):
+        with self._lock:
+            self._metrics[metric] += n
+
+
+_heartbeats = None
+
+
+def session_heartbeats():
+    """
+    :return: the heartbeats of this process, created on first use
+    """
+    global _heartbeats
+
+    app = zeeguu.core.app
+    if _heartbeats is None or _heartbeats.app is not app:
+        _heartbeats = SessionHeartbeats(
+            app,
+            coalesced=app.config.get("COALESCED_SESSION_HEARTBEATS", not app.testing),
+            flush_interval=app.config.get(
+                "SESSION_HEARTBEAT_FLUSH_SECONDS", FLUSH_INTERVAL_SECONDS
+            ),
+        )
+    return _heartbeats
+
+
+def flush_session_heartbeats():
+    if _heartbeats is not None:
+        _heartbeats.stop()
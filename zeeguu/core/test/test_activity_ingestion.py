@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import zeeguu.core
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.activity_ingestion import ActivityIngestion
+from zeeguu.core.model import UserActivityData, db
+from zeeguu.core.test.rules.user_rule import UserRule
+
+
+class ActivityIngestionTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserRule().user
+        self.start = datetime(2026, 10, 19, 10, 0, 0)
+
+    def _events(self, count, offset=0):
+        return [
+            dict(
+                user_id=self.user.id,
+                time=self.start + timedelta(milliseconds=offset + i),
+                event="SCROLL",
+                value="[1200, 800]",
+                extra_data="[]",
+                source_id=None,
+            )
+            for i in range(count)
+        ]
+
+    def _stored(self):
+        db.session.expire_all()
+        return UserActivityData.query.filter_by(user_id=self.user.id).count()
+
+    def test_buffered_events_are_written_in_batches_by_the_writer(self):
+        ingestion = ActivityIngestion(
+            zeeguu.core.app, batch_size=40, flush_interval=0.05
+        )
+
+        ingestion.submit(self._events(100))
+        ingestion.submit(self._events(20))  # already submitted
+        ingestion.stop()
+
+        assert self._stored() == 100
+        metrics = ingestion.metrics()
+        assert metrics["written"] == 100
+        assert metrics["duplicates"] == 20
+        assert metrics["batches"] >= 3
+        assert metrics["queue_depth"] == 0
+
+    def test_requests_write_their_events_when_the_queue_is_full(self):
+        ingestion = ActivityIngestion(zeeguu.core.app, max_buffered_events=10)
+        # a writer that does not keep up at all
+        ingestion._ensure_writer = lambda: None
+
+        ingestion.submit(self._events(25))
+
+        assert ingestion.metrics()["written_by_requests"] == 15
+        assert self._stored() == 15
+        ingestion.stop()
+        assert self._stored() == 25
+
+    def test_unbuffered_events_are_written_right_away(self):
+        ingestion = ActivityIngestion(zeeguu.core.app, buffered=False)
+
+        ingestion.submit(self._events(5) + self._events(5))
+
+        assert self._stored() == 5
+        assert ingestion.metrics()["duplicates"] == 5
+
+    def test_a_bad_event_does_not_lose_the_others(self):
+        ingestion = ActivityIngestion(zeeguu.core.app, buffered=False)
+        bad = dict(self._events(1, offset=100)[0], time="not a time")
+
+        ingestion.submit(self._events(3) + [bad] + self._events(3))
+
+        assert self._stored() == 3
+        metrics = ingestion.metrics()
+        assert metrics["failed"] == 1
+        assert metrics["duplicates"] == 3
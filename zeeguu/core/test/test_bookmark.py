@@ -1,5 +1,7 @@
 import random
 
+from sqlalchemy import event
+
 from zeeguu.core.bookmark_quality import bad_quality_bookmark
 from zeeguu.core.definition_of_learned import is_learned_based_on_exercise_outcomes
 from zeeguu.core.model.sorted_exercise_log import SortedExerciseLog
@@ -12,9 +14,15 @@ from zeeguu.core.test.rules.outcome_rule import OutcomeRule
 from zeeguu.core.test.rules.exercise_source_rule import ExerciseSourceRule
 from zeeguu.core.test.rules.text_rule import TextRule
 from zeeguu.core.test.rules.user_rule import UserRule
-from zeeguu.core.model import Bookmark
+from zeeguu.core.model import Bookmark, ExerciseOutcome
 from zeeguu.core.model import db
-from zeeguu.core.word_scheduling import TwoLearningCyclesPerWord, FourLevelsPerWord
+from zeeguu.core.word_scheduling import (
+    TwoLearningCyclesPerWord,
+    FourLevelsPerWord,
+    StudyQueueEntry,
+    StudyQueueBuilt,
+    BasicSRSchedule,
+)
 
 
 class BookmarkTest(ModelTestMixIn):
@@ -54,6 +62,62 @@ class BookmarkTest(ModelTestMixIn):
 
         assert self.user.bookmarks_to_study(scheduled_only=True) is not None
 
+    def test_bookmarks_to_study_are_prioritized_and_deduplicated(self):
+        common, rare, unranked, same_word = [
+            BookmarkRule(self.user).bookmark for _ in range(0, 4)
+        ]
+        common.origin.rank = 100
+        rare.origin.rank = 5000
+        unranked.origin.rank = None
+        same_word.origin.word = common.origin.word.upper()
+        same_word.origin.rank = 100
+        for b in [common, rare, unranked, same_word]:
+            b.fit_for_study = True
+        db.session.commit()
+
+        to_study = self.user.bookmarks_to_study(bookmark_count=None)
+
+        assert len([b for b in to_study if b in [common, same_word]]) == 1
+        positions = [to_study.index(b) for b in [rare, unranked]]
+        assert positions == sorted(positions)
+        assert to_study[0] in [common, same_word]
+
+    def test_study_queue_follows_the_schedule(self):
+        bookmark = BookmarkRule(self.user).bookmark
+        bookmark.fit_for_study = True
+        StudyQueueEntry.rebuild_for_user(db.session, self.user)
+        db.session.commit()
+
+        assert bookmark.id in StudyQueueEntry.bookmark_ids_to_study(self.user, None)
+        assert StudyQueueEntry.find(bookmark).next_practice_time is None
+
+        bookmark.get_scheduler().update(db.session, bookmark, ExerciseOutcome.CORRECT)
+
+        assert StudyQueueEntry.find(bookmark).next_practice_time is not None
+        assert bookmark.id not in StudyQueueEntry.bookmark_ids_to_study(
+            self.user, None, scheduled_only=True
+        )
+
+        bookmark.fit_for_study = False
+        BasicSRSchedule.clear_bookmark_schedule(db.session, bookmark)
+        StudyQueueEntry.refresh(db.session, bookmark)
+
+        assert StudyQueueEntry.find(bookmark) is None
+
+    def test_reading_an_unbuilt_study_queue_does_not_build_it(self):
+        user = UserRule().user
+        language_id = user.learned_language_id
+
+        assert StudyQueueEntry.bookmark_ids_to_study(user, None) == []
+        assert not StudyQueueBuilt.is_built(user.id, language_id)
+
+        StudyQueueEntry.rebuild_for_user(db.session, user)
+        db.session.commit()
+
+        # the queue is empty, but it was built
+        assert StudyQueueEntry.bookmark_ids_to_study(user, None) == []
+        assert StudyQueueBuilt.is_built(user.id, language_id)
+
     def test_translation(self):
         random_bookmark = BookmarkRule(self.user).bookmark
         assert random_bookmark.translation is not None
@@ -135,6 +199,66 @@ class BookmarkTest(ModelTestMixIn):
 
         assert exercise_count_after > exercise_count_before
 
+    def test_import_all(self):
+        language = self.user.learned_language.code
+        translation_language = self.user.native_language.code
+        bookmarks = [
+            dict(
+                origin=origin,
+                origin_lang=language,
+                translation=translation,
+                translation_lang=translation_language,
+                context=f"ein Satz mit {origin}",
+                article_id=None,
+                source_id=None,
+            )
+            for origin, translation in [("hund", "dog"), ("katze", "cat")]
+        ]
+
+        imported = Bookmark.import_all(db.session, self.user, bookmarks)
+
+        assert [each.origin.word for each in imported] == ["hund", "katze"]
+        assert all(each.id is not None for each in imported)
+
+        bookmarks[0]["translation"] = "hound"
+        [reimported] = Bookmark.import_all(db.session, self.user, bookmarks[:1])
+
+        assert reimported == imported[0]
+        assert reimported.translation.word == "hound"
+
+    def test_import_all_statements_do_not_grow_with_the_bookmarks(self):
+        def import_bookmarks(prefix, count):
+            bookmarks = [
+                dict(
+                    origin=f"{prefix}wort{i}",
+                    origin_lang=self.user.learned_language.code,
+                    translation=f"{prefix}word{i}",
+                    translation_lang=self.user.native_language.code,
+                    context=f"ein Satz mit {prefix}wort{i}",
+                )
+                for i in range(count)
+            ]
+            statements = []
+
+            def count_statement(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count_statement)
+            try:
+                imported = Bookmark.import_all(db.session, self.user, bookmarks)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count_statement)
+
+            assert [each.origin.word for each in imported] == [
+                each["origin"] for each in bookmarks
+            ]
+            return len(statements)
+
+        # builds the study queue of the user
+        import_bookmarks("a", 1)
+
+        assert import_bookmarks("b", 20) == import_bookmarks("c", 1)
+
     def test_find_by_specific_user(self):
         list_should_be = self.user.all_bookmarks()
         list_to_check = Bookmark.find_by_specific_user(self.user)
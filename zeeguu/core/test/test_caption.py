@@ -0,0 +1,76 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.model import Caption, Video, VideoTag, VideoTagMap, db
+from zeeguu.core.model.new_text import NewText
+from zeeguu.core.test.rules.language_rule import LanguageRule
+
+
+class BulkCaptionTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.video = Video(
+            "abc123",
+            "A video",
+            None,
+            "",
+            datetime.now(),
+            None,
+            None,
+            60,
+            LanguageRule().de,
+        )
+        db.session.add(self.video)
+        db.session.commit()
+
+    def test_texts_are_found_or_created_at_once(self):
+        existing = NewText.find_or_create(db.session, "Hallo")
+
+        ids = NewText.find_or_create_all(db.session, ["Hallo ", "Welt", "Welt"])
+
+        assert ids["Hallo"] == existing.id
+        assert NewText.find_by_id(ids["Welt"]).get_content() == "Welt"
+        assert NewText.query.count() == 2
+
+    def test_texts_inserted_by_others_meanwhile_are_found(self):
+        # as with MySQL's REPEATABLE READ, where the plain lookups read from
+        # a snapshot taken before another crawler inserted the text
+        other = NewText.find_or_create(db.session, "[Music]")
+        ids_by_hash = NewText._ids_by_hash
+
+        def from_old_snapshot(session, hashes, lock=False):
+            return ids_by_hash(session, hashes, lock) if lock else {}
+
+        with patch.object(NewText, "_ids_by_hash", side_effect=from_old_snapshot):
+            ids = NewText.find_or_create_all(db.session, ["[Music]", "Hallo"])
+
+        assert ids["[Music]"] == other.id
+        assert NewText.query.count() == 2
+
+    def test_captions_are_created_at_once(self):
+        captions = [
+            dict(time_start=0, time_end=1000, text="Hallo"),
+            dict(time_start=1000, time_end=2000, text="Welt"),
+            dict(time_start=2000, time_end=3000, text="Hallo"),
+        ]
+
+        Caption.create_all(db.session, self.video, captions)
+        db.session.commit()
+
+        assert [
+            (each.time_start, each.get_content()) for each in self.video.captions
+        ] == [(0, "Hallo"), (1000, "Welt"), (2000, "Hallo")]
+        assert NewText.query.count() == 2
+
+    def test_tags_are_found_or_created_at_once(self):
+        existing = VideoTag.find_or_create(db.session, "music")
+
+        tags = VideoTag.find_or_create_all(db.session, ["music", "news", "music"])
+        VideoTagMap.create_all(db.session, self.video, tags)
+        db.session.commit()
+
+        assert tags[0] == existing
+        assert [each.tag for each in tags] == ["music", "news"]
+        assert VideoTagMap.query.filter_by(video_id=self.video.id).count() == 2
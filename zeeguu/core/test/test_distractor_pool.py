@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from zeeguu.core.exercises.distractor_pool import DistractorPool, RANK_BUCKET_SIZE
+from zeeguu.core.exercises.similar_words import similar_words
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.user_rule import UserRule
+from zeeguu.core.word_stats import lang_info
+
+
+class DistractorPoolTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserRule().user
+        self.info = lang_info("de")
+        self.ranked_words = [
+            (word, self.info[word].rank) for word in self.info.all_words()[:5000]
+        ]
+        self.pool = DistractorPool("de", self.ranked_words)
+
+    def test_pool_excludes_single_letter_words(self):
+        assert len(self.pool) > 0
+        assert all(len(word) > 1 for word in self.pool.words)
+
+    def test_distractors_have_a_similar_rank(self):
+        word = "haus"
+        word_bucket = self.info[word].rank // RANK_BUCKET_SIZE
+
+        distractors = self.pool.sample(word, 3)
+
+        assert len(set(distractors)) == 3
+        assert word not in distractors
+        for each in distractors:
+            assert self.info[each].rank // RANK_BUCKET_SIZE == word_bucket
+
+    def test_unknown_words_get_distractors_from_the_whole_pool(self):
+        assert len(self.pool.sample("xyzzyqwerty", 2)) == 2
+
+    def test_similar_words_without_scheduled_words(self):
+        language = self.user.learned_language
+
+        distractors = similar_words("test", language, self.user)
+
+        assert len(distractors) == 2
+        assert "test" not in distractors
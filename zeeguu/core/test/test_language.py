@@ -1,12 +1,15 @@
+from contextlib import contextmanager
 from unittest import TestCase
 
 import zeeguu.core
+from sqlalchemy import event
 from sqlalchemy.orm.exc import NoResultFound
 
 from zeeguu.core.test.model_test_mixin import ModelTestMixIn
 from zeeguu.core.test.rules.language_rule import LanguageRule
 from zeeguu.core.test.rules.user_rule import UserRule
 from zeeguu.core.model.language import Language
+from zeeguu.core.model import CacheGeneration, ExerciseSource, reference_data_cache
 
 db_session = zeeguu.core.model.db.session
 
@@ -16,6 +19,20 @@ class LanguageTest(ModelTestMixIn, TestCase):
         super().setUp()
         self.user = UserRule().user
 
+    @contextmanager
+    def _statements(self):
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = zeeguu.core.model.db.engine
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
     def test_languages_exists(self):
         language_should_be = LanguageRule().random
 
@@ -57,3 +74,55 @@ class LanguageTest(ModelTestMixIn, TestCase):
 
         self.user.set_native_language(language_should_be.code)
         assert self.user.native_language.id == language_should_be.id
+
+    def test_language_lookups_are_cached(self):
+        language_should_be = LanguageRule().random
+        db_session.commit()
+        reference_data_cache.preload()
+
+        with self._statements() as statements:
+            by_code = Language.find(language_should_be.code)
+            by_id = Language.find_by_id(language_should_be.id)
+
+        assert statements == []
+        assert by_code.id == language_should_be.id
+        assert by_id in db_session
+
+    def test_language_added_after_preload_is_found(self):
+        reference_data_cache.preload()
+        language = Language.find_or_create("da")
+
+        assert Language.find("da").id == language.id
+        self.assertRaises(NoResultFound, Language.find, "xx")
+
+    def test_missing_languages_are_looked_up_once(self):
+        reference_data_cache.preload()
+        self.assertRaises(NoResultFound, Language.find, "xx")
+
+        with self._statements() as statements:
+            self.assertRaises(NoResultFound, Language.find, "xx")
+
+        assert statements == []
+
+    def test_changes_by_other_processes_drop_the_cache(self):
+        reference_data_cache.preload()
+        self.assertRaises(NoResultFound, Language.find, "xx")
+
+        # as if another process added the language without the ORM
+        db_session.execute(
+            Language.__table__.insert().values(code="xx", name="Some Language")
+        )
+        reference_data_cache.bump_version(db_session)
+        db_session.commit()
+        reference_data_cache._version_checked_at = 0
+
+        assert Language.find("xx").code == "xx"
+
+    def test_writes_bump_the_version(self):
+        reference_data_cache.preload()
+        version = reference_data_cache.version()
+
+        ExerciseSource.find_or_create(db_session, "A new kind of exercise")
+
+        generation = CacheGeneration.current(["reference_data"])["reference_data"]
+        assert generation > version
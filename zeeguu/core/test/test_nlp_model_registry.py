@@ -0,0 +1,72 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from zeeguu.core.nlp_pipeline import SpacyWrappers
+from zeeguu.core.nlp_pipeline import nlp_service
+from zeeguu.core.nlp_pipeline.model_registry import LazyModelRegistry
+from zeeguu.core.nlp_pipeline.nlp_service import (
+    RemoteNLPService,
+    check_nlp_worker_config,
+)
+
+
+class LazyModelRegistryTest(TestCase):
+    def setUp(self):
+        self.loads = []
+        self.registry = LazyModelRegistry(
+            "test model",
+            {"da": lambda: self._load("da"), "de": lambda: self._load("de")},
+        )
+
+    def _load(self, language_code):
+        self.loads.append(language_code)
+        return f"model for {language_code}"
+
+    def test_checking_the_supported_languages_does_not_load(self):
+        assert "da" in self.registry
+        assert "fr" not in self.registry
+        assert list(self.registry.keys()) == ["da", "de"]
+        assert self.loads == []
+
+    def test_models_are_loaded_once_on_first_use(self):
+        assert self.registry["da"] == "model for da"
+        assert self.registry["da"] == "model for da"
+
+        assert self.loads == ["da"]
+        assert self.registry.loaded() == ["da"]
+        assert "load_seconds" in self.registry.memory_usage()["da"]
+
+    def test_preload_ignores_unsupported_languages(self):
+        self.registry.preload(["de", "fr"])
+
+        assert self.loads == ["de"]
+
+    def test_importing_the_pipeline_loads_no_spacy_model(self):
+        assert "da" in SpacyWrappers
+        assert not SpacyWrappers.is_loaded("da")
+
+
+class RemoteNLPServiceTest(TestCase):
+    def test_the_worker_needs_a_secret(self):
+        check_nlp_worker_config({})
+        check_nlp_worker_config(
+            {"NLP_WORKER_ADDRESS": "localhost:9005", "NLP_WORKER_AUTHKEY": "secret"}
+        )
+        with self.assertRaises(ValueError):
+            check_nlp_worker_config({"NLP_WORKER_ADDRESS": "localhost:9005"})
+
+    def test_reconnects_after_the_worker_restarts(self):
+        dead, alive = MagicMock(), MagicMock()
+        dead.tokenize_sentence.side_effect = EOFError
+        alive.tokenize_sentence.return_value = ["Hej"]
+        manager = MagicMock()
+        manager.return_value.nlp_service.side_effect = [dead, alive]
+
+        with patch.object(nlp_service, "NLPWorkerManager", manager), patch.object(
+            nlp_service, "_authkey", return_value=b"secret"
+        ):
+            service = RemoteNLPService("localhost:9005")
+            assert service.tokenize_sentence("da", "Hej") == ["Hej"]
+            assert service.tokenize_sentence("da", "Hej") == ["Hej"]
+
+        assert manager.return_value.connect.call_count == 2
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+
+from zeeguu.core.content_cleaning.content_cleaner import cleanup_non_content_bits
+from zeeguu.core.content_quality.quality_filter import sufficient_quality_html
+from zeeguu.core.content_retriever.article_downloader import banned_url
+from zeeguu.core.model import LowQualityTypes
+from zeeguu.core.util.pattern_matcher import PatternMatcher
+
+
+class PatternMatcherTest(TestCase):
+    def setUp(self):
+        self.matcher = PatternMatcher(["abonné", "article abonné", "Read more"])
+
+    def test_search_finds_the_first_occurrence(self):
+        text = "Read more, un article abonné"
+
+        assert self.matcher.search(text) == "Read more"
+        assert self.matcher.search("nothing to see") is None
+
+    def test_the_longest_pattern_wins_at_the_same_position(self):
+        assert self.matcher.search("un article abonné") == "article abonné"
+
+    def test_find_all(self):
+        text = "abonné ... Read more ... abonné"
+
+        assert self.matcher.find_all(text) == ["abonné", "Read more"]
+
+    def test_match_prefix(self):
+        assert self.matcher.match_prefix("Read more here") == "Read more"
+        assert self.matcher.match_prefix("Do Read more") is None
+
+    def test_ignore_case(self):
+        matcher = PatternMatcher(["Read More"], ignore_case=True)
+
+        assert matcher.search("please READ MORE") == "Read More"
+
+    def test_without_patterns(self):
+        assert PatternMatcher([]).search("anything") is None
+
+
+class PatternMatchingTest(ModelTestMixIn, TestCase):
+    def test_html_quality_reports_the_pattern(self):
+        html = "<p>...</p><div>Jetzt Gratismonat beginnen</div>"
+
+        quality, reason, code = sufficient_quality_html(html)
+
+        assert not quality
+        assert reason.endswith("Jetzt Gratismonat beginnen")
+        assert code == LowQualityTypes.HTML_PATTERN
+
+    def test_banned_url_tells_the_prefix(self):
+        assert banned_url("http://www.faz.net/pro/x") == "https://www.faz.net/pro"
+        assert banned_url("https://www.faz.net/aktuell/x") is None
+
+    def test_junk_patterns_are_removed(self):
+        text = (
+            "Der Hund spielt im Garten mit dem Ball.\n\n"
+            "Artiklen fortsætter efter annoncen\n\n"
+            "Die Katze schläft auf dem Sofa den ganzen Tag."
+        )
+
+        cleaned = cleanup_non_content_bits(text)
+
+        assert "Artiklen fortsætter efter annoncen" not in cleaned
+        assert "Die Katze schläft" in cleaned
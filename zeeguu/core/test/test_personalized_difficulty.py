@@ -0,0 +1,106 @@
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.language.difficulty_estimator_factory import (
+    DifficultyEstimatorFactory,
+)
+from zeeguu.core.language.known_words import KnownWords, forget_article_word_ranks
+from zeeguu.core.language.strategies.personalized_difficulty_estimator import (
+    PersonalizedDifficultyEstimator,
+)
+from zeeguu.core.test.rules.bookmark_rule import BookmarkRule
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.test.rules.user_rule import UserRule
+from zeeguu.core.word_stats import UNKNOWN_RANK, lang_info, word_rank
+
+
+class _Article:
+    def __init__(self, id, language, content):
+        self.id = id
+        self.source_id = None
+        self.language = language
+        self.content = content
+
+    def get_content(self):
+        return self.content
+
+
+class KnownWordsTest(TestCase):
+    def setUp(self):
+        self.known_words = KnownWords(1000, known_ranks=[5000], unknown_ranks=[10])
+
+    def test_frequent_words_are_known_except_the_bookmarked_ones(self):
+        assert self.known_words.knows(
+            [5, 10, 999, 1000, 5000, 6000, 200000]
+        ).tolist() == [
+            True,
+            False,
+            True,
+            False,
+            True,
+            False,
+            False,
+        ]
+
+    def test_words_missing_from_the_frequency_lists_are_not_counted(self):
+        ratios = self.known_words.unknown_ratios(
+            [
+                np.array([5, 6000, UNKNOWN_RANK, UNKNOWN_RANK]),
+                np.array([]),
+                np.array([5]),
+            ]
+        )
+
+        assert ratios.tolist() == [0.5, 0.0, 0.0]
+
+    def test_scoring_a_hundred_articles_is_fast(self):
+        articles = [np.random.randint(1, 50000, 500) for _ in range(100)]
+
+        start = time.time()
+        self.known_words.unknown_ratios(articles)
+
+        assert time.time() - start < 0.05
+
+
+class PersonalizedDifficultyEstimatorTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserRule().user
+        self.german = LanguageRule().de
+        self.user.learned_language = self.german
+        KnownWords.invalidate()
+        forget_article_word_ranks()
+
+    def test_is_registered_in_the_factory(self):
+        estimator = DifficultyEstimatorFactory.get_difficulty_estimator("personalized")
+
+        assert estimator is PersonalizedDifficultyEstimator
+
+    def test_bookmarked_words_are_not_known(self):
+        bookmark = BookmarkRule(self.user).bookmark
+        bookmark.origin.word = "und"
+        bookmark.origin.language = self.german
+
+        difficulty = PersonalizedDifficultyEstimator.estimate_difficulty(
+            "und und der", self.german, self.user
+        )
+
+        assert abs(difficulty["normalized"] - 2 / 3) < 1e-9
+        assert difficulty["discrete"] == "HARD"
+
+    def test_articles_with_few_unknown_words_are_ranked_first(self):
+        rare_words = lang_info("de").all_words()[60000:60200]
+        rare_words = [w for w in rare_words if word_rank(w, "de") != UNKNOWN_RANK]
+        common = "der die das und ist nicht ein zu " * 10
+        hard = _Article(1, self.german, " ".join(rare_words[:50]))
+        too_easy = _Article(2, self.german, common)
+        just_right = _Article(3, self.german, common + " ".join(rare_words[50:53]))
+
+        reranked = PersonalizedDifficultyEstimator.rerank_articles(
+            self.user, [hard, too_easy, just_right]
+        )
+
+        assert [each.id for each in reranked] == [3, 2, 1]
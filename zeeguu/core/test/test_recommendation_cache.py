@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.content_recommender.recommendation_cache import (
+    RecommendationCache,
+    new_content_for_language,
+    recommendations_for_user,
+    user_interacted_with_content,
+)
+from zeeguu.core.language.known_words import KnownWords
+from zeeguu.core.model import CacheGeneration, TopicFilter, db
+from zeeguu.core.test.rules.article_rule import ArticleRule
+from zeeguu.core.test.rules.bookmark_rule import BookmarkRule
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.test.rules.topic_rule import TopicRule
+from zeeguu.core.test.rules.user_rule import UserRule
+
+MODULE = "zeeguu.core.content_recommender.recommendation_cache"
+
+
+class CacheGenerationTest(ModelTestMixIn, TestCase):
+    def test_bump(self):
+        assert CacheGeneration.current(["a", "b"]) == {"a": 0, "b": 0}
+
+        CacheGeneration.bump(db.session, "a")
+        db.session.commit()
+        CacheGeneration.bump(db.session, "a")
+        db.session.commit()
+
+        assert CacheGeneration.current(["a", "b"]) == {"a": 2, "b": 0}
+
+
+class RecommendationCacheTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserRule().user
+        self.user.set_learned_language_level(
+            self.user.learned_language.code, "2", db.session
+        )
+        db.session.commit()
+        self.articles = [ArticleRule().article for _ in range(3)]
+        self.cache = RecommendationCache(self.app, prefetch=False)
+
+        recommend = patch(
+            f"{MODULE}.article_recommendations_for_user",
+            side_effect=lambda user, count, page: self.articles,
+        )
+        self.recommend = recommend.start()
+        self.addCleanup(recommend.stop)
+        videos = patch(f"{MODULE}.video_recommendations_for_user", return_value=[])
+        self.videos = videos.start()
+        self.addCleanup(videos.stop)
+
+    def _recommended(self, page=0):
+        articles, _ = self.cache.recommendations(self.user, 20, page)
+        return articles
+
+    def test_repeated_loads_are_hits(self):
+        assert self._recommended() == self.articles
+        assert self._recommended() == self.articles
+
+        assert self.recommend.call_count == 1
+        assert self.cache.metrics()["hits"] == 1
+
+    def test_pages_are_cached_separately(self):
+        self._recommended(0)
+        self._recommended(1)
+
+        assert self.recommend.call_count == 2
+
+    def test_new_content_invalidates(self):
+        self._recommended()
+        new_content_for_language(db.session, self.user.learned_language_id)
+        db.session.commit()
+        self._recommended()
+
+        assert self.recommend.call_count == 2
+
+    def test_opening_content_invalidates(self):
+        self._recommended()
+        user_interacted_with_content(db.session, self.user.id)
+        db.session.commit()
+        self._recommended()
+
+        assert self.recommend.call_count == 2
+
+    def test_changing_the_filters_invalidates(self):
+        self._recommended()
+        TopicFilter.find_or_create(
+            db.session, self.user, TopicRule.get_or_create_topic(1)
+        )
+        db.session.commit()
+        self._recommended()
+
+        assert self.recommend.call_count == 2
+
+    def test_broken_articles_are_left_out_of_cached_pages(self):
+        self._recommended()
+        self.articles[0].broken = 1
+        db.session.commit()
+
+        assert self._recommended() == self.articles[1:]
+
+    def test_prefetched_pages_are_hits(self):
+        self.cache.prefetch_page(self.user, 20, 1)
+        self._recommended(1)
+
+        assert self.recommend.call_count == 1
+        assert self.cache.metrics()["prefetched"] == 1
+
+    def test_known_words_invalidate_the_pages_of_the_personalized_estimator(self):
+        self.user.learned_language = LanguageRule().de
+        self.user.set_learned_language_level("de", "2", db.session)
+        db.session.commit()
+        KnownWords.invalidate(self.user.id)
+        with patch.object(
+            type(self.user),
+            "preferred_difficulty_estimator",
+            return_value="personalized",
+        ):
+            self._recommended()
+            self._recommended()
+            assert self.recommend.call_count == 1
+
+            # a frequent word, that was known, is looked up
+            bookmark = BookmarkRule(self.user).bookmark
+            bookmark.origin.word = "und"
+            bookmark.origin.language = self.user.learned_language
+            db.session.commit()
+            # as when the known words of the user expire from their cache
+            KnownWords.invalidate(self.user.id)
+            self._recommended()
+
+        assert self.recommend.call_count == 2
+
+    def test_the_uncached_pages_leave_out_the_missing_videos_too(self):
+        video = SimpleNamespace(id=1)
+        self.videos.return_value = [None, video]
+
+        assert self.cache.recommendations(self.user, 20)[1] == [video]
+        # the cache is disabled in the tests
+        assert recommendations_for_user(self.user, 20)[1] == [video]
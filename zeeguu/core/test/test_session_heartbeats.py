@@ -0,0 +1,101 @@
+from datetime import timedelta
+from unittest import TestCase
+
+from sqlalchemy import update
+
+import zeeguu.core
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.model import DailyActivity, UserReadingSession, db
+from zeeguu.core.session_heartbeats import SessionHeartbeats
+from zeeguu.core.test.rules.user_reading_session_rule import ReadingSessionRule
+
+
+class SessionHeartbeatsTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = ReadingSessionRule().w_session
+        self.time = self.session.start_time
+
+        self.heartbeats = SessionHeartbeats(zeeguu.core.app)
+        # flushed by hand in the tests
+        self.heartbeats._ensure_flusher = lambda: None
+
+    def _heartbeat(self, duration, seconds_later):
+        self.heartbeats.record(
+            UserReadingSession,
+            self.session.id,
+            duration,
+            self.time + timedelta(seconds=seconds_later),
+        )
+
+    def _reading_duration(self):
+        db.session.expire_all()
+        return sum(
+            each.reading_duration
+            for each in DailyActivity.query.filter_by(user_id=self.session.user_id)
+        )
+
+    def test_heartbeats_are_coalesced(self):
+        for i in range(1, 6):
+            self._heartbeat(i * 2000, i * 2)
+
+        assert self.heartbeats.pending_duration(UserReadingSession, self.session.id)
+        assert UserReadingSession.find_by_id(self.session.id).duration == 0
+
+        self.heartbeats.flush()
+
+        db.session.expire_all()
+        session = UserReadingSession.find_by_id(self.session.id)
+        assert session.duration == 10000
+        assert session.last_action_time == self.time + timedelta(seconds=10)
+        assert self._reading_duration() == 10000
+        assert self.heartbeats.metrics()["written"] == 1
+
+    def test_the_daily_activity_is_the_same_as_with_every_heartbeat_written(self):
+        self._heartbeat(2000, 2)
+        self.heartbeats.flush()
+        self._heartbeat(4000, 4)
+        self._heartbeat(6000, 6)
+        self.heartbeats.flush()
+
+        assert self._reading_duration() == 6000
+
+    def test_older_heartbeats_do_not_overwrite_newer_ones(self):
+        self._heartbeat(6000, 6)
+        self.heartbeats.flush()
+
+        # e.g. from another worker that flushed later
+        self._heartbeat(4000, 4)
+        self.heartbeats.flush()
+
+        db.session.expire_all()
+        assert UserReadingSession.find_by_id(self.session.id).duration == 6000
+        assert self._reading_duration() == 6000
+        assert self.heartbeats.metrics()["stale"] == 1
+
+    def test_the_delta_is_from_the_duration_in_the_db(self):
+        assert self.session.duration == 0
+        # another worker wrote a later duration since the session was loaded
+        db.session.execute(
+            update(UserReadingSession.__table__)
+            .where(UserReadingSession.__table__.c.id == self.session.id)
+            .values(duration=4000)
+        )
+        DailyActivity.add_session_duration(db.session, self.session, 4000)
+
+        self._heartbeat(6000, 6)
+        self.heartbeats.flush_session(UserReadingSession, self.session.id)
+
+        assert self._reading_duration() == 6000
+
+    def test_flush_session(self):
+        self._heartbeat(2000, 2)
+
+        self.heartbeats.flush_session(UserReadingSession, self.session.id)
+
+        assert (
+            self.heartbeats.pending_duration(UserReadingSession, self.session.id)
+            is None
+        )
+        db.session.expire_all()
+        assert UserReadingSession.find_by_id(self.session.id).duration == 2000
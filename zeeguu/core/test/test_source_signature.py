@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.content_quality import minhash
+from zeeguu.core.content_retriever.article_downloader import download_from_feed
+from zeeguu.core.model import Article, SourceSignature, db
+from zeeguu.core.model.article_broken_code_map import (
+    ArticleBrokenMap,
+    LowQualityTypes,
+)
+from zeeguu.core.model.source import Source
+from zeeguu.core.model.source_type import SourceType
+from zeeguu.core.test.rules.article_rule import ArticleRule
+from zeeguu.core.test.rules.feed_rule import FeedRule
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from tools.crawl_summary.crawl_report import CrawlReport
+
+from zeeguu.core.test.mocking_the_web import *
+
+STORY = (
+    "Die Regierung hat am Montag ein neues Gesetz zur Förderung der "
+    "erneuerbaren Energien vorgestellt. Nach Angaben des Ministeriums sollen "
+    "bis zum Jahr 2030 mehr als achtzig Prozent des Stroms aus Wind und Sonne "
+    "kommen. Die Opposition kritisierte den Entwurf als unzureichend und "
+    "forderte schnellere Genehmigungsverfahren für neue Anlagen. Umweltverbände "
+    "begrüßten dagegen die Pläne, mahnten aber eine zügige Umsetzung an."
+)
+# the same wire story, as published by another paper
+SAME_STORY = (
+    "Berlin (dpa) - "
+    + STORY.replace("am Montag", "am Montagvormittag")
+    + " Mehr dazu lesen Sie morgen."
+)
+OTHER_STORY = (
+    "Der Fußballverein gewann das Spiel am Samstag mit drei zu eins. Der "
+    "Trainer lobte nach dem Abpfiff besonders die Abwehr, die kaum Chancen "
+    "zugelassen habe. In der Tabelle rückt die Mannschaft damit auf den "
+    "vierten Platz vor und hat noch Chancen auf die Champions League."
+)
+
+
+class MinHashTest(TestCase):
+    def test_near_duplicates_have_similar_signatures(self):
+        story = minhash.minhash(STORY)
+
+        assert minhash.similarity(story, minhash.minhash(SAME_STORY)) > 0.7
+        assert minhash.similarity(story, minhash.minhash(OTHER_STORY)) < 0.1
+
+    def test_signatures_are_deterministic(self):
+        assert (minhash.minhash(STORY) == minhash.minhash(STORY)).all()
+        assert minhash.lsh_buckets(minhash.minhash(STORY)) == minhash.lsh_buckets(
+            minhash.minhash(STORY)
+        )
+
+    def test_text_without_words(self):
+        assert minhash.minhash(" - ") is None
+
+
+class SourceSignatureTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.german = LanguageRule().de
+
+    def _source_with_signature(self, text, language=None, published=None):
+        language = language or self.german
+        source = Source.find_or_create(
+            db.session,
+            text,
+            SourceType.find_by_type(SourceType.ARTICLE),
+            language,
+            0,
+        )
+        source.signature = SourceSignature.for_text(text)
+        article = ArticleRule().article
+        article.source = source
+        article.language = language
+        article.published_time = published or datetime.now()
+        db.session.add(article)
+        db.session.commit()
+        return source
+
+    def _near_duplicate(self, text):
+        return SourceSignature.find_near_duplicate(
+            SourceSignature.for_text(text), self.german, threshold=0.7
+        )
+
+    def test_finds_the_near_duplicate(self):
+        source = self._source_with_signature(STORY)
+        self._source_with_signature(OTHER_STORY)
+
+        signature, similarity = self._near_duplicate(SAME_STORY)
+
+        assert signature.source_id == source.id
+        assert similarity > 0.7
+
+    def test_different_stories_are_not_duplicates(self):
+        self._source_with_signature(STORY)
+
+        assert self._near_duplicate(OTHER_STORY) is None
+
+    def test_only_recent_articles_in_the_same_language_are_compared(self):
+        self._source_with_signature(STORY, language=LanguageRule().da)
+        self._source_with_signature(
+            STORY + " Gestern.", published=datetime.now() - timedelta(days=30)
+        )
+
+        assert self._near_duplicate(SAME_STORY) is None
+
+    def test_crawled_articles_get_a_signature(self):
+        feed = FeedRule().feed1
+        crawl_report = CrawlReport()
+        crawl_report.add_feed(feed)
+
+        download_from_feed(feed, db.session, crawl_report, 3, False)
+
+        articles = [each for each in feed.get_articles(limit=3) if not each.broken]
+        assert articles
+        for article in articles:
+            assert article.source.signature is not None
+            assert len(article.source.signature.buckets) == minhash.BANDS
+
+    def test_near_duplicates_are_saved_as_broken(self):
+        feed = FeedRule().feed1
+        crawl_report = CrawlReport()
+        crawl_report.add_feed(feed)
+        original = SourceSignature.for_text(STORY)
+
+        with patch.object(
+            SourceSignature, "find_near_duplicate", return_value=(original, 0.9)
+        ):
+            download_from_feed(feed, db.session, crawl_report, 3, False)
+
+        articles = Article.query.filter_by(feed_id=feed.id).all()
+        assert articles
+        for article in articles:
+            assert article.broken
+            assert article.source.signature is None
+            assert ArticleBrokenMap.find_or_create(
+                db.session, article, LowQualityTypes.NEAR_DUPLICATE
+            )
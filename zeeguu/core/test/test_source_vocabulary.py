@@ -0,0 +1,98 @@
+from unittest import TestCase
+
+import numpy as np
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.language.known_words import (
+    articles_word_ranks,
+    forget_article_word_ranks,
+    text_word_ranks,
+)
+from zeeguu.core.model import SourceVocabulary, db
+from zeeguu.core.model.source import Source
+from zeeguu.core.model.source_type import SourceType
+from zeeguu.core.model.source_vocabulary import RANK_HISTOGRAM_EDGES
+from zeeguu.core.test.rules.article_rule import ArticleRule
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.word_stats import UNKNOWN_RANK, word_rank
+
+TEXT = "Der Hund und der Katze spielen mit Xyzzyq und dem Hund"
+
+
+class SourceVocabularyTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.german = LanguageRule().de
+        forget_article_word_ranks()
+
+    def _source(self, text):
+        source = Source.find_or_create(
+            db.session,
+            text,
+            SourceType.find_by_type(SourceType.ARTICLE),
+            self.german,
+            0,
+        )
+        return source
+
+    def test_vocabulary_is_computed_when_the_source_is_created(self):
+        vocabulary = self._source(TEXT).vocabulary
+
+        assert vocabulary is not None
+        assert vocabulary.word_count == 11
+        assert list(vocabulary.ranks()) == sorted(set(vocabulary.ranks()))
+
+        counts = dict(zip(vocabulary.ranks().tolist(), vocabulary.counts().tolist()))
+        assert counts[word_rank("hund", "de")] == 2
+        assert counts[word_rank("und", "de")] == 2
+        assert counts[UNKNOWN_RANK] == 1
+
+    def test_all_word_ranks_are_the_ones_of_the_text(self):
+        vocabulary = self._source(TEXT).vocabulary
+
+        assert sorted(vocabulary.all_word_ranks()) == sorted(
+            text_word_ranks(TEXT, "de")
+        )
+
+    def test_histogram(self):
+        histogram = self._source(TEXT).vocabulary.histogram()
+
+        assert len(histogram) == len(RANK_HISTOGRAM_EDGES) + 1
+        assert histogram.sum() == 11
+        # der, und, mit, dem are among the most frequent 500 words
+        assert histogram[0] >= 7
+        assert self._source(TEXT).vocabulary.unknown_word_count() == 1
+
+    def test_vocabulary_survives_the_database(self):
+        source = self._source(TEXT)
+        db.session.commit()
+        db.session.expire_all()
+
+        loaded = SourceVocabulary.find(source.id)
+        assert sorted(loaded.all_word_ranks()) == sorted(text_word_ranks(TEXT, "de"))
+
+    def test_bulk_loading(self):
+        articles = [ArticleRule().article for _ in range(3)]
+
+        vocabularies = SourceVocabulary.for_articles(articles)
+
+        assert set(vocabularies.keys()) == set(each.id for each in articles)
+        for article in articles:
+            assert vocabularies[article.id].source_id == article.source_id
+
+    def test_articles_word_ranks_use_the_stored_vocabulary(self):
+        article = ArticleRule().article
+        article.source.vocabulary.word_ranks = np.array([1, 2], dtype="<i4").tobytes()
+        article.source.vocabulary.word_counts = np.array([3, 1], "<u2").tobytes()
+
+        [ranks] = articles_word_ranks([article])
+
+        assert list(ranks) == [1, 1, 1, 2]
+
+    def test_compute_for_source_recomputes_the_vocabulary(self):
+        source = self._source(TEXT)
+        source.vocabulary.word_count = 0
+
+        SourceVocabulary.compute_for_source(db.session, source)
+
+        assert source.vocabulary.word_count == 11
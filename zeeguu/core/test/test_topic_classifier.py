@@ -0,0 +1,79 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+import zeeguu.core
+from zeeguu.core.content_retriever.article_downloader import download_from_feed
+from zeeguu.core.model import db
+from zeeguu.core.semantic_search import (
+    get_topic_classification_based_on_similar_content,
+)
+from zeeguu.core.semantic_search.topic_classifier import LocalTopicClassifier
+from zeeguu.core.semantic_search.vector_index import ArticleVectorIndex
+from zeeguu.core.test.rules.feed_rule import FeedRule
+from zeeguu.core.test.rules.topic_rule import TopicRule
+from tools.crawl_summary.crawl_report import CrawlReport
+
+from zeeguu.core.test.mocking_the_web import *
+
+
+class LocalTopicClassifierTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sports = TopicRule.get_or_create_topic(1)
+        self.culture = TopicRule.get_or_create_topic(2)
+
+        index = ArticleVectorIndex()
+        index.add(1, [1, 0, 0], "German", topics=["Sports"])
+        index.add(2, [0.9, 0.1, 0], "Danish", topics=["Sports"])
+        index.add(3, [0, 1, 0], "German", topics=["Culture & Art"])
+        index.add(4, [1, 0.1, 0], "German")
+        self.classifier = LocalTopicClassifier(index)
+
+    def test_neighbours_have_topics_in_any_language(self):
+        neighbours = self.classifier.neighbours([1, 0, 0], k=3)
+
+        assert [each.article_id for each in neighbours] == [1, 2, 3]
+
+    def test_filtered_articles_are_not_neighbours(self):
+        neighbours = self.classifier.neighbours([1, 0, 0], k=2, filter_ids=[1])
+
+        assert [each.article_id for each in neighbours] == [2, 3]
+
+    def test_classify_by_majority(self):
+        assert self.classifier.classify([1, 0.2, 0], k=3) == self.sports
+        assert self.classifier.classify([0, 1, 0], k=1) == self.culture
+
+    def test_inference_uses_the_local_classifier(self):
+        zeeguu.core.app.config["LOCAL_TOPIC_CLASSIFIER"] = True
+        try:
+            with patch(
+                "zeeguu.core.semantic_search.topic_classifier.vector_index",
+                return_value=self.classifier.index,
+            ):
+                topic = get_topic_classification_based_on_similar_content(
+                    "", k=3, sem_vec=[1, 0.2, 0]
+                )
+        finally:
+            zeeguu.core.app.config.pop("LOCAL_TOPIC_CLASSIFIER")
+
+        assert topic == self.sports
+
+
+class DocumentEmbeddingTest(ModelTestMixIn, TestCase):
+    def test_crawled_articles_are_embedded_once(self):
+        feed = FeedRule().feed1
+        crawl_report = CrawlReport()
+        crawl_report.add_feed(feed)
+
+        with patch(
+            "zeeguu.core.semantic_vector_api.document_embedding.get_embedding_from_text",
+            return_value=[0.5] * 512,
+        ) as embed, patch("zeeguu.core.elastic.indexing.es_index") as es_index:
+            download_from_feed(feed, db.session, crawl_report, 3, True)
+
+        indexed = es_index.call_count
+        assert indexed > 0
+        # once for the topic inference and the indexing together
+        assert embed.call_count == indexed
+        assert es_index.call_args[0][0]["sem_vec"] == [0.5] * 512
@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+from sqlalchemy import insert
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.model import DomainName, db
+from zeeguu.core.model.bookmark_context import BookmarkContext
+from zeeguu.core.model.new_text import NewText
+from zeeguu.core.model.source_text import SourceText
+from zeeguu.core.model.upsert import find_or_create_atomically
+from zeeguu.core.test.rules.language_rule import LanguageRule
+
+DOMAIN = "https://www.example.com"
+
+
+class FindOrCreateAtomicallyTest(ModelTestMixIn, TestCase):
+    def _find_or_create_domain(self, create):
+        return find_or_create_atomically(
+            db.session, DomainName, [DomainName.domain_name == DOMAIN], create
+        )
+
+    def test_existing_row_is_returned(self):
+        first = DomainName.find_or_create(db.session, DOMAIN + "/a")
+        second = DomainName.find_or_create(db.session, DOMAIN + "/b")
+
+        assert first.id == second.id
+        assert DomainName.query.filter_by(domain_name=DOMAIN).count() == 1
+
+    def test_row_created_concurrently_is_returned(self):
+        unrelated = DomainName("https://unrelated.org")
+        db.session.add(unrelated)
+
+        def create_after_another_request():
+            # another request inserts the same row between our lookup and insert
+            db.session.execute(insert(DomainName.__table__).values(domain_name=DOMAIN))
+            return DomainName(DOMAIN)
+
+        found = self._find_or_create_domain(create_after_another_request)
+
+        assert found.domain_name == DOMAIN
+        assert DomainName.query.filter_by(domain_name=DOMAIN).count() == 1
+        # only our insert was rolled back, not the rest of the session
+        assert unrelated in db.session
+        assert DomainName.query.filter_by(domain_name=unrelated.domain_name).one()
+
+    def test_texts_are_not_duplicated(self):
+        first = SourceText.find_or_create(db.session, "Ein Text. ")
+        second = SourceText.find_or_create(db.session, "Ein Text.")
+
+        assert first.id == second.id
+
+    def test_context_without_type_created_concurrently_is_returned(self):
+        # the unique index must hold for the keys with a NULL as well
+        language = LanguageRule().de
+        text = NewText.find_or_create(db.session, "Ein Satz.")
+
+        def create_after_another_request():
+            db.session.execute(
+                insert(BookmarkContext.__table__).values(
+                    text_id=text.id, context_type_id=None, language_id=language.id
+                )
+            )
+            return BookmarkContext(text, None, language, 0, 0)
+
+        found = find_or_create_atomically(
+            db.session,
+            BookmarkContext,
+            [
+                BookmarkContext.text == text,
+                BookmarkContext.context_type == None,
+                BookmarkContext.language == language,
+            ],
+            create_after_another_request,
+        )
+
+        assert found.text_id == text.id
+        assert BookmarkContext.query.filter_by(text_id=text.id).count() == 1
@@ -1,3 +1,4 @@
+import json
 from unittest import TestCase
 
 from zeeguu.core.test.model_test_mixin import ModelTestMixIn
@@ -8,6 +9,7 @@ from zeeguu.core.test.rules.language_rule import LanguageRule
 from zeeguu.core.test.rules.user_article_rule import UserArticleRule
 from zeeguu.core.test.rules.user_rule import UserRule
 from zeeguu.core.model.user_article import UserArticle
+from zeeguu.core.model.user_reading_session import UserReadingSession
 
 db_session = zeeguu.core.model.db.session
 
@@ -30,3 +32,53 @@ class UserArticleTest(ModelTestMixIn, TestCase):
     def test_all_starred_or_liked_articles(self):
         self.article.star_for_user(db_session, self.user)
         assert 1 == len(UserArticle.all_starred_or_liked_articles_of_user(self.user))
+
+    def _scroll(self, *percentages):
+        return dict(
+            user_id=self.user.id,
+            event="SCROLL",
+            value="[1200, 800]",
+            extra_data=json.dumps([[i, p] for i, p in enumerate(percentages)]),
+            source_id=self.article.source_id,
+        )
+
+    def test_reading_completion_from_scroll_events(self):
+        self.article.word_count = 1000
+
+        UserArticle.record_scroll_events(db_session, [self._scroll(0, 5, 10, 15)])
+        assert self.user_article.reading_completion == 0.15
+
+        # scrolling back up does not make it less read
+        UserArticle.record_scroll_events(db_session, [self._scroll(15, 10, 5)])
+        assert self.user_article.reading_completion == 0.15
+
+        UserArticle.record_scroll_events(
+            db_session,
+            [self._scroll(*range(0, 100, 5)), dict(self._scroll(), event="OPEN")],
+        )
+        assert self.user_article.reading_completion == 1
+
+    def test_reading_completion_of_short_articles_from_reading_time(self):
+        self.article.word_count = 160
+        UserArticle.record_scroll_events(db_session, [self._scroll(0, 5, 10, 15)])
+        assert self.user_article.reading_completion == 0
+
+        session = UserReadingSession(self.user.id, self.article.id)
+        session.duration = 30 * 1000
+        db_session.add(session)
+        db_session.flush()
+        UserArticle.record_reading_time(db_session, session)
+        assert self.user_article.reading_completion == 0
+
+        session.duration = 60 * 1000
+        UserArticle.record_reading_time(db_session, session)
+        assert self.user_article.reading_completion == 1
+
+    def test_user_article_info_has_the_reading_completion(self):
+        self.user_article.reading_completion = 0.5
+
+        info = UserArticle.user_article_info(
+            self.user, self.article, with_translations=False
+        )
+
+        assert info["reading_completion"] == 0.5
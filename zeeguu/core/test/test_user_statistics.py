@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import zeeguu.core
+from zeeguu.core.model import DailyActivity, Exercise, ExerciseOutcome, ExerciseSource
+from zeeguu.core.model.user_exercise_session import UserExerciseSession
+from zeeguu.core.model.user_reading_session import UserReadingSession
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.article_rule import ArticleRule
+from zeeguu.core.test.rules.bookmark_rule import BookmarkRule
+from zeeguu.core.test.rules.cohort_rule import CohortRule
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.test.rules.user_rule import UserRule
+from zeeguu.core.user_statistics.exercise_corectness import (
+    exercise_count_and_correctness_percentage,
+    exercise_count_and_correctness_percentage_for_cohort,
+)
+from zeeguu.core.user_statistics.exercise_sessions import (
+    total_time_in_exercise_sessions,
+    total_time_in_exercise_sessions_for_cohort,
+)
+from zeeguu.core.user_statistics.reading_sessions import (
+    summarize_reading_activity_for_cohort,
+)
+
+db_session = zeeguu.core.model.db.session
+
+
+class CohortStatisticsTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        cohort_rule = CohortRule()
+        self.cohort = cohort_rule.cohort
+        self.student = cohort_rule.student1
+        self.student.learned_language = self.cohort.language
+        self.other_student = UserRule().user
+        self.students = [self.student, self.other_student]
+        for each in self.students:
+            each.add_user_to_cohort(self.cohort, db_session)
+
+        self.to_date = datetime.now() + timedelta(minutes=1)
+        self.from_date = self.to_date - timedelta(days=7)
+
+    def test_exercise_stats_match_the_per_student_stats(self):
+        bookmark = BookmarkRule(self.student).bookmark
+        session_start = datetime.now() - timedelta(hours=1)
+        session = UserExerciseSession(
+            self.student.id, session_start, session_start + timedelta(minutes=5)
+        )
+        db_session.add(session)
+        db_session.flush()
+
+        source = ExerciseSource.find_or_create(db_session, "Recognize")
+        for outcome in [ExerciseOutcome.CORRECT, ExerciseOutcome.WRONG]:
+            exercise = Exercise(
+                ExerciseOutcome.find_or_create(db_session, outcome),
+                source,
+                1000,
+                session_start + timedelta(minutes=1),
+                session.id,
+            )
+            bookmark.add_new_exercise(exercise)
+        db_session.commit()
+
+        time_by_student = total_time_in_exercise_sessions_for_cohort(
+            self.cohort.id, self.from_date, self.to_date
+        )
+        correctness_by_student = exercise_count_and_correctness_percentage_for_cohort(
+            self.cohort.id, self.from_date, self.to_date
+        )
+
+        for student in self.students:
+            assert time_by_student[student.id] == total_time_in_exercise_sessions(
+                student.id, self.cohort.id, self.from_date, self.to_date
+            )
+            assert correctness_by_student[
+                student.id
+            ] == exercise_count_and_correctness_percentage(
+                student.id, self.cohort.id, self.from_date, self.to_date
+            )
+
+        assert time_by_student[self.student.id]["exercise_time_in_sec"] == 300
+        assert correctness_by_student[self.student.id]["number_of_exercises"] == 2
+
+    def test_reading_activity_is_summarized_per_student(self):
+        article = ArticleRule().article
+        article.language = self.cohort.language
+        for minutes_ago in [30, 10]:
+            reading_session = UserReadingSession(
+                self.student.id,
+                article.id,
+                datetime.now() - timedelta(minutes=minutes_ago),
+            )
+            reading_session.duration = 60000
+            db_session.add(reading_session)
+        db_session.commit()
+
+        reading_by_student = summarize_reading_activity_for_cohort(
+            self.cohort.id, self.from_date, self.to_date
+        )
+
+        assert reading_by_student[self.student.id]["number_of_texts"] == 1
+        assert reading_by_student[self.student.id]["reading_time"] == 120
+        assert reading_by_student[self.other_student.id]["number_of_texts"] == 0
+
+
+class DailyActivityTest(ModelTestMixIn, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserRule().user
+
+    def test_rebuild_matches_the_incremental_updates(self):
+        bookmark = BookmarkRule(self.user).bookmark
+        DailyActivity.record_bookmark(db_session, bookmark)
+        session = UserExerciseSession(self.user.id, datetime.now())
+        db_session.add(session)
+        db_session.flush()
+        for outcome in [ExerciseOutcome.CORRECT, ExerciseOutcome.WRONG]:
+            bookmark.report_exercise_outcome(
+                "Recognize", outcome, 1000, session.id, "", db_session
+            )
+
+        incremental = DailyActivity.by_day(self.user.id)
+        DailyActivity.rebuild_for_user(db_session, self.user)
+        db_session.commit()
+
+        assert DailyActivity.by_day(self.user.id) == incremental
+        today, counters = incremental[-1]
+        assert counters["exercise_count"] == 2
+        assert counters["correct_exercise_count"] == 1
+
+    def test_increments_add_up_in_one_row(self):
+        language_id = self.user.learned_language_id
+        for _ in range(3):
+            DailyActivity.increment(
+                db_session, self.user.id, language_id, datetime.now(), exercise_count=1
+            )
+        db_session.commit()
+
+        assert DailyActivity.query.filter_by(user_id=self.user.id).count() == 1
+        assert DailyActivity.by_day(self.user.id)[0][1]["exercise_count"] == 3
+
+    def test_exercise_time_is_in_the_language_of_the_words_practiced(self):
+        bookmark = BookmarkRule(self.user).bookmark
+        self.user.learned_language = LanguageRule().get_or_create_language("it")
+        session = UserExerciseSession(self.user.id, datetime.now())
+        db_session.add(session)
+        db_session.flush()
+        bookmark.report_exercise_outcome(
+            "Recognize", ExerciseOutcome.CORRECT, 1000, session.id, "", db_session
+        )
+        session.duration = 60000
+        DailyActivity.add_session_duration(db_session, session, 60000)
+
+        def exercise_duration():
+            days = DailyActivity.by_day(
+                self.user.id, language_id=bookmark.origin.language_id
+            )
+            return sum(counters["exercise_duration"] for _, counters in days)
+
+        incremental = exercise_duration()
+        DailyActivity.rebuild_for_user(db_session, self.user)
+        db_session.commit()
+
+        assert incremental == 60000
+        assert exercise_duration() == incremental
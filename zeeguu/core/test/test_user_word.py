@@ -39,6 +39,20 @@ class UserWordTest(ModelTestMixIn):
 
         assert user_word_created == user_word_not_in_db
 
+    def test_find_or_create_all(self):
+        existing = UserWordRule().user_word
+        language = existing.language
+        new_word = self.faker.word() + "xq"
+
+        words = UserWord.find_or_create_all(
+            db.session,
+            [(new_word, language), (existing.word, language), (new_word, language)],
+        )
+
+        assert words[1] == existing
+        assert words[0] is words[2]
+        assert UserWord.find(new_word, language) == words[0]
+
     def test_find_all(self):
         list_random_user_words = [
             UserWordRule().user_word for _ in range(random.randint(2, 5))
@@ -0,0 +1,129 @@
+import threading
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+import zeeguu.core
+from zeeguu.core.semantic_search import articles_like_this_semantic
+from zeeguu.core.semantic_search import vector_index as vector_index_module
+from zeeguu.core.semantic_search.vector_index import ArticleVectorIndex
+from zeeguu.core.test.rules.article_rule import ArticleRule
+
+
+class ArticleVectorIndexTest(TestCase):
+    def setUp(self):
+        self.index = ArticleVectorIndex()
+        self.now = datetime.now()
+        self.index.add(1, [1, 0, 0], "German", self.now, ["Sports"])
+        self.index.add(2, [0.9, 0.1, 0], "German", self.now - timedelta(days=30))
+        self.index.add(3, [0.8, 0.2, 0], "Danish", self.now, ["Sports"])
+        self.index.add(4, [0, 1, 0], "German", self.now, ["Culture & Art"])
+
+    def _found(self, sem_vec, k=10, **filters):
+        return [each.article_id for each in self.index.search(sem_vec, k, **filters)]
+
+    def test_the_most_similar_first(self):
+        assert self._found([2, 0, 0], k=3) == [1, 2, 3]
+        assert self.index.search([2, 0, 0], k=1)[0].similarity > 0.99
+
+    def test_filters(self):
+        assert self._found([1, 0, 0], language="German") == [1, 2, 4]
+        week_ago = self.now - timedelta(days=7)
+        assert self._found([1, 0, 0], published_after=week_ago) == [1, 3, 4]
+        assert self._found([1, 0, 0], labelled_only=True) == [1, 3, 4]
+        assert self._found([1, 0, 0], exclude_ids=[1, 3]) == [2, 4]
+
+    def test_update_and_remove(self):
+        self.index.add(1, [0, 1, 0], "Danish")
+        assert sorted(self._found([0, 1, 0], k=2)) == [1, 4]
+        assert self._found([0, 1, 0], language="German", k=1) == [4]
+
+        self.index.remove(1)
+        assert 1 not in self._found([0, 1, 0])
+        assert len(self.index) == 3
+
+    def test_vector_of_an_article(self):
+        assert np.allclose(self.index.vector(1), [1, 0, 0])
+        assert self.index.vector(5) is None
+
+    def test_the_inverted_file_finds_the_same_nearest_neighbour(self):
+        random = np.random.RandomState(1)
+        centers = random.normal(size=(8, 32))
+        vectors = np.repeat(centers, 60, axis=0) + random.normal(
+            scale=0.3, size=(480, 32)
+        )
+
+        index = ArticleVectorIndex()
+        for i, vector in enumerate(vectors):
+            index.add(i, vector, "German")
+        with patch.object(vector_index_module, "IVF_MIN_VECTORS", 100):
+            index.build_inverted_files()
+
+        assert index._languages["German"].centroids is not None
+        for i in range(0, 480, 37):
+            assert index.search(vectors[i], k=1)[0].article_id == i
+        # and new articles are assigned to a cluster
+        index.add(1000, vectors[0] * 2, "German")
+        assert index.search(vectors[0], k=2, exclude_ids=[0])[0].article_id == 1000
+
+
+class LocalVectorSearchTest(ModelTestMixIn, TestCase):
+    def test_articles_like_this_from_the_index(self):
+        article = ArticleRule().article
+        similar = ArticleRule().article
+        without_topics = ArticleRule().article
+        other = ArticleRule().article
+        language = article.language.name
+
+        index = ArticleVectorIndex()
+        index.add(article.id, [1, 0, 0], language, topics=["Sports"])
+        index.add(similar.id, [0.9, 0.1, 0], language, topics=["Sports"])
+        # like in the ES query, the articles without topics are left out
+        index.add(without_topics.id, [0.95, 0.05, 0], language)
+        index.add(other.id, [0, 1, 0], "Other", topics=["Sports"])
+
+        zeeguu.core.app.config["LOCAL_VECTOR_INDEX"] = True
+        try:
+            with patch(
+                "zeeguu.core.semantic_search.elastic_semantic_search.vector_index",
+                return_value=index,
+            ), patch(
+                "zeeguu.core.semantic_search.elastic_semantic_search.get_embedding_from_article"
+            ) as embed:
+                found, hits = articles_like_this_semantic(article)
+        finally:
+            zeeguu.core.app.config.pop("LOCAL_VECTOR_INDEX")
+
+        assert found == [similar]
+        assert hits[0]["_source"]["article_id"] == similar.id
+        # the vector of the article was in the index already
+        embed.assert_not_called()
+
+    def test_the_index_is_loaded_in_the_background(self):
+        index = ArticleVectorIndex()
+        load_started = threading.Event()
+        finish_load = threading.Event()
+
+        def slow_load(max_vectors):
+            load_started.set()
+            finish_load.wait(5)
+            return index
+
+        with patch.object(
+            ArticleVectorIndex, "from_elasticsearch", side_effect=slow_load
+        ), patch.multiple(
+            vector_index_module, _index=None, _index_app=None, _loaded_at=0
+        ):
+            # until it is loaded, the lookups go to ES
+            assert vector_index_module.vector_index() is None
+            assert load_started.wait(5)
+            assert vector_index_module.vector_index() is None
+
+            loader = vector_index_module._loader
+            finish_load.set()
+            loader.join(5)
+
+            assert vector_index_module.vector_index() is index
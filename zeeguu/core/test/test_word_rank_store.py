@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+from nltk.stem import SnowballStemmer
+
+from zeeguu.core.language.strategies.frequency_difficulty_estimator import (
+    FrequencyDifficultyEstimator,
+)
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.word_stats import lang_info, rank_store_cache, word_rank
+from zeeguu.core.word_stats.rank_store import UNKNOWN_RANK, WordRankStore
+
+TEXT = "Alle hatten in sein Lachen eingestimmt, hauptsächlich aus Ehrerbietung"
+
+
+class WordRankStoreTest(ModelTestMixIn, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # building the store stems all the words; done once for all the tests
+        cls.folder = tempfile.mkdtemp()
+        cls.info = lang_info("de")
+        cls.store = WordRankStore.build(
+            cls.folder,
+            (
+                (word, cls.info[word].rank, cls.info[word].frequency)
+                for word in cls.info.all_words()
+            ),
+            SnowballStemmer("german").stem,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def tearDown(self):
+        rank_store_cache.pop("de", None)
+        super().tearDown()
+
+    def test_ranks_are_the_ones_of_wordstats(self):
+        for word in ["Haus", "und", "hauptsächlich", "Ehrerbietung", "xyzzyqwerty"]:
+            assert self.store.rank(word) == self.info[word].rank
+
+        assert self.store.rank("xyzzyqwerty") == UNKNOWN_RANK
+
+    def test_vectorized_lookup(self):
+        words = ["und", "xyzzyqwerty", "Haus", "und"]
+
+        ranks = self.store.ranks(words)
+
+        assert ranks.tolist() == [self.info[w].rank for w in words]
+
+    def test_stems_sum_the_frequencies_of_their_words(self):
+        stem = SnowballStemmer("german").stem("Häuser")
+        words_of_stem = [
+            w
+            for w in ["haus", "hause", "häuser", "häusern"]
+            if SnowballStemmer("german").stem(w) == stem
+        ]
+
+        [frequency] = self.store.stem_frequencies([stem])
+
+        assert frequency >= max(self.info[w].frequency for w in words_of_stem)
+
+    def test_words_by_rank_start_with_the_most_frequent(self):
+        words, ranks = self.store.words_by_rank()
+
+        assert words[:5] == self.info.all_words()[:5]
+        assert list(ranks) == sorted(ranks)
+
+    def test_word_rank_uses_the_store_when_there_is_one(self):
+        rank_store_cache["de"] = self.store
+
+        assert word_rank("Haus", "de") == self.info["Haus"].rank
+
+    def test_frequency_estimator_gives_the_same_scores_with_the_store(self):
+        german = LanguageRule().de
+        without_store = FrequencyDifficultyEstimator.quadratic(german)
+        rank_store_cache["de"] = self.store
+        with_store = FrequencyDifficultyEstimator.quadratic(german)
+
+        assert with_store.rank_store is not None
+        expected = without_store.estimate_difficulty(TEXT)
+        actual = with_store.estimate_difficulty(TEXT)
+        assert actual["discrete"] == expected["discrete"]
+        assert abs(actual["normalized"] - expected["normalized"]) < 1e-9
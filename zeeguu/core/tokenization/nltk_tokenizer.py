@@ -2,7 +2,6 @@ from zeeguu.core.tokenization.token import Token
 from zeeguu.core.tokenization.zeeguu_tokenizer import ZeeguuTokenizer, TokenizerModel
 from zeeguu.core.model.language import Language
 import re
-import nltk
 
 NLTK_SUPPORTED_LANGUAGES = set(
     [
@@ -112,6 +111,8 @@ class NLTKTokenizer(ZeeguuTokenizer):
                 f"Failed 'sent_tokenize' for language: '{language.name.lower()}', defaulted to 'english'",
             )
             language = Language.find("en")
+        import nltk
+
         return nltk.tokenize.sent_tokenize(text, language=language.name.lower())
 
     def tokenize_text(
@@ -123,6 +124,8 @@ class NLTKTokenizer(ZeeguuTokenizer):
         start_sentence_i: int = 0,
         start_paragraph_i: int = 0,
     ):
+        import nltk
+
         language = self.language
         if not self.is_language_supported(language):
             print(
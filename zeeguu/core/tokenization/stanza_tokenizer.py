@@ -4,7 +4,6 @@ from zeeguu.core.model.language import Language
 import re
 from zeeguu.config import ZEEGUU_RESOURCES_FOLDER
 
-import stanza
 import os
 
 STANZA_PARAGRAPH_DELIMITER = re.compile(r"((\s?)+\\n+)")
@@ -41,6 +40,9 @@ class StanzaTokenizer(ZeeguuTokenizer):
         if self.model_type in StanzaTokenizer.STANZA_MODELS:
             # Store used models.
             if key not in StanzaTokenizer.CACHED_NLP_PIPELINES:
+                # stanza pulls in torch; only import it when a pipeline is needed
+                import stanza
+
                 pipeline = stanza.Pipeline(
                     lang=self.language.code,
                     processors=StanzaTokenizer._get_processor(model),
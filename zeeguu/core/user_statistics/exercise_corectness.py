@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from sqlalchemy import text
 
 import zeeguu.core
@@ -8,6 +10,31 @@ from zeeguu.core.model import db
 def exercise_count_and_correctness_percentage(user_id, cohort_id, start_date, end_date):
     outcome_stats = exercise_outcome_stats(user_id, cohort_id, start_date, end_date)
 
+    return _count_and_correctness_percentage(outcome_stats)
+
+
+def exercise_count_and_correctness_percentage_for_cohort(
+    cohort_id, start_date, end_date
+):
+    """
+    Same as exercise_count_and_correctness_percentage, for all the students
+    of the cohort at once.
+
+    :return: dict from user id to stats; students without exercises in the
+    interval get zero exercises
+    """
+    outcome_stats_by_user = exercise_outcome_stats_for_cohort(
+        cohort_id, start_date, end_date
+    )
+
+    result = defaultdict(lambda: _count_and_correctness_percentage({}))
+    for user_id, outcome_stats in outcome_stats_by_user.items():
+        result[user_id] = _count_and_correctness_percentage(outcome_stats)
+
+    return result
+
+
+def _count_and_correctness_percentage(outcome_stats):
     total = 0
     for each in outcome_stats.values():
         total += each
@@ -185,3 +212,48 @@ def exercise_outcome_stats(user_id, cohort_id, start_date: str, end_date: str):
         result[row[0]] = row[1]
 
     return result
+
+
+def exercise_outcome_stats_for_cohort(cohort_id, start_date: str, end_date: str):
+    """
+    :return: dict from user id to the outcome stats of the user, for all
+    the students of the cohort that did exercises in the interval
+    """
+    query = """
+        select b.user_id, o.outcome, count(o.outcome)
+
+        from exercise as e
+        join bookmark_exercise_mapping as bem
+            on bem.`exercise_id`=e.id
+        join bookmark as b
+            on bem.bookmark_id=b.id
+        join exercise_outcome as o
+            on e.outcome_id = o.id
+        join user_word as uw
+            on b.origin_id = uw.id
+        join user_cohort_map as ucm
+            on ucm.user_id = b.user_id
+
+        where ucm.cohort_id=:cohortId
+            and e.time > '2021-05-24' -- before this date data is saved in a different format...
+            and	e.time > :startDate
+            and	e.time < :endDate
+            and uw.language_id = (select language_id from cohort where cohort.id=:cohortId)
+
+        group by b.user_id, o.outcome
+    """
+
+    rows = db.session.execute(
+        text(query),
+        {
+            "startDate": start_date,
+            "endDate": end_date,
+            "cohortId": cohort_id,
+        },
+    )
+
+    result = defaultdict(dict)
+    for user_id, outcome, count in rows:
+        result[user_id][outcome] = count
+
+    return result
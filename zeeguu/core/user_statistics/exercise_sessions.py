@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from sqlalchemy import text
 
 import zeeguu.core
@@ -39,9 +41,61 @@ def total_time_in_exercise_sessions(user_id, cohort_id, start_time, end_time):
     )
     result = rows.first()[0]
 
+    return _exercise_time(result)
+
+
+def total_time_in_exercise_sessions_for_cohort(cohort_id, start_time, end_time):
+    """
+    Same as total_time_in_exercise_sessions, for all the students of the
+    cohort at once.
+
+    :return: dict from user id to exercise time; students without exercise
+    sessions in the interval get zero
+    """
+    cohort = Cohort.find(cohort_id)
+
+    same_language_as_cohort_condition = ""
+    if cohort.language_id:
+        same_language_as_cohort_condition = (
+            f" WHERE uw.language_id = {cohort.language_id} "
+        )
+
+    query = f"""
+        select ues.user_id, sum(duration)
+        from user_exercise_session as ues
+        join user_cohort_map as ucm
+            on ucm.user_id = ues.user_id
+        WHERE ues.id in (SELECT e.session_id from exercise e
+                        INNER JOIN bookmark_exercise_mapping bem on e.id = bem.exercise_id
+                        INNER JOIN bookmark b ON bem.bookmark_id = b.id
+                        INNER JOIN user_word uw ON b.origin_id = uw.id
+                        {same_language_as_cohort_condition})
+        and ues.start_time > :start_time
+        and ues.last_action_time < :end_time
+        and ucm.cohort_id = :cohort_id
+        group by ues.user_id
+    """
+
+    rows = db.session.execute(
+        text(query),
+        {
+            "cohort_id": cohort_id,
+            "start_time": start_time,
+            "end_time": end_time,
+        },
+    )
+
+    result = defaultdict(lambda: _exercise_time(None))
+    for user_id, duration in rows:
+        result[user_id] = _exercise_time(duration)
+
+    return result
+
+
+def _exercise_time(total_duration):
     exercise_time_in_sec = 0
-    if result:
-        exercise_time_in_sec = int(result / 1000)
+    if total_duration:
+        exercise_time_in_sec = int(total_duration / 1000)
 
     return {
         "exercise_time_in_sec": exercise_time_in_sec,
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from statistics import mean
 
 from sqlalchemy import text
@@ -8,13 +9,67 @@ from zeeguu.core.model import db
 
 
 def summarize_reading_activity(user_id, cohort_id, start_date, end_date):
+    r_sessions = reading_sessions(user_id, cohort_id, start_date, end_date)
+
+    return _summarize_reading_sessions(r_sessions)
+
+
+def summarize_reading_activity_for_cohort(cohort_id, start_date, end_date):
+    """
+    Same as summarize_reading_activity, for all the students of the cohort
+    at once.
+
+    :return: dict from user id to summary; students without reading
+    sessions in the interval get an empty summary
+    """
+    query = """
+        select  u.user_id,
+                (u.duration / 1000) as duration_in_sec,
+                a.title,
+                a.word_count,
+                a.fk_difficulty as difficulty
+
+        from user_reading_session as u
+
+        join article as a
+            on u.article_id = a.id
+
+        join user_cohort_map as ucm
+            on ucm.user_id = u.user_id
+
+        where
+            ucm.cohort_id = :cohortId
+            and u.start_time > :startDate
+            and u.last_action_time <= :endDate
+            and u.duration > 0
+            and a.language_id = (select language_id from `cohort` where cohort.id=:cohortId)
+
+        order by u.user_id, u.start_time desc
+    """
+
+    rows = db.session.execute(
+        text(query),
+        {"startDate": start_date, "endDate": end_date, "cohortId": cohort_id},
+    )
+
+    sessions_by_user = defaultdict(list)
+    for row in rows:
+        session = dict(row._mapping)
+        sessions_by_user[session["user_id"]].append(session)
+
+    result = defaultdict(lambda: _summarize_reading_sessions([]))
+    for user_id, sessions in sessions_by_user.items():
+        result[user_id] = _summarize_reading_sessions(sessions)
+
+    return result
+
+
+def _summarize_reading_sessions(r_sessions):
     def _mean(l):
         if len(l) == 0:
             return 0
         return int(mean(l))
 
-    r_sessions = reading_sessions(user_id, cohort_id, start_date, end_date)
-
     distinct_texts = set()
     reading_time = 0
     text_lengths = []
@@ -0,0 +1,63 @@
+import re
+
+
+class PatternMatcher:
+    """
+    Looks for many literal patterns at once: they are compiled into a
+    single regular expression, so a text is scanned once for all of them,
+    instead of once per pattern with str.find. Also tells which pattern
+    matched, e.g. for the crawl report.
+
+    When several patterns match at the same position, the longest wins.
+    """
+
+    def __init__(self, patterns, ignore_case=False):
+        # without duplicates, in the given order
+        self.patterns = list(dict.fromkeys(each for each in patterns if each))
+
+        self._regex = None
+        if self.patterns:
+            longest_first = sorted(self.patterns, key=len, reverse=True)
+            self._regex = re.compile(
+                "|".join(re.escape(each) for each in longest_first),
+                re.IGNORECASE if ignore_case else 0,
+            )
+        self._ignore_case = ignore_case
+        self._by_key = {self._key(each): each for each in self.patterns}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _key(self, matched):
+        return matched.lower() if self._ignore_case else matched
+
+    def _pattern(self, match):
+        return self._by_key[self._key(match.group(0))]
+
+    def search(self, text):
+        """
+        :return: the pattern that occurs first in the text, or None
+        """
+        if self._regex is None:
+            return None
+        match = self._regex.search(text)
+        return self._pattern(match) if match else None
+
+    def find_all(self, text):
+        """
+        :return: the patterns that occur in the text, without duplicates,
+        in the order of their first occurrence
+        """
+        if self._regex is None:
+            return []
+        found = (self._pattern(each) for each in self._regex.finditer(text))
+        return list(dict.fromkeys(found))
+
+    def match_prefix(self, text):
+        """
+        :return: the pattern that the text starts with, or None
+        """
+        if self._regex is None:
+            return None
+        match = self._regex.match(text)
+        return self._pattern(match) if match else None
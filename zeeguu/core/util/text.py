@@ -1,21 +1,24 @@
 import math
 
-import nltk
 import pyphen
 import regex
 from collections import Counter
-from nltk import SnowballStemmer
 from zeeguu.core.model.language import Language
 import emoji
 
 """
     Collection of simple text processing functions
+
+    nltk is imported in the functions that need it; it takes
+    most of a second to import and most processes never use it.
 """
 
 AVERAGE_SYLLABLE_LENGTH = 2.5
 
 
 def number_of_sentences(text):
+    import nltk
+
     return len(nltk.sent_tokenize(text))
 
 
@@ -25,6 +28,8 @@ def split_words_from_text(text):
 
 
 def split_unique_words_from_text(text, language: Language):
+    from nltk import SnowballStemmer
+
     words = split_words_from_text(text)
     stemmer = SnowballStemmer(language.name.lower())
     return set([stemmer.stem(w.lower()) for w in words])
@@ -44,6 +49,8 @@ def average_sentence_length(text):
 
 
 def median_sentence_length(text):
+    import nltk
+
     sentence_lengths = [length(s) for s in nltk.sent_tokenize(text)]
     sentence_lengths = sorted(sentence_lengths)
 
@@ -10,6 +10,8 @@ from .basicSR.two_learning_cycles_per_word import TwoLearningCyclesPerWord
 
 from .basicSR.two_learning_cycles_per_word import ONE_DAY
 
+from .study_queue import StudyQueueEntry, StudyQueueBuilt
+
 
 def get_scheduler(user):
 
@@ -1,11 +1,15 @@
 from zeeguu.core.model import Bookmark, UserWord, ExerciseOutcome
 
 from zeeguu.core.model.bookmark import Bookmark
+from zeeguu.core.model.daily_activity import DailyActivity
 from zeeguu.core.model.learning_cycle import LearningCycle
 from zeeguu.core.model import UserPreference
 
 from zeeguu.core.model import db
 
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload
+
 from datetime import datetime, timedelta
 
 ONE_DAY = 60 * 24
@@ -34,10 +38,11 @@ class BasicSRSchedule(db.Model):
         self.cooling_interval = 0
 
     def set_bookmark_as_learned(self, db_session):
+        # the caller (see update) is responsible for committing
         self.bookmark.learned_time = datetime.now()
         db_session.add(self.bookmark)
         db_session.delete(self)
-        db_session.commit()
+        DailyActivity.record_learned_word(db_session, self.bookmark)
 
     def there_was_no_need_for_practice_on_date(self, date: datetime = None):
         # a user might have arrived here by doing the
@@ -58,10 +63,14 @@ class BasicSRSchedule(db.Model):
 
     @classmethod
     def clear_bookmark_schedule(cls, db_session, bookmark):
+        """
+        Deletes the schedule of the bookmark, without committing; the
+        caller refreshes the study queue entry of the bookmark once it
+        is done changing it.
+        """
         schedule = cls.find_by_bookmark(bookmark)
         if schedule is not None:
             db_session.delete(schedule)
-            db_session.commit()
 
     @classmethod
     def get_end_of_date(cls, date):
@@ -107,31 +116,89 @@ class BasicSRSchedule(db.Model):
         return None
 
     @classmethod
-    def update(cls, db_session, bookmark, outcome, time: datetime = None):
-        if not time:
-            time = datetime.now()
+    def new_schedule(cls, db_session, bookmark):
+        """
+        Creates the schedule for a bookmark that is exercised for the
+        first time. The changes are added to the session but not committed.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _apply_outcome(cls, db_session, bookmark, schedule, outcome, time):
+        """
+        Applies an exercise outcome to the schedule of the bookmark, creating
+        the schedule if the bookmark had none. Does not commit.
+
+        :return: the schedule of the bookmark, or None if it was removed
+        """
+        from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
 
         if outcome == ExerciseOutcome.OTHER_FEEDBACK:
             from zeeguu.core.model.bookmark_user_preference import UserWordExPreference
 
-            schedule = cls.find_or_create(db_session, bookmark)
             bookmark.fit_for_study = 0
             ## Since the user has explicitly given feedback, this should
             # be recorded as a user preference.
             bookmark.user_preference = UserWordExPreference.DONT_USE_IN_EXERCISES
             db_session.add(bookmark)
-            db_session.delete(schedule)
-            db_session.commit()
-            return
+            if schedule is not None:
+                db_session.delete(schedule)
+            StudyQueueEntry.refresh(db_session, bookmark)
+            return None
+
+        if schedule is None:
+            schedule = cls.new_schedule(db_session, bookmark)
 
         correctness = ExerciseOutcome.is_correct(outcome)
-        schedule = cls.find_or_create(db_session, bookmark)
-        if schedule.there_was_no_need_for_practice_on_date(time):
-            return
+        if not schedule.there_was_no_need_for_practice_on_date(time):
+            schedule.update_schedule(db_session, correctness, time)
+
+        # the schedule is deleted when the bookmark is learned
+        schedule_was_removed = schedule in db_session.deleted
+        StudyQueueEntry.refresh(db_session, bookmark)
+        return None if schedule_was_removed else schedule
 
-        schedule.update_schedule(db_session, correctness, time)
+    @classmethod
+    def update(cls, db_session, bookmark, outcome, time: datetime = None):
+        if not time:
+            time = datetime.now()
+
+        cls._apply_outcome(db_session, bookmark, cls.find(bookmark), outcome, time)
         db_session.commit()
 
+    @classmethod
+    def update_all(cls, db_session, bookmark_outcomes):
+        """
+        Batch version of update, for all the exercises of a session.
+
+        The schedules of all the bookmarks are loaded in one query and
+        the outcomes are applied in order. Does not commit.
+
+        :param bookmark_outcomes: list of (bookmark, outcome, time) tuples
+        """
+        bookmark_ids = set(bookmark.id for bookmark, _, _ in bookmark_outcomes)
+        schedules = {
+            schedule.bookmark_id: schedule
+            for schedule in cls.query.filter(cls.bookmark_id.in_(bookmark_ids))
+        }
+
+        for bookmark, outcome, time in bookmark_outcomes:
+            schedules[bookmark.id] = cls._apply_outcome(
+                db_session,
+                bookmark,
+                schedules.get(bookmark.id),
+                outcome,
+                time or datetime.now(),
+            )
+
+    @classmethod
+    def _rank_with_nulls_last(cls):
+        return func.coalesce(UserWord.rank, UserWord.IMPOSSIBLE_RANK)
+
+    @classmethod
+    def _cooling_interval_with_nulls_last(cls):
+        return func.coalesce(BasicSRSchedule.cooling_interval, -1)
+
     @classmethod
     def get_scheduled_bookmarks_for_user(cls, user, limit):
         end_of_day = cls.get_end_of_today()
@@ -152,9 +219,9 @@ class BasicSRSchedule(db.Model):
         # The scheduled bookmarks are sorted by the most common in the language and
         # then by cooling interval, meaning the words that are closest to being learned
         # come before the ones that are just learned.
-        scheduled_candidates_query.order_by(
-            -UserWord.rank.desc(), cls.cooling_interval.desc()
-        )  # By using the negative for rank, we ensure NULL is last.
+        scheduled_candidates_query = scheduled_candidates_query.order_by(
+            cls._rank_with_nulls_last(), cls.cooling_interval.desc()
+        )
         if limit is None:
             return scheduled_candidates_query.all()
         else:
@@ -170,15 +237,98 @@ class BasicSRSchedule(db.Model):
             .join(UserWord, Bookmark.origin_id == UserWord.id)
             .filter(UserWord.language_id == user.learned_language_id)
             .filter(BasicSRSchedule.cooling_interval == None)
-            .order_by(
-                -UserWord.rank.desc()
-            )  # By using the negative for rank, we ensure NULL is last.
+            .order_by(cls._rank_with_nulls_last())
         )
         if limit is None:
             return unscheduled_bookmarks.all()
         else:
             return unscheduled_bookmarks.limit(limit).all()
 
+    @classmethod
+    def bookmark_ids_by_priority(cls, user, limit, scheduled_only=False):
+        """
+        Computes the study priority in a single query and returns the ids
+        of the bookmarks in the order in which they should be studied.
+
+        Bookmarks are deduplicated on the lowercased origin word, keeping the
+        candidate with the highest priority for each word, and the limit is
+        applied by the DB.
+
+        The priority is:
+         1. Words that are most common in the language (words without a rank go last)
+         2. Words that are closest to being learned (highest `cooling_interval`;
+         words that are not yet scheduled come after the scheduled ones)
+
+        :param limit: If None all the candidates are returned
+        :param scheduled_only: Only consider bookmarks that are due today
+        """
+        is_scheduled = and_(
+            BasicSRSchedule.id != None,
+            BasicSRSchedule.next_practice_time < cls.get_end_of_today(),
+        )
+        # If productive exercises are disabled, exclude bookmarks with learning_cycle of 2
+        if not UserPreference.is_productive_exercises_preference_enabled(user):
+            is_scheduled = and_(
+                is_scheduled, Bookmark.learning_cycle == LearningCycle.RECEPTIVE
+            )
+        is_unscheduled = and_(
+            BasicSRSchedule.id == None,
+            Bookmark.learned_time == None,
+            Bookmark.fit_for_study == 1,
+        )
+
+        word_rank = cls._rank_with_nulls_last()
+        cooling_interval = cls._cooling_interval_with_nulls_last()
+        candidates = (
+            db.session.query(
+                Bookmark.id.label("bookmark_id"),
+                word_rank.label("word_rank"),
+                cooling_interval.label("cooling_interval"),
+                func.row_number()
+                .over(
+                    partition_by=func.lower(UserWord.word),
+                    order_by=(word_rank, cooling_interval.desc(), Bookmark.id),
+                )
+                .label("priority_within_word"),
+            )
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .outerjoin(BasicSRSchedule, BasicSRSchedule.bookmark_id == Bookmark.id)
+            .filter(Bookmark.user_id == user.id)
+            .filter(UserWord.language_id == user.learned_language_id)
+            .filter(
+                is_scheduled if scheduled_only else or_(is_scheduled, is_unscheduled)
+            )
+            .subquery()
+        )
+
+        query = (
+            db.session.query(candidates.c.bookmark_id)
+            .filter(candidates.c.priority_within_word == 1)
+            .order_by(
+                candidates.c.word_rank,
+                candidates.c.cooling_interval.desc(),
+                candidates.c.bookmark_id,
+            )
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [row.bookmark_id for row in query]
+
+    @classmethod
+    def bookmarks_by_ids_in_order(cls, bookmark_ids):
+        if not bookmark_ids:
+            return []
+        bookmarks = (
+            Bookmark.query.filter(Bookmark.id.in_(bookmark_ids))
+            .options(joinedload(Bookmark.origin))
+            .all()
+        )
+        bookmarks_by_id = {bookmark.id: bookmark for bookmark in bookmarks}
+        return [
+            bookmarks_by_id[b_id] for b_id in bookmark_ids if b_id in bookmarks_by_id
+        ]
+
     @classmethod
     def remove_duplicated_bookmarks(cls, bookmark_list):
         bookmark_set = set()
@@ -207,32 +357,13 @@ class BasicSRSchedule(db.Model):
         newer words are introduced as soon as they are translated. Using
         this method, we do not need to explicitly schedule new words.
 
-        Currently, we prioritize bookmarks in the following way:
-         1. Words that are most common in the language (utilizing the word rank in the db
-         2. Words that are closest to being learned (indicated by `cooling_interval`,
-        the highest the closest it is)
+        The bookmarks are read in priority order from the study queue; see
+        StudyQueueEntry and bookmark_ids_by_priority
         """
+        from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
 
-        def priority_by_rank(bookmark):
-            # If this is updated remember to update the order_by in
-            # get_scheduled_bookmarks_for_user and get_unscheduled_bookmarks_for_user
-            bookmark_info = bookmark.as_dictionary(with_exercise_info=True)
-            cooling_interval = bookmark_info["cooling_interval"]
-            cooling_interval = cooling_interval if cooling_interval is not None else -1
-            word_rank = bookmark_info["origin_rank"]
-            if word_rank == "":
-                word_rank = UserWord.IMPOSSIBLE_RANK
-            return word_rank, -cooling_interval
-
-        scheduled_candidates = cls.get_scheduled_bookmarks_for_user(user, limit)
-        unscheduled_bookmarks = cls.get_unscheduled_bookmarks_for_user(user, limit)
-
-        all_possible_bookmarks = scheduled_candidates + unscheduled_bookmarks
-        no_duplicate_bookmarks = cls.remove_duplicated_bookmarks(all_possible_bookmarks)
-        sorted_candidates = sorted(
-            no_duplicate_bookmarks, key=lambda x: priority_by_rank(x)
-        )
-        return sorted_candidates
+        bookmark_ids = StudyQueueEntry.bookmark_ids_to_study(user, limit)
+        return cls.bookmarks_by_ids_in_order(bookmark_ids)
 
     @classmethod
     def priority_scheduled_bookmarks_to_study(cls, user, limit):
@@ -243,14 +374,15 @@ class BasicSRSchedule(db.Model):
         The original logic is kept in bookmarks_to_study as it is called to
         get similar_words to function as distractors in the exercises.
 
-        To update the order of bookmarks look at the order_by in
-        get_scheduled_bookmarks_for_user
+        To update the order of bookmarks look at bookmark_ids_by_priority
+        and StudyQueueEntry.bookmark_ids_to_study
         """
+        from zeeguu.core.word_scheduling.study_queue import StudyQueueEntry
 
-        scheduled_candidates = cls.get_scheduled_bookmarks_for_user(user, limit)
-        no_duplicate_bookmarks = cls.remove_duplicated_bookmarks(scheduled_candidates)
-
-        return no_duplicate_bookmarks
+        bookmark_ids = StudyQueueEntry.bookmark_ids_to_study(
+            user, limit, scheduled_only=True
+        )
+        return cls.bookmarks_by_ids_in_order(bookmark_ids)
 
     @classmethod
     def bookmarks_to_study(cls, user, required_count):
@@ -100,15 +100,20 @@ class TwoLearningCyclesPerWord(BasicSRSchedule):
     def get_learning_cycle_length(cls):
         return len(cls.NEXT_COOLING_INTERVAL_ON_SUCCESS)
 
+    @classmethod
+    def new_schedule(cls, db_session, bookmark):
+        schedule = cls(bookmark)
+        bookmark.learning_cycle = LearningCycle.RECEPTIVE
+        db_session.add_all([schedule, bookmark])
+        return schedule
+
     @classmethod
     def find_or_create(cls, db_session, bookmark):
 
         schedule = super(TwoLearningCyclesPerWord, cls).find(bookmark)
 
         if not schedule:
-            schedule = cls(bookmark)
-            bookmark.learning_cycle = LearningCycle.RECEPTIVE
-            db_session.add_all([schedule, bookmark])
+            schedule = cls.new_schedule(db_session, bookmark)
             db_session.commit()
 
         return schedule
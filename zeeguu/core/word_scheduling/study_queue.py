@@ -0,0 +1,309 @@
+from sqlalchemy import and_, func, insert, or_
+
+from zeeguu.core.model import db, Bookmark, UserWord, UserPreference
+from zeeguu.core.model.learning_cycle import LearningCycle
+from zeeguu.core.word_scheduling.basicSR.basicSR import BasicSRSchedule
+
+
+class StudyQueueEntry(db.Model):
+    """
+    The study queue is a denormalized, per user and language, copy of
+    the bookmarks that are candidates for study: the ones that have a
+    schedule and the ones that are fit for study but not yet scheduled.
+
+    Each entry carries its priority keys (rank, cooling interval and
+    next practice time) so the bookmarks to study can be read in order
+    from a single table instead of joining bookmarks, words and schedules
+    on every exercise request.
+
+    The queue is kept up to date by calling refresh whenever something
+    that affects the priority of a bookmark changes: its schedule, its
+    fit for study status or its learned status.
+
+    The queue of a user is built the first time one of their bookmarks is
+    refreshed; until then the bookmarks to study are computed from the
+    bookmarks and their schedules, see StudyQueueBuilt.
+    """
+
+    __tablename__ = "study_queue"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    bookmark_id = db.Column(
+        db.Integer, db.ForeignKey(Bookmark.id, ondelete="CASCADE"), primary_key=True
+    )
+    bookmark = db.relationship(Bookmark)
+
+    user_id = db.Column(db.Integer, nullable=False)
+    language_id = db.Column(db.Integer, nullable=False)
+
+    # lowercased origin word; a word should only show up once in a session
+    word = db.Column(db.String(255), nullable=False)
+
+    rank = db.Column(db.Integer, nullable=False)
+    # -1 for the bookmarks that are not scheduled yet
+    cooling_interval = db.Column(db.Integer, nullable=False)
+    # NULL for the bookmarks that are not scheduled yet
+    next_practice_time = db.Column(db.DateTime)
+    learning_cycle = db.Column(db.Integer)
+
+    NOT_SCHEDULED_COOLING_INTERVAL = -1
+
+    def __init__(self, bookmark):
+        self.bookmark = bookmark
+
+    def __repr__(self):
+        return f"<StudyQueueEntry {self.bookmark_id} {self.word} {self.rank} {self.cooling_interval}>"
+
+    def update_from(self, bookmark, schedule):
+        self.user_id = bookmark.user_id
+        self.language_id = bookmark.origin.language_id
+        self.word = bookmark.origin.word.lower()
+        self.rank = (
+            bookmark.origin.rank
+            if bookmark.origin.rank is not None
+            else UserWord.IMPOSSIBLE_RANK
+        )
+        self.learning_cycle = bookmark.learning_cycle
+        if schedule:
+            self.cooling_interval = schedule.cooling_interval
+            self.next_practice_time = schedule.next_practice_time
+        else:
+            self.cooling_interval = self.NOT_SCHEDULED_COOLING_INTERVAL
+            self.next_practice_time = None
+
+    @classmethod
+    def is_candidate(cls, bookmark, schedule):
+        if schedule:
+            return True
+        return bookmark.learned_time is None and bool(bookmark.fit_for_study)
+
+    @classmethod
+    def find(cls, bookmark):
+        return cls.query.filter_by(bookmark_id=bookmark.id).first()
+
+    @classmethod
+    def refresh(cls, db_session, bookmark):
+        """
+        Brings the entry of the bookmark in sync with the bookmark and
+        its schedule. The changes are added to the session but not committed.
+        """
+        if bookmark.id is None:
+            # a bookmark that is not saved yet can't have an entry or a schedule
+            cls._sync(db_session, bookmark, None, None)
+            return
+        cls.refresh_all(db_session, [bookmark])
+
+    @classmethod
+    def refresh_all(cls, db_session, bookmarks, chunk_size=500):
+        """
+        Like refresh for many saved bookmarks at once, e.g. the ones of an
+        import: their entries and their schedules are looked up with one
+        query each (per chunk), rather than two per bookmark.
+        """
+        to_sync = []
+        built = {}
+        for bookmark in bookmarks:
+            key = (bookmark.user_id, bookmark.origin.language_id)
+            if key not in built:
+                built[key] = StudyQueueBuilt.is_built(*key)
+                if not built[key]:
+                    # the rebuild picks up the current state of the bookmarks too
+                    cls.rebuild_for_user(db_session, bookmark.user, key[1])
+            if built[key]:
+                to_sync.append(bookmark)
+
+        ids = [each.id for each in to_sync]
+        entries, schedules = {}, {}
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            for each in cls.query.filter(cls.bookmark_id.in_(chunk)):
+                entries[each.bookmark_id] = each
+            for each in BasicSRSchedule.query.filter(
+                BasicSRSchedule.bookmark_id.in_(chunk)
+            ):
+                schedules[each.bookmark_id] = each
+
+        for bookmark in to_sync:
+            cls._sync(
+                db_session,
+                bookmark,
+                entries.get(bookmark.id),
+                schedules.get(bookmark.id),
+            )
+
+    @classmethod
+    def _sync(cls, db_session, bookmark, entry, schedule):
+        if not cls.is_candidate(bookmark, schedule):
+            if entry:
+                db_session.delete(entry)
+            return
+
+        if not entry:
+            entry = cls(bookmark)
+        entry.update_from(bookmark, schedule)
+        db_session.add(entry)
+
+    @classmethod
+    def rebuild_for_user(cls, db_session, user, language_id=None):
+        """
+        Recomputes the queue of the user from the bookmarks and their schedules.
+        Used for backfilling and for users whose queue was never built.
+        """
+        if language_id is None:
+            language_id = user.learned_language_id
+
+        cls.query.filter_by(user_id=user.id, language_id=language_id).delete()
+
+        candidates = (
+            db_session.query(
+                Bookmark.id,
+                func.lower(UserWord.word),
+                func.coalesce(UserWord.rank, UserWord.IMPOSSIBLE_RANK),
+                func.coalesce(
+                    BasicSRSchedule.cooling_interval,
+                    cls.NOT_SCHEDULED_COOLING_INTERVAL,
+                ),
+                BasicSRSchedule.next_practice_time,
+                Bookmark.learning_cycle,
+            )
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .outerjoin(BasicSRSchedule, BasicSRSchedule.bookmark_id == Bookmark.id)
+            .filter(Bookmark.user_id == user.id)
+            .filter(UserWord.language_id == language_id)
+            .filter(
+                or_(
+                    BasicSRSchedule.id != None,
+                    and_(
+                        Bookmark.learned_time == None,
+                        Bookmark.fit_for_study == 1,
+                    ),
+                )
+            )
+        )
+        entries = [
+            dict(
+                bookmark_id=b_id,
+                user_id=user.id,
+                language_id=language_id,
+                word=word,
+                rank=rank,
+                cooling_interval=cooling_interval,
+                next_practice_time=next_practice_time,
+                learning_cycle=learning_cycle,
+            )
+            for (
+                b_id,
+                word,
+                rank,
+                cooling_interval,
+                next_practice_time,
+                learning_cycle,
+            ) in candidates
+        ]
+        if entries:
+            db_session.execute(insert(cls), entries)
+        StudyQueueBuilt.mark_built(db_session, user.id, language_id)
+
+        return len(entries)
+
+    @classmethod
+    def bookmark_ids_to_study(cls, user, limit, scheduled_only=False):
+        """
+        Reads the ids of the bookmarks to study in priority order, with
+        the same semantics as BasicSRSchedule.bookmark_ids_by_priority.
+
+        The entries are already sorted by the index, so we only read until
+        we have `limit` distinct words. If the queue of the user was not
+        built yet the ids are computed from the bookmarks instead.
+
+        :param limit: If None all the candidates are returned
+        :param scheduled_only: Only consider bookmarks that are due today
+        """
+        language_id = user.learned_language_id
+        if not StudyQueueBuilt.is_built(user.id, language_id):
+            return BasicSRSchedule.bookmark_ids_by_priority(user, limit, scheduled_only)
+
+        user_queue = cls.query.filter(cls.user_id == user.id).filter(
+            cls.language_id == language_id
+        )
+
+        is_due = cls.next_practice_time < BasicSRSchedule.get_end_of_today()
+        # If productive exercises are disabled, exclude bookmarks with learning_cycle of 2
+        if not UserPreference.is_productive_exercises_preference_enabled(user):
+            is_due = and_(is_due, cls.learning_cycle == LearningCycle.RECEPTIVE)
+        is_not_scheduled = cls.next_practice_time == None
+
+        query = (
+            user_queue.with_entities(cls.bookmark_id, cls.word)
+            .filter(is_due if scheduled_only else or_(is_due, is_not_scheduled))
+            .order_by(cls.rank, cls.cooling_interval.desc(), cls.bookmark_id)
+        )
+
+        seen_words = set()
+        bookmark_ids = []
+        for bookmark_id, word in query.yield_per(100):
+            if word in seen_words:
+                continue
+            seen_words.add(word)
+            bookmark_ids.append(bookmark_id)
+            if limit is not None and len(bookmark_ids) >= limit:
+                break
+        return bookmark_ids
+
+    @classmethod
+    def words_to_study(cls, user, limit):
+        """
+        The origin words, as written in the bookmarks, of the scheduled
+        bookmarks to study; the entries only keep the lowercased word.
+        """
+        bookmark_ids = cls.bookmark_ids_to_study(user, limit, scheduled_only=True)
+        if not bookmark_ids:
+            return []
+
+        words = dict(
+            db.session.query(Bookmark.id, UserWord.word)
+            .join(UserWord, Bookmark.origin_id == UserWord.id)
+            .filter(Bookmark.id.in_(bookmark_ids))
+        )
+        return [words[each] for each in bookmark_ids if each in words]
+
+
+# rank ascending, cooling interval descending, like bookmark_ids_to_study
+# reads them, so MySQL can stream the entries from the index without sorting
+db.Index(
+    "study_queue_priority_idx",
+    StudyQueueEntry.user_id,
+    StudyQueueEntry.language_id,
+    StudyQueueEntry.rank,
+    StudyQueueEntry.cooling_interval.desc(),
+)
+
+
+class StudyQueueBuilt(db.Model):
+    """
+    Marks the study queues that were built. A queue without entries can
+    be empty because the user has nothing to study, so the entries alone
+    don't tell whether it was ever built.
+    """
+
+    __tablename__ = "study_queue_built"
+    __table_args__ = {"mysql_collate": "utf8_bin"}
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    language_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    @classmethod
+    def is_built(cls, user_id, language_id):
+        return (
+            cls.query.filter_by(user_id=user_id, language_id=language_id).first()
+            is not None
+        )
+
+    @classmethod
+    def mark_built(cls, db_session, user_id, language_id):
+        db_session.execute(
+            insert(cls)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            dict(user_id=user_id, language_id=language_id),
+        )
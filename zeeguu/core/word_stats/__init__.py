@@ -1,5 +1,14 @@
+import os
+
+import numpy as np
 from wordstats import LanguageInfo
 
+from zeeguu.core.word_stats.rank_store import (
+    RANK_STORES_FOLDER,
+    UNKNOWN_RANK,
+    WordRankStore,
+)
+
 lang_cache = {}
 
 
@@ -13,3 +22,43 @@ def lang_info(lang_code):
 # lang_info("da")
 # lang_info("de")
 # lang_info("nl")
+
+
+# language code -> WordRankStore, or None when the store was not built
+rank_store_cache = {}
+
+
+def rank_store(lang_code):
+    """
+    :return: the compiled WordRankStore of the language, or None if
+    tools/build_word_rank_stores.py was not run for it
+    """
+    if lang_code not in rank_store_cache:
+        folder = os.path.join(RANK_STORES_FOLDER, lang_code)
+        if os.path.exists(os.path.join(folder, "info.json")):
+            rank_store_cache[lang_code] = WordRankStore(folder)
+        else:
+            rank_store_cache[lang_code] = None
+    return rank_store_cache[lang_code]
+
+
+def word_rank(word, lang_code):
+    """
+    :return: the frequency rank of the word, UNKNOWN_RANK if the word is
+    not known; from the rank store if there's one, from wordstats otherwise
+    """
+    store = rank_store(lang_code)
+    if store is not None:
+        return store.rank(word)
+    return lang_info(lang_code)[word].rank
+
+
+def word_ranks(words, lang_code):
+    """
+    :return: numpy array with the rank of every word, like word_rank
+    """
+    store = rank_store(lang_code)
+    if store is not None:
+        return store.ranks(words)
+    info = lang_info(lang_code)
+    return np.array([info[each].rank for each in words], dtype=np.int64)
@@ -0,0 +1,142 @@
+import json
+import os
+
+import numpy as np
+
+from zeeguu.config import ZEEGUU_RESOURCES_FOLDER
+
+RANK_STORES_FOLDER = os.path.join(ZEEGUU_RESOURCES_FOLDER, "word_rank_stores")
+
+# same as the rank of the words that wordstats does not know
+UNKNOWN_RANK = 100000
+
+
+class WordRankStore:
+    """
+    The frequency rank of the words of a language, compiled from wordstats
+    by tools/build_word_rank_stores.py into a folder of .npy files:
+
+        words.npy             the lowercased words, utf-8, sorted
+        ranks.npy             the rank of every word
+        frequencies.npy       the wordstats frequency of every word
+        stems.npy             the distinct stems of the words, sorted
+        stem_ranks.npy        the best rank of the words of a stem
+        stem_frequencies.npy  the summed frequency of the words of a stem
+
+    The files are memory mapped, so opening a store costs nothing, the
+    processes of a machine share one copy of it in the page cache, and a
+    lookup is a binary search in the sorted arrays. The lookups of many
+    words at once are done with a single vectorized search.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+        def load(name):
+            return np.load(os.path.join(folder, name + ".npy"), mmap_mode="r")
+
+        self.words = load("words")
+        self.ranks_array = load("ranks")
+        self.frequencies_array = load("frequencies")
+        self.stems = load("stems")
+        self.stem_ranks_array = load("stem_ranks")
+        self.stem_frequencies_array = load("stem_frequencies")
+
+    def __len__(self):
+        return len(self.words)
+
+    @classmethod
+    def build(cls, folder, word_ranks_and_frequencies, stem=None):
+        """
+        :param word_ranks_and_frequencies: iterable of (word, rank, frequency);
+        when a word shows up several times, the best rank is kept
+        :param stem: function from word to stem; without it the stems are the words
+        """
+        best = {}
+        for word, rank, frequency in word_ranks_and_frequencies:
+            word = word.lower()
+            if word not in best or rank < best[word][0]:
+                best[word] = (rank, frequency)
+
+        stems = {}
+        for word, (rank, frequency) in best.items():
+            word_stem = stem(word) if stem else word
+            stem_rank, stem_frequency = stems.get(word_stem, (rank, 0))
+            stems[word_stem] = (min(rank, stem_rank), stem_frequency + frequency)
+
+        os.makedirs(folder, exist_ok=True)
+        for prefix, table in [("", best), ("stem_", stems)]:
+            keys = sorted(table, key=lambda each: each.encode("utf-8"))
+            np.save(
+                os.path.join(folder, "words.npy" if not prefix else "stems.npy"),
+                np.array([each.encode("utf-8") for each in keys], dtype=bytes),
+            )
+            np.save(
+                os.path.join(folder, prefix + "ranks.npy"),
+                np.array([table[each][0] for each in keys], dtype=np.int32),
+            )
+            np.save(
+                os.path.join(folder, prefix + "frequencies.npy"),
+                np.array([table[each][1] for each in keys], dtype=np.float64),
+            )
+
+        with open(os.path.join(folder, "info.json"), "w") as f:
+            json.dump(dict(words=len(best), stems=len(stems)), f)
+
+        return cls(folder)
+
+    @staticmethod
+    def _positions(table, keys):
+        """
+        :return: the position of every key in the table, or -1 if missing
+        """
+        if len(table) == 0 or len(keys) == 0:
+            return np.full(len(keys), -1)
+        positions = np.searchsorted(table, keys)
+        in_range = np.minimum(positions, len(table) - 1)
+        found = (positions < len(table)) & (table[in_range] == keys)
+        return np.where(found, positions, -1)
+
+    @staticmethod
+    def _encode(words):
+        # numpy picks the width of the longest word, so nothing is truncated
+        return np.array([each.lower().encode("utf-8") for each in words], dtype=bytes)
+
+    def _lookup(self, table, values, keys, missing):
+        positions = self._positions(table, self._encode(keys))
+        return np.where(positions >= 0, values[np.maximum(positions, 0)], missing)
+
+    def ranks(self, words):
+        """
+        :return: array with the rank of every word, UNKNOWN_RANK if not known
+        """
+        return self._lookup(self.words, self.ranks_array, words, UNKNOWN_RANK)
+
+    def frequencies(self, words):
+        return self._lookup(self.words, self.frequencies_array, words, 0)
+
+    def stem_ranks(self, stems):
+        return self._lookup(self.stems, self.stem_ranks_array, stems, UNKNOWN_RANK)
+
+    def stem_frequencies(self, stems):
+        """
+        :return: array with the summed frequency of the words of every stem,
+        0 if not known
+        """
+        return self._lookup(self.stems, self.stem_frequencies_array, stems, 0)
+
+    def rank(self, word):
+        return int(self.ranks([word])[0])
+
+    def frequency(self, word):
+        return float(self.frequencies([word])[0])
+
+    def words_by_rank(self):
+        """
+        :return: (words, ranks), most frequent first
+        """
+        order = np.argsort(self.ranks_array, kind="stable")
+        return (
+            [each.decode("utf-8") for each in self.words[order]],
+            self.ranks_array[order],
+        )